@@ -0,0 +1,10 @@
+"""
+Benchmarks de Rendimiento
+========================
+
+Suite reproducible que mide las rutas críticas del servicio en proceso
+(sin servidor): ver `benchmarks/suite.py`.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
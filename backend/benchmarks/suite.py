@@ -0,0 +1,539 @@
+"""
+Suite de Benchmarks de las Rutas Críticas
+========================================
+
+Mide en proceso (contra `main.app` y las clases del predictor, sin
+levantar un servidor) el costo de cada etapa del servicio:
+
+- predict_single: latencia de `/api/v1/predictions/predict`
+- dataset_endpoint: `/api/v1/predictions/predict-dataset` completo (HTTP + JSON)
+- predictor_dataset: `predict_dataset_async` (chunks en el executor)
+- feature_build: `feature_pipeline.transform`
+- scale_predict: `scaler.transform` + `model.predict`
+- csv_parse: `pd.read_csv` del archivo subido
+- json_serialization: serialización de la respuesta del dataset
+- startup_import: `import main` en un intérprete nuevo (con desglose por
+  módulo de `-X importtime`)
+- worker_boot: un worker uvicorn nuevo hasta que `/health/ready` responde
+  200 (importación, carga del modelo y warm-up)
+
+Los casos con presupuesto (`worker_boot`: `WORKER_BOOT_BUDGET_SECONDS`)
+también terminan con código 1 si su mediana lo supera, para que el
+autoescalado pueda contar con ese tiempo de arranque. El presupuesto de
+`worker_boot` también se verifica en la suite de tests (tests/test_startup.py).
+
+Los datasets se generan re-muestreando filas del CSV procesado con una
+semilla fija, de modo que dos corridas miden exactamente lo mismo.
+
+Los resultados se escriben en JSON y, si existe una línea base, se
+comparan caso a caso (mediana); una regresión mayor a la tolerancia
+termina con código de salida 1.
+
+Uso (desde backend/):
+    python -m benchmarks.suite                         # 1k, 10k, 100k y 1M filas
+    python -m benchmarks.suite --sizes 1000,10000 --only feature_build,csv_parse
+    python -m benchmarks.suite --save-baseline         # guarda la línea base
+
+La línea base depende del hardware; se guarda por máquina y no se versiona.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import logging
+import math
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_SOURCE = BACKEND_DIR / "ml" / "data" / "processed" / "student_performance_transformado_numerico.csv"
+DEFAULT_OUTPUT = BENCHMARKS_DIR / "results" / "latest.json"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "results" / "baseline.json"
+
+# La respuesta del endpoint incluye cada fila: por encima de esto domina la memoria
+ENDPOINT_MAX_ROWS = 100_000
+# Por encima de estas filas cada caso se ejecuta una sola vez
+SINGLE_RUN_ROWS = 100_000
+# Módulos listados en el desglose de importación
+IMPORT_BREAKDOWN_TOP = 15
+WORKER_BOOT_TIMEOUT_SECONDS = 120
+
+SINGLE_STUDENT = {
+    "study_hours": 20, "attendance": 85, "parental_involvement": "Medium",
+    "access_to_resources": "Medium", "extracurricular_activities": "Yes",
+    "sleep_hours": 7, "previous_scores": 75, "motivation_level": "Medium",
+    "internet_access": "Yes", "tutoring_sessions": 1, "family_income": "Medium",
+    "teacher_quality": "Medium", "school_type": "Public", "peer_influence": "Neutral",
+    "physical_activity": 3, "learning_disabilities": "No",
+    "parental_education_level": "Bachelor", "distance_from_home": "Near", "gender": "Male"
+}
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BenchmarkResult:
+    """Mediciones de un caso (segundos por iteración)."""
+
+    name: str
+    rows: int
+    samples: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        """Resumen estadístico del caso."""
+        ordered = sorted(self.samples)
+        median = statistics.median(ordered)
+        result = {
+            "rows": self.rows,
+            "iterations": len(ordered),
+            "min_seconds": round(ordered[0], 6),
+            "median_seconds": round(median, 6),
+            "mean_seconds": round(statistics.fmean(ordered), 6),
+            "max_seconds": round(ordered[-1], 6),
+            "rows_per_second": round(self.rows / median, 1) if median > 0 else None
+        }
+        if len(ordered) >= 20:
+            result["p95_seconds"] = round(ordered[math.ceil(0.95 * len(ordered)) - 1], 6)
+        return result
+
+class BenchmarkContext:
+    """
+    Estado compartido por los casos: app en proceso, predictor cargado
+    y datasets sintéticos por tamaño (generados una sola vez).
+    """
+
+    def __init__(self, source: Path, seed: int):
+        self.source = source
+        self.seed = seed
+        self._base: Optional[pd.DataFrame] = None
+        self._frames: Dict[int, pd.DataFrame] = {}
+        self._csv: Dict[int, str] = {}
+        self._records: Dict[int, List[Dict[str, Any]]] = {}
+        # Datos adicionales por caso que se agregan a su resumen
+        self.details: Dict[str, Dict[str, Any]] = {}
+
+        import main
+        from fastapi.testclient import TestClient
+
+        self.main = main
+        self.client = TestClient(main.app)
+        self.client.__enter__()  # ejecuta el lifespan (carga del modelo)
+        self.predictor = main.predictor
+        # El warm-up corre en segundo plano: medir recién con el servicio listo
+        while self.client.get("/health/ready").status_code == 503:
+            time.sleep(0.1)
+        if not self.predictor.is_loaded:
+            raise RuntimeError("El modelo SVR no está cargado; los benchmarks medirían el fallback")
+
+    def close(self) -> None:
+        """Cierra la app (lifespan shutdown)."""
+        self.client.__exit__(None, None, None)
+
+    def frame(self, rows: int) -> pd.DataFrame:
+        """Dataset de `rows` filas re-muestreado del CSV fuente (sin Exam_Score)."""
+        if rows not in self._frames:
+            if self._base is None:
+                self._base = pd.read_csv(self.source).drop(columns=["Exam_Score"], errors="ignore")
+            rng = np.random.default_rng(self.seed)
+            indices = rng.integers(0, len(self._base), size=rows)
+            self._frames[rows] = self._base.iloc[indices].reset_index(drop=True)
+        return self._frames[rows]
+
+    def csv_text(self, rows: int) -> str:
+        """Dataset como texto CSV (lo que llega al endpoint)."""
+        if rows not in self._csv:
+            self._csv[rows] = self.frame(rows).to_csv(index=False)
+        return self._csv[rows]
+
+    def records(self, rows: int) -> List[Dict[str, Any]]:
+        """Dataset como lista de diccionarios (entrada del predictor)."""
+        if rows not in self._records:
+            self._records[rows] = self.frame(rows).to_dict("records")
+        return self._records[rows]
+
+    def release(self, rows: int) -> None:
+        """Libera los datos de un tamaño (1M filas en dicts ocupa varios GB)."""
+        for cache in (self._frames, self._csv, self._records):
+            cache.pop(rows, None)
+
+@dataclass
+class Benchmark:
+    """Caso registrado: `setup` prepara los datos y devuelve la función a medir."""
+
+    name: str
+    setup: Callable[[BenchmarkContext, int], Callable[[], Any]]
+    sized: bool = True
+    max_rows: Optional[int] = None
+    repeat: Optional[int] = None
+    budget: Optional[Callable[[], float]] = None
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+def benchmark(
+    name: str,
+    sized: bool = True,
+    max_rows: Optional[int] = None,
+    repeat: Optional[int] = None,
+    budget: Optional[Callable[[], float]] = None
+):
+    """Registra un caso de benchmark (`budget`: mediana máxima en segundos)."""
+    def decorator(setup: Callable[[BenchmarkContext, int], Callable[[], Any]]):
+        BENCHMARKS[name] = Benchmark(name, setup, sized, max_rows, repeat, budget)
+        return setup
+    return decorator
+
+def _fresh_process_env() -> Dict[str, str]:
+    return dict(os.environ, PYTHONPATH=str(BACKEND_DIR), PYTHONWARNINGS="ignore")
+
+def import_breakdown(module: str = "main", top: int = IMPORT_BREAKDOWN_TOP) -> List[Dict[str, Any]]:
+    """Módulos importados directamente por `module` ordenados por tiempo acumulado (`-X importtime`)."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_fresh_process_env(), capture_output=True, text=True, check=True
+    ).stderr
+
+    # Cada módulo se lista después de sus hijos; la sangría indica la profundidad
+    children: List[Dict[str, Any]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == module:
+                break
+            children = []
+        elif depth == 1:
+            children.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    children.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return children[:top]
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _worker_boot_budget() -> float:
+    from core.config import settings
+    return settings.WORKER_BOOT_BUDGET_SECONDS
+
+def boot_worker(timeout: float = WORKER_BOOT_TIMEOUT_SECONDS) -> float:
+    """Arranca un worker uvicorn nuevo y devuelve los segundos hasta que `/health/ready` responde 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_fresh_process_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"El worker terminó al arrancar (código {process.returncode})")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health/ready", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.02)
+        raise TimeoutError(f"El worker no quedó listo en {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+# === CASOS ===
+
+@benchmark("predict_single", sized=False, repeat=200)
+def _predict_single(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    def run() -> None:
+        response = ctx.client.post("/api/v1/predictions/predict", json=SINGLE_STUDENT)
+        response.raise_for_status()
+    return run
+
+@benchmark("dataset_endpoint", max_rows=ENDPOINT_MAX_ROWS)
+def _dataset_endpoint(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    payload = ctx.csv_text(rows).encode("utf-8")
+
+    def run() -> None:
+        response = ctx.client.post(
+            "/api/v1/predictions/predict-dataset",
+            files={"file": ("benchmark.csv", payload, "text/csv")}
+        )
+        response.raise_for_status()
+    return run
+
+@benchmark("predictor_dataset")
+def _predictor_dataset(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    records = ctx.records(rows)
+    return lambda: asyncio.run(ctx.predictor.predict_dataset_async(records))
+
+@benchmark("feature_build")
+def _feature_build(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    from services.feature_pipeline import feature_pipeline
+
+    records = ctx.records(rows)
+    return lambda: feature_pipeline.transform(records)
+
+@benchmark("scale_predict")
+def _scale_predict(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    from services.feature_pipeline import feature_pipeline
+
+    X = feature_pipeline.transform(ctx.frame(rows))
+    return lambda: ctx.predictor.model.predict(ctx.predictor.scaler.transform(X))
+
+@benchmark("csv_parse")
+def _csv_parse(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    text = ctx.csv_text(rows)
+    return lambda: pd.read_csv(io.StringIO(text))
+
+@benchmark("json_serialization")
+def _json_serialization(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from services.analysis_rules import dataset_rule_engine
+
+    records = ctx.records(rows)
+    predictions = np.random.default_rng(ctx.seed).uniform(40, 100, size=rows)
+    analyses, _ = dataset_rule_engine.analyze(ctx.frame(rows), predictions * 0.2)
+    # Misma forma que las filas de `results` del endpoint (análisis real del motor de reglas)
+    payload = {
+        "results": [
+            {
+                "estudiante_id": i + 1,
+                "prediction_100": round(float(prediction), 2),
+                "prediction_20": round(float(prediction) * 0.2, 2),
+                "letter_grade": "A",
+                "original_data": record,
+                "analysis": analysis
+            }
+            for i, (prediction, record, analysis) in enumerate(zip(predictions, records, analyses))
+        ]
+    }
+    return lambda: JSONResponse(content=jsonable_encoder(payload))
+
+@benchmark("startup_import", sized=False, repeat=5)
+def _startup_import(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    ctx.details["startup_import"] = {"import_breakdown": import_breakdown()}
+
+    def run() -> None:
+        subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR,
+                       env=_fresh_process_env(), capture_output=True, check=True)
+    return run
+
+@benchmark("worker_boot", sized=False, repeat=3, budget=_worker_boot_budget)
+def _worker_boot(ctx: BenchmarkContext, rows: int) -> Callable[[], Any]:
+    return boot_worker
+
+# === EJECUCIÓN ===
+
+def run_case(case: Benchmark, ctx: BenchmarkContext, rows: int, repeat: int, warmup: int) -> BenchmarkResult:
+    """Ejecuta un caso: calentamiento y `repeat` iteraciones medidas."""
+    func = case.setup(ctx, rows)
+    if case.repeat is not None:
+        repeat = case.repeat
+    elif rows > SINGLE_RUN_ROWS:
+        repeat, warmup = 1, 0
+
+    for _ in range(warmup):
+        func()
+
+    result = BenchmarkResult(case.name if not case.sized else f"{case.name}@{rows}", rows)
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        result.samples.append(time.perf_counter() - started)
+    return result
+
+def run_suite(
+    sizes: Sequence[int],
+    only: Optional[Sequence[str]] = None,
+    repeat: int = 5,
+    warmup: int = 1,
+    source: Path = DEFAULT_SOURCE,
+    seed: int = 42
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Ejecuta los casos seleccionados.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Resumen por caso (`nombre@filas`)
+    """
+    cases = [BENCHMARKS[name] for name in (only or BENCHMARKS)]
+    ctx = BenchmarkContext(source, seed)
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        for case in (c for c in cases if not c.sized):
+            results[case.name] = _timed(case, ctx, 1, repeat, warmup)
+
+        # Por tamaño (no por caso) para generar y liberar cada dataset una sola vez
+        for rows in sorted(sizes):
+            for case in (c for c in cases if c.sized):
+                if case.max_rows is not None and rows > case.max_rows:
+                    continue
+                results[f"{case.name}@{rows}"] = _timed(case, ctx, rows, repeat, warmup)
+            ctx.release(rows)
+    finally:
+        ctx.close()
+    return results
+
+def _timed(case: Benchmark, ctx: BenchmarkContext, rows: int, repeat: int, warmup: int) -> Dict[str, Any]:
+    """Ejecuta un caso e imprime su resumen."""
+    summary = run_case(case, ctx, rows, repeat, warmup).summary()
+    label = case.name if not case.sized else f"{case.name}@{rows}"
+    summary.update(ctx.details.pop(label, {}))
+    if case.budget is not None:
+        summary["budget_seconds"] = case.budget()
+    throughput = f"{summary['rows_per_second']:>14,.0f} filas/s" if case.sized else ""
+    print(f"  {label:<32} mediana {summary['median_seconds'] * 1000:>11.3f} ms {throughput}")
+    return summary
+
+def over_budget(results: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Casos cuya mediana supera su presupuesto."""
+    return [
+        name for name, summary in results.items()
+        if "budget_seconds" in summary and summary["median_seconds"] > summary["budget_seconds"]
+    ]
+
+def compare(current: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara medianas contra la línea base.
+
+    Una mediana mayor que `baseline * (1 + tolerance)` es regresión y una
+    menor que `baseline / (1 + tolerance)` es mejora.
+    """
+    comparison = {}
+    for name, summary in current.items():
+        reference = baseline.get(name)
+        if reference is None:
+            comparison[name] = {"status": "new"}
+            continue
+
+        ratio = summary["median_seconds"] / reference["median_seconds"] if reference["median_seconds"] else math.inf
+        status = "ok"
+        if ratio > 1 + tolerance:
+            status = "regression"
+        elif ratio < 1 / (1 + tolerance):
+            status = "improvement"
+        comparison[name] = {
+            "status": status,
+            "ratio": round(ratio, 3),
+            "baseline_median_seconds": reference["median_seconds"],
+            "median_seconds": summary["median_seconds"]
+        }
+    return comparison
+
+def environment() -> Dict[str, Any]:
+    """Datos del entorno para interpretar (y no mezclar) resultados."""
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit_learn": sklearn.__version__
+    }
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de las rutas críticas de PredictScore-ML")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Tamaños de dataset separados por coma")
+    parser.add_argument("--only", default="", help=f"Casos separados por coma ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=5, help="Iteraciones medidas por caso")
+    parser.add_argument("--warmup", type=int, default=1, help="Iteraciones de calentamiento por caso")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="CSV procesado a re-muestrear")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Aumento relativo de la mediana tolerado antes de marcar regresión")
+    parser.add_argument("--save-baseline", action="store_true", help="Guardar estos resultados como línea base")
+    parser.add_argument("--verbose", action="store_true", help="Mantener los logs INFO del servicio")
+    args = parser.parse_args(argv)
+
+    only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in only if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Casos desconocidos: {unknown}")
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+        warnings.filterwarnings("ignore")
+
+    print(f"🏁 Benchmarks ({', '.join(only or BENCHMARKS)}) tamaños={sizes}")
+    results = run_suite(sizes, only, args.repeat, args.warmup, args.source, args.seed)
+
+    report: Dict[str, Any] = {"environment": environment(), "results": results}
+    regressions = []
+    if args.baseline.exists() and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        report["baseline"] = {"path": str(args.baseline), "environment": baseline.get("environment")}
+        report["comparison"] = compare(results, baseline.get("results", {}), args.tolerance)
+        regressions = [name for name, item in report["comparison"].items() if item["status"] == "regression"]
+
+        print(f"\n📊 Comparación con {args.baseline} (tolerancia {args.tolerance:.0%}):")
+        for name, item in report["comparison"].items():
+            if "ratio" in item:
+                print(f"  {name:<32} x{item['ratio']:<6} {item['status']}")
+            else:
+                print(f"  {name:<32} {item['status']}")
+
+    for name, summary in results.items():
+        if "import_breakdown" in summary:
+            print(f"\n📦 Importaciones de main ({name}, ms acumulados):")
+            for entry in summary["import_breakdown"]:
+                print(f"  {entry['module']:<40} {entry['cumulative_ms']:>9.1f}")
+    exceeded = over_budget(results)
+    for name in (n for n in results if "budget_seconds" in results[n]):
+        summary = results[name]
+        status = "❌ fuera de presupuesto" if name in exceeded else "✅"
+        print(f"\n⏱️  {name}: mediana {summary['median_seconds']:.2f}s / presupuesto {summary['budget_seconds']:g}s {status}")
+
+    destination = args.baseline if args.save_baseline else args.output
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with open(destination, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Resultados guardados en {destination}")
+
+    if regressions:
+        print(f"❌ Regresiones: {', '.join(regressions)}")
+    return 1 if regressions or exceeded else 0
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(BACKEND_DIR))
+    sys.exit(main())
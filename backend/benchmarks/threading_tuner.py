@@ -0,0 +1,226 @@
+"""
+Calibración de la Política de Hilos
+==================================
+
+Mide el throughput de predicción de datasets con distintas combinaciones
+de procesos × hilos del executor × hilos BLAS y guarda la mejor en
+`THREADING_POLICY_FILE` (por defecto `results/threading_policy.json`),
+que `core/threading_policy.py` aplica en este host mientras coincida la
+cantidad de núcleos.
+
+Cada proceso de una combinación es un intérprete nuevo con la política
+fijada por entorno, igual que un worker de `serve.py`: carga el modelo,
+hace una pasada de calentamiento y, cuando todos están listos, mantiene
+`2 × hilos del executor` datasets en vuelo durante `--seconds`. En
+paralelo mide la latencia de predicciones individuales por el carril
+prioritario, como las sirve el API (compiten con los datasets por CPU
+y GIL, no por el executor).
+
+Se incluye como referencia la configuración anterior (1 proceso × 6
+hilos × BLAS con un hilo por núcleo, el valor por defecto de OpenBLAS).
+
+Uso (desde backend/):
+    python -m benchmarks.threading_tuner
+    python -m benchmarks.threading_tuner --seconds 10 --rows 2000
+    python -m benchmarks.threading_tuner --dry-run       # solo lista las combinaciones
+
+El resultado depende del hardware; se guarda por máquina y no se versiona.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+READY_LINE = "READY"
+SINGLE_INTERVAL_SECONDS = 0.05
+LEGACY = (1, 6, None)  # Executor fijo de 6 hilos, BLAS sin límite (un hilo por núcleo)
+
+Combination = Tuple[int, int, Optional[int]]
+
+def _powers(limit: int) -> List[int]:
+    """1, 2, 4, ... hasta `limit`, incluido `limit`."""
+    values, value = [], 1
+    while value < limit:
+        values.append(value)
+        value *= 2
+    return values + [limit]
+
+def combinations(cores: int) -> List[Combination]:
+    """Combinaciones que no pasan de los núcleos salvo en el executor (hasta 2× por proceso)."""
+    found = set()
+    for processes in _powers(cores):
+        per_process = max(1, cores // processes)
+        for executor_threads in _powers(max(2, 2 * per_process)):
+            for blas_threads in {1, max(1, per_process // executor_threads)}:
+                found.add((processes, executor_threads, blas_threads))
+    return sorted(found) + [LEGACY]
+
+# === PROCESO MEDIDO ===
+
+def probe(rows: int, seconds: float, seed: int) -> None:
+    """Un worker: carga el modelo, espera la señal del padre y mide durante `seconds`."""
+    logging.disable(logging.INFO)
+    import main
+    from benchmarks.suite import DEFAULT_SOURCE
+    import numpy as np
+    import pandas as pd
+
+    predictor = main.predictor
+    if not predictor.load_model():
+        raise SystemExit("El modelo SVR no está cargado; se mediría el fallback")
+
+    base = pd.read_csv(DEFAULT_SOURCE).drop(columns=["Exam_Score"], errors="ignore")
+    indices = np.random.default_rng(seed).integers(0, len(base), size=rows)
+    records = base.iloc[indices].to_dict("records")
+    in_flight = 2 * main.config.MAX_WORKERS
+    asyncio.run(predictor.predict_dataset_async(records))
+
+    print(READY_LINE, flush=True)
+    sys.stdin.readline()
+
+    async def measure() -> Dict[str, Any]:
+        deadline = time.perf_counter() + seconds
+        completed = [0]
+        latencies: List[float] = []
+
+        async def datasets() -> None:
+            while time.perf_counter() < deadline:
+                await predictor.predict_dataset_async(records)
+                completed[0] += rows
+
+        async def singles() -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await predictor.predict_dataset_async(records[:1], priority=True)
+                latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(SINGLE_INTERVAL_SECONDS)
+
+        started = time.perf_counter()
+        await asyncio.gather(singles(), *(datasets() for _ in range(in_flight)))
+        latencies.sort()
+        return {
+            "rows": completed[0],
+            "seconds": time.perf_counter() - started,
+            "single_p95_seconds": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+        }
+
+    print(json.dumps(asyncio.run(measure())), flush=True)
+
+# === COORDINACIÓN ===
+
+def measure(combination: Combination, rows: int, seconds: float, seed: int, cores: int) -> Dict[str, Any]:
+    """Lanza los procesos de una combinación, los arranca a la vez y suma su throughput."""
+    processes, executor_threads, blas_threads = combination
+    env = dict(
+        os.environ,
+        PYTHONPATH=str(BACKEND_DIR),
+        PYTHONWARNINGS="ignore",
+        WEB_CONCURRENCY=str(processes),
+        THREAD_EXECUTOR_THREADS=str(executor_threads),
+        THREAD_BLAS_THREADS=str(blas_threads or cores)
+    )
+    command = [sys.executable, "-m", "benchmarks.threading_tuner", "--probe",
+               "--rows", str(rows), "--seconds", str(seconds), "--seed", str(seed)]
+    workers = [
+        subprocess.Popen(command, cwd=BACKEND_DIR, env=env, text=True,
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        for _ in range(processes)
+    ]
+    try:
+        for worker in workers:
+            while worker.stdout.readline().strip() != READY_LINE:
+                if worker.poll() is not None:
+                    raise RuntimeError(f"Un proceso de {combination} terminó antes de estar listo")
+        for worker in workers:
+            worker.stdin.write("go\n")
+            worker.stdin.flush()
+        samples = [json.loads(worker.communicate()[0].strip().splitlines()[-1]) for worker in workers]
+    finally:
+        for worker in workers:
+            if worker.poll() is None:
+                worker.kill()
+
+    latencies = [sample["single_p95_seconds"] for sample in samples if sample["single_p95_seconds"] is not None]
+    return {
+        "processes": processes,
+        "executor_threads": executor_threads,
+        "blas_threads": blas_threads or cores,
+        "legacy": combination == LEGACY,
+        "active_threads": processes * executor_threads * (blas_threads or cores),
+        "rows_per_second": round(sum(sample["rows"] / sample["seconds"] for sample in samples), 1),
+        "single_p95_ms": round(max(latencies) * 1000, 2) if latencies else None
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from core.config import settings
+    from core.threading_policy import available_cores
+
+    parser = argparse.ArgumentParser(description="Calibra procesos × executor × BLAS para este host")
+    parser.add_argument("--rows", type=int, default=1000, help="Filas de cada dataset en vuelo")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duración de la medición por combinación")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=Path(settings.THREADING_POLICY_FILE))
+    parser.add_argument("--dry-run", action="store_true", help="Solo listar las combinaciones")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        probe(args.rows, args.seconds, args.seed)
+        return 0
+
+    cores = available_cores()
+    candidates = combinations(cores)
+    print(f"🧵 {cores} núcleos disponibles: {len(candidates)} combinaciones de procesos × executor × BLAS")
+    if args.dry_run:
+        for processes, executor_threads, blas_threads in candidates:
+            print(f"   {processes} × {executor_threads} × {blas_threads or cores}")
+        return 0
+
+    results = []
+    for combination in candidates:
+        result = measure(combination, args.rows, args.seconds, args.seed, cores)
+        results.append(result)
+        print(f"   {result['processes']} × {result['executor_threads']:>2} × {result['blas_threads']:>2} "
+              f"({result['active_threads']:>3} hilos): {result['rows_per_second']:>10.1f} filas/s  "
+              f"p95 individual {result['single_p95_ms']} ms{'  (anterior)' if result['legacy'] else ''}")
+
+    # La mejor combinación de la política nueva; a igual throughput (±2%), la de menos hilos
+    eligible = [result for result in results if not result["legacy"]]
+    top = max(result["rows_per_second"] for result in eligible)
+    best = min((result for result in eligible if result["rows_per_second"] >= 0.98 * top),
+               key=lambda result: (result["active_threads"], -result["rows_per_second"]))
+    legacy = next(result for result in results if result["legacy"])
+
+    report = {
+        "cores": cores,
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "processor": platform.processor()},
+        "measured_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "rows": args.rows,
+        "seconds": args.seconds,
+        "best": {key: best[key] for key in ("processes", "executor_threads", "blas_threads")},
+        "results": results
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n✅ Mejor: {best['processes']} procesos × {best['executor_threads']} hilos × {best['blas_threads']} BLAS "
+          f"({best['rows_per_second']:.1f} filas/s, {best['rows_per_second'] / legacy['rows_per_second']:.2f}x la anterior)")
+    print(f"💾 Política guardada en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,211 @@
+"""
+Control de Admisión para Uploads de Dataset
+==========================================
+
+Limita el trabajo de dataset en vuelo por proceso con un presupuesto en
+bytes (el `Content-Length` del upload, conocido antes de leer el cuerpo
+y proporcional a las filas y a la memoria que ocupará la respuesta):
+
+- Un upload mayor que `MAX_FILE_SIZE_MB` se rechaza con 413 sin leerlo.
+- Si cabe en el presupuesto libre (y no hay cola) se admite.
+- Si no, espera en una cola FIFO de hasta `ADMISSION_MAX_QUEUE`
+  peticiones durante `ADMISSION_QUEUE_TIMEOUT_SECONDS`; con la cola
+  llena o al vencer la espera se rechaza con 503 y `Retry-After`.
+- Un upload mayor que todo el presupuesto (pero dentro del límite de
+  archivo) se admite solo, sin otros en vuelo: nunca queda bloqueado.
+- Con plazo (`X-Request-Deadline`) la espera no lo excede: al vencer se
+  responde 504 en lugar de admitir trabajo que nadie va a recibir.
+
+Mientras una petición espera, su cuerpo no se lee: el cliente queda
+frenado por TCP en lugar de ocupar memoria. La predicción individual no
+pasa por aquí (tiene además su propio hilo en el predictor). Con varios
+workers el presupuesto es por worker.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from core import metrics
+from core.config import settings
+
+MB = 1024 * 1024
+SERVICE_TIME_SMOOTHING = 0.2  # Peso de la última duración en el promedio móvil
+MAX_RETRY_AFTER_SECONDS = 60
+
+class AdmissionRejected(Exception):
+    """Petición no admitida: se responde con `status_code` y, si aplica, `Retry-After`."""
+
+    def __init__(self, reason: str, status_code: int, message: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.reason = reason
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)} if self.retry_after else {}
+
+class AdmissionController:
+    """
+    Presupuesto de bytes en vuelo con cola FIFO acotada.
+
+    Toda la contabilidad ocurre en el event loop (sin locks): se reserva al
+    admitir y se libera al terminar, despertando a los primeros de la cola
+    que quepan (en orden, para no postergar indefinidamente a los grandes).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_inflight_bytes: int,
+        max_request_bytes: int,
+        max_queue: int,
+        queue_timeout: float
+    ):
+        self.name = name
+        self.max_inflight_bytes = max_inflight_bytes
+        self.max_request_bytes = max_request_bytes
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self.in_flight_bytes = 0
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        self._service_seconds: Optional[float] = None
+        self._outcomes: Dict[str, int] = {}
+
+        metrics.admission_in_flight_bytes.set_function(lambda: self.in_flight_bytes, controller=name)
+        metrics.admission_queue_depth.set_function(lambda: len(self._waiters), controller=name)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(self, size: int, max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Reserva `size` bytes del presupuesto durante el bloque.
+
+        Args:
+            max_wait: Segundos que quedan del plazo de la petición (None = sin plazo)
+
+        Raises:
+            AdmissionRejected: Upload demasiado grande, cola llena, espera o plazo vencidos
+        """
+        if size > self.max_request_bytes:
+            self._reject("too_large", 413, f"El archivo supera el máximo de {self.max_request_bytes / MB:g} MB")
+        if max_wait is not None and max_wait <= 0:
+            self._reject("deadline", 504, "El plazo de la petición venció antes de admitirla")
+
+        started = time.perf_counter()
+        if not self._waiters and self._fits(size):
+            self._take(size)
+            self._record("admitted")
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self._reject("queue_full", 503, "Servidor ocupado procesando otros datasets", self.retry_after())
+            await self._wait(size, max_wait)
+            self._record("admitted_after_queue")
+        metrics.admission_wait.observe(time.perf_counter() - started, controller=self.name)
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(size, time.perf_counter() - started)
+
+    async def _wait(self, size: int, max_wait: Optional[float]) -> None:
+        """Espera en la cola; al salir, los bytes ya quedaron reservados por quien liberó."""
+        deadline_bound = max_wait is not None and max_wait < self.queue_timeout
+        entry = (size, asyncio.get_running_loop().create_future())
+        self._waiters.append(entry)
+        try:
+            await asyncio.wait_for(entry[1], max_wait if deadline_bound else self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(entry)
+            if deadline_bound:
+                self._reject("deadline", 504, "El plazo de la petición venció esperando en cola")
+            self._reject("queue_timeout", 503, "Tiempo de espera en cola agotado", self.retry_after())
+        except asyncio.CancelledError:
+            # Cliente desconectado: si ya se le había asignado cupo, se devuelve
+            if entry[1].done() and not entry[1].cancelled():
+                self._release(size, None)
+            else:
+                self._discard(entry)
+            raise
+
+    def _discard(self, entry: Tuple[int, asyncio.Future]) -> None:
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+        self._wake()
+
+    def _fits(self, size: int) -> bool:
+        return self.in_flight == 0 or self.in_flight_bytes + size <= self.max_inflight_bytes
+
+    def _take(self, size: int) -> None:
+        self.in_flight += 1
+        self.in_flight_bytes += size
+
+    def _release(self, size: int, service_seconds: Optional[float]) -> None:
+        self.in_flight -= 1
+        self.in_flight_bytes -= size
+        if service_seconds is not None:
+            self._service_seconds = service_seconds if self._service_seconds is None else (
+                SERVICE_TIME_SMOOTHING * service_seconds + (1 - SERVICE_TIME_SMOOTHING) * self._service_seconds
+            )
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admite en orden a los primeros de la cola que quepan."""
+        while self._waiters and self._fits(self._waiters[0][0]):
+            size, future = self._waiters.popleft()
+            if future.done():
+                continue
+            self._take(size)
+            future.set_result(True)
+
+    def retry_after(self) -> int:
+        """Segundos estimados hasta que haya cupo: duración media × (cola + 1) / en vuelo."""
+        service = self._service_seconds or 1.0
+        estimate = service * (len(self._waiters) + 1) / max(1, self.in_flight)
+        return max(1, min(MAX_RETRY_AFTER_SECONDS, math.ceil(estimate)))
+
+    def _reject(self, reason: str, status_code: int, message: str, retry_after: Optional[int] = None) -> None:
+        self._record(f"rejected_{reason}")
+        raise AdmissionRejected(reason, status_code, message, retry_after)
+
+    def _record(self, outcome: str) -> None:
+        self._outcomes[outcome] = self._outcomes.get(outcome, 0) + 1
+        metrics.admission_decisions.inc(controller=self.name, outcome=outcome)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_inflight_bytes": self.max_inflight_bytes,
+            "max_request_bytes": self.max_request_bytes,
+            "max_queue": self.max_queue,
+            "queue_timeout_seconds": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "in_flight_bytes": self.in_flight_bytes,
+            "queued": len(self._waiters),
+            "mean_service_seconds": None if self._service_seconds is None else round(self._service_seconds, 3),
+            "outcomes": dict(self._outcomes)
+        }
+
+# Admisión de /predict-dataset (Singleton pattern)
+dataset_admission = AdmissionController(
+    "predict_dataset",
+    max_inflight_bytes=int(settings.ADMISSION_MAX_INFLIGHT_MB * MB),
+    max_request_bytes=int(settings.MAX_FILE_SIZE_MB * MB),
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
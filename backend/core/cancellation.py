@@ -0,0 +1,188 @@
+"""
+Plazos y Cancelación por Petición
+================================
+
+Propaga por el pipeline (vía contextvars) cuándo deja de tener sentido
+seguir trabajando en una petición:
+
+- plazo: cabecera `X-Request-Deadline` (segundos desde la llegada, o
+  instante Unix absoluto si el valor es mayor que 10⁹), acotada por
+  `REQUEST_DEADLINE_SECONDS` si está configurado
+- desconexión del cliente: los middlewares `@app.middleware("http")`
+  (BaseHTTPMiddleware) no dejan llegar `http.disconnect` al handler, así
+  que `DisconnectProbe` (el middleware más externo) deja en el scope una
+  verificación sobre el `receive` del servidor
+
+El predictor consulta el alcance antes de cada chunk y, mientras espera
+un chunk, cada `CANCELLATION_POLL_SECONDS`: si la petición se abandonó
+cancela el futuro pendiente en el executor (si aún no empezó, no llega a
+ejecutarse) y no envía los chunks restantes. El trabajo se libera en a
+lo sumo un chunk (el que ya estuviera corriendo en un hilo).
+
+Uso en un endpoint (el handler debe declarar `request: Request`):
+
+    @app.post("/ruta")
+    @logged_request("nombre", logger)
+    @timed_endpoint
+    @cancellable
+    async def handler(request: Request, ...):
+        ...
+        await check_cancelled()
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import asyncio
+import contextvars
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from core import metrics
+from core.config import settings
+
+DEADLINE_HEADER = "X-Request-Deadline"
+ABSOLUTE_DEADLINE_THRESHOLD = 1e9  # Valores mayores son instantes Unix, no duraciones
+CANCELLATION_POLL_SECONDS = 0.1
+# 499: convención (nginx) para "el cliente cerró la conexión"; nadie recibe la respuesta
+CLIENT_CLOSED_STATUS = 499
+DISCONNECT_PROBE_KEY = "predictscore.is_disconnected"
+
+class RequestCancelled(Exception):
+    """La petición venció su plazo o el cliente se desconectó."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    @property
+    def status_code(self) -> int:
+        return 504 if self.reason == "deadline_exceeded" else CLIENT_CLOSED_STATUS
+
+class CancellationScope:
+    """Plazo (reloj monotónico) y verificación de desconexión de una petición."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        deadline: Optional[float] = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None
+    ):
+        self.endpoint = endpoint
+        self.deadline = deadline
+        self._is_disconnected = is_disconnected
+
+    def remaining(self) -> Optional[float]:
+        """Segundos hasta el plazo (None si no hay plazo)."""
+        return None if self.deadline is None else self.deadline - time.monotonic()
+
+    async def check(self) -> None:
+        """
+        Raises:
+            RequestCancelled: Plazo vencido o cliente desconectado
+        """
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self._cancel("deadline_exceeded")
+        if self._is_disconnected is not None and await self._is_disconnected():
+            self._cancel("client_disconnected")
+
+    def _cancel(self, reason: str) -> None:
+        metrics.requests_cancelled.inc(endpoint=self.endpoint, reason=reason)
+        raise RequestCancelled(reason)
+
+_current_scope: contextvars.ContextVar[Optional[CancellationScope]] = contextvars.ContextVar(
+    "cancellation_scope", default=None
+)
+
+class DisconnectProbe:
+    """
+    Middleware ASGI que publica en `scope[DISCONNECT_PROBE_KEY]` la
+    verificación de desconexión sobre el `receive` original del servidor.
+    Debe agregarse después de los demás (queda como el más externo).
+
+    Solo se consulta después de leer el cuerpo (FastAPI lo lee antes de
+    invocar el handler), cuando el único mensaje pendiente es la desconexión.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]) -> None:
+        if scope["type"] == "http":
+            scope[DISCONNECT_PROBE_KEY] = Request(scope, receive).is_disconnected
+        await self.app(scope, receive, send)
+
+def parse_deadline(value: Optional[str], default_seconds: float = 0.0) -> Optional[float]:
+    """
+    Plazo en reloj monotónico a partir de la cabecera (duración o instante
+    Unix) y del máximo del servidor; None si no hay ninguno.
+
+    Raises:
+        ValueError: Cabecera no numérica
+    """
+    budgets = []
+    if value:
+        seconds = float(value)
+        budgets.append(seconds - time.time() if seconds > ABSOLUTE_DEADLINE_THRESHOLD else seconds)
+    if default_seconds > 0:
+        budgets.append(default_seconds)
+    return time.monotonic() + min(budgets) if budgets else None
+
+def current_scope() -> Optional[CancellationScope]:
+    return _current_scope.get()
+
+async def check_cancelled() -> None:
+    """Verifica el alcance de la petición actual (no hace nada fuera de `@cancellable`)."""
+    scope = _current_scope.get()
+    if scope is not None:
+        await scope.check()
+
+async def await_cancellable(future: "asyncio.Future[Any]") -> Any:
+    """
+    Espera un futuro (p. ej. de `run_in_executor`) verificando el alcance
+    periódicamente; si la petición se abandona, cancela el futuro.
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return await future
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=CANCELLATION_POLL_SECONDS)
+        if done:
+            return future.result()
+        try:
+            await scope.check()
+        except RequestCancelled:
+            future.cancel()
+            raise
+
+def cancellable(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorador para endpoints async: abre el alcance de cancelación con el
+    plazo de `X-Request-Deadline` y la desconexión del cliente, y responde
+    504 (plazo) o 499 (cliente desconectado) si el pipeline se interrumpe.
+
+    Conserva la firma original (FastAPI la inspecciona vía `__wrapped__`).
+    """
+    @functools.wraps(handler)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        request = kwargs["request"]
+        try:
+            deadline = parse_deadline(request.headers.get(DEADLINE_HEADER), settings.REQUEST_DEADLINE_SECONDS)
+        except ValueError:
+            return JSONResponse(status_code=400, content={"detail": f"{DEADLINE_HEADER} debe ser numérica"})
+
+        is_disconnected = request.scope.get(DISCONNECT_PROBE_KEY, request.is_disconnected)
+        scope = CancellationScope(request.url.path, deadline, is_disconnected)
+        token = _current_scope.set(scope)
+        try:
+            return await handler(*args, **kwargs)
+        except RequestCancelled as e:
+            return JSONResponse(status_code=e.status_code, content={"detail": {"error": "Petición cancelada", "reason": e.reason}})
+        finally:
+            _current_scope.reset(token)
+
+    return wrapper
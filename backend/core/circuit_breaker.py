@@ -0,0 +1,197 @@
+"""
+Circuit Breaker para Servicios Externos
+======================================
+
+Protege las llamadas a proveedores externos (OpenAI) siguiendo el
+patrón Circuit Breaker: mide la tasa de error y la latencia en una
+ventana deslizante y, cuando superan los umbrales, abre el circuito
+para que las peticiones vayan directamente al fallback.
+
+Estados:
+- closed: las llamadas pasan normalmente
+- open: las llamadas se rechazan sin contactar al proveedor
+- half_open: se permiten unas pocas llamadas de prueba (probes); si no
+  concluyen en `half_open_seconds` se vuelve a open
+
+Cada llamada admitida debe terminar en `record_success`, `record_failure`
+o, si no hubo veredicto (p. ej. el cliente abandonó), `release_probe`.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Circuit breaker thread-safe con ventana deslizante de llamadas.
+
+    Una llamada cuenta como fallo si lanza una excepción o si su latencia
+    supera `slow_call_seconds`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 2,
+        half_open_seconds: float = 60.0
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.half_open_seconds = half_open_seconds
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._calls: Deque[Tuple[bool, float]] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._rejected = 0
+        self._transitions = 0
+
+    @property
+    def state(self) -> str:
+        """Estado actual (aplica la transición open -> half_open si corresponde)."""
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Indica si la llamada puede ir al proveedor.
+
+        Returns:
+            bool: False si el circuito está abierto o sin cupo de probes
+        """
+        with self._lock:
+            self._refresh_state()
+
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+
+            self._rejected += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        """Registra una llamada completada (si es lenta cuenta como fallo)."""
+        if latency > self.slow_call_seconds:
+            self.record_failure(latency)
+            return
+
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._transition(self.CLOSED)
+                return
+
+            self._calls.append((True, latency))
+
+    def record_failure(self, latency: float) -> None:
+        """Registra una llamada fallida o que excedió el umbral de latencia."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                # Cualquier fallo durante las pruebas vuelve a abrir el circuito
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._transition(self.OPEN)
+                return
+
+            self._calls.append((False, latency))
+
+            if self._state == self.CLOSED and self._should_open():
+                self._transition(self.OPEN)
+
+    def release_probe(self) -> None:
+        """Libera el cupo de una llamada admitida que terminó sin veredicto."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado del breaker para endpoints de salud."""
+        with self._lock:
+            self._refresh_state()
+            total = len(self._calls)
+            failures = sum(1 for ok, _ in self._calls if not ok)
+            latencies = sorted(latency for _, latency in self._calls)
+
+            return {
+                "name": self.name,
+                "state": self._state,
+                "window_calls": total,
+                "failure_rate": round(failures / total, 3) if total else 0.0,
+                "p50_latency_seconds": round(latencies[total // 2], 3) if total else None,
+                "max_latency_seconds": round(latencies[-1], 3) if total else None,
+                "rejected_calls": self._rejected,
+                "transitions": self._transitions,
+                "retry_in_seconds": (
+                    round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 1)
+                    if self._state == self.OPEN else 0.0
+                ),
+                "thresholds": {
+                    "failure_rate": self.failure_rate_threshold,
+                    "slow_call_seconds": self.slow_call_seconds,
+                    "min_calls": self.min_calls,
+                    "open_seconds": self.open_seconds,
+                    "half_open_seconds": self.half_open_seconds
+                }
+            }
+
+    def _should_open(self) -> bool:
+        """Evalúa la ventana deslizante contra el umbral de error."""
+        total = len(self._calls)
+        if total < self.min_calls:
+            return False
+        failures = sum(1 for ok, _ in self._calls if not ok)
+        return failures / total >= self.failure_rate_threshold
+
+    def _refresh_state(self) -> None:
+        """Pasa de open a half_open al expirar la espera, y de vuelta a open si las pruebas no concluyen."""
+        now = time.monotonic()
+        if self._state == self.OPEN and now - self._opened_at >= self.open_seconds:
+            self._transition(self.HALF_OPEN)
+        elif self._state == self.HALF_OPEN and now - self._half_opened_at >= self.half_open_seconds:
+            self._transition(self.OPEN)
+
+    def _transition(self, new_state: str) -> None:
+        """Cambia de estado reiniciando los contadores asociados."""
+        if new_state == self._state:
+            return
+
+        logger.warning(f"Circuit breaker '{self.name}': {self._state} -> {new_state}")
+        self._state = new_state
+        self._transitions += 1
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        if new_state == self.OPEN:
+            self._opened_at = time.monotonic()
+        elif new_state == self.HALF_OPEN:
+            self._half_opened_at = time.monotonic()
+        elif new_state == self.CLOSED:
+            self._calls.clear()
@@ -13,6 +13,11 @@ import os
 from typing import List
 from pathlib import Path
 
+from dotenv import load_dotenv
+
+# Cargar variables de entorno antes de leerlas en Settings (todo módulo que importe la configuración ve el .env)
+load_dotenv()
+
 class Settings:
     """
     Configuración centralizada de la aplicación.
@@ -78,9 +83,74 @@ class Settings:
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     OPENAI_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "150"))
     OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
-    
+    OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "15"))
+    OPENAI_LATENCY_BUDGET_SECONDS = float(os.getenv("OPENAI_LATENCY_BUDGET_SECONDS", "4"))
+    OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+    OPENAI_CACHE_SIZE = int(os.getenv("OPENAI_CACHE_SIZE", "256"))
+    OPENAI_CACHE_TTL_SECONDS = float(os.getenv("OPENAI_CACHE_TTL_SECONDS", "3600"))
+
+    # Circuit breaker del proveedor de IA
+    BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+    BREAKER_SLOW_CALL_SECONDS = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "4"))
+    BREAKER_WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW_SIZE", "20"))
+    BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+    BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+    BREAKER_HALF_OPEN_PROBES = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "2"))
+    BREAKER_HALF_OPEN_SECONDS = float(os.getenv("BREAKER_HALF_OPEN_SECONDS", "60"))
+
+    # Logging de rutas críticas (token bucket)
+    HOT_LOG_RATE_PER_SECOND = float(os.getenv("HOT_LOG_RATE_PER_SECOND", "5"))
+    HOT_LOG_BURST = float(os.getenv("HOT_LOG_BURST", "20"))
+
+    # Métricas (directorio compartido entre workers para agregarlas en /metrics)
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+    # Profiler opcional (cabecera X-Profile o umbral de latencia)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SLOW_REQUEST_SECONDS = float(os.getenv("PROFILING_SLOW_REQUEST_SECONDS", "0"))
+    PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "5"))
+    PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", "20"))
+    PROFILING_DIR = os.getenv("PROFILING_DIR", str(PROJECT_ROOT / "backend" / "profiles"))
+
+    # Endpoints de administración (vacío = deshabilitados)
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+    # Warm-up de arranque (readiness en /health/ready recién al terminar)
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_BATCH_ROWS = int(os.getenv("WARMUP_BATCH_ROWS", "2000"))
+
+    # Objetivo de arranque de un worker hasta readiness (advertencia en el log y presupuesto del benchmark)
+    WORKER_BOOT_BUDGET_SECONDS = float(os.getenv("WORKER_BOOT_BUDGET_SECONDS", "5"))
+
+    # Servir el modelo desde arreglos .npy mapeados en memoria (false = siempre pickles)
+    MODEL_ARRAYS_ENABLED = os.getenv("MODEL_ARRAYS_ENABLED", "true").lower() == "true"
+
+    # Recarga en caliente del modelo: intervalo de vigilancia del registro (0 = solo vía /admin)
+    MODEL_RELOAD_WATCH_SECONDS = float(os.getenv("MODEL_RELOAD_WATCH_SECONDS", "0"))
+
+    # Servidor multi-worker (serve.py): workers por maestro (0 = según la política de hilos) y plazo de cierre ordenado
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "0"))
+    SERVER_GRACEFUL_TIMEOUT_SECONDS = float(os.getenv("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+
+    # Política de hilos (core/threading_policy.py): 0 = automático según núcleos y procesos
+    THREAD_EXECUTOR_THREADS = int(os.getenv("THREAD_EXECUTOR_THREADS", "0"))
+    THREAD_PRIORITY_THREADS = int(os.getenv("THREAD_PRIORITY_THREADS", "0"))
+    THREAD_BLAS_THREADS = int(os.getenv("THREAD_BLAS_THREADS", "0"))
+    THREADING_POLICY_FILE = os.getenv(
+        "THREADING_POLICY_FILE", str(PROJECT_ROOT / "backend" / "benchmarks" / "results" / "threading_policy.json")
+    )
+
     # File upload settings
-    MAX_FILE_SIZE_MB = 10
+    MAX_FILE_SIZE_MB = float(os.getenv("MAX_FILE_SIZE_MB", "10"))
+
+    # Control de admisión de /predict-dataset (por worker): bytes en vuelo, cola y espera máxima
+    ADMISSION_MAX_INFLIGHT_MB = float(os.getenv("ADMISSION_MAX_INFLIGHT_MB", "16"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "4"))
+    ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+
+    # Plazo máximo de /predict-dataset (además de la cabecera X-Request-Deadline; 0 = sin plazo)
+    REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "0"))
     ALLOWED_FILE_TYPES = [".csv"]
     UPLOAD_DIR = "uploads"
     
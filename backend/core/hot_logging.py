@@ -0,0 +1,180 @@
+"""
+Logging de Rutas Críticas (Hot Paths)
+====================================
+
+Logging con límite de tasa y agregación para código que se ejecuta por
+fila o por chunk. En lugar de un registro formateado por evento:
+
+- Cada evento incrementa un contador por tipo (global y por petición)
+- Un token bucket limita cuántos registros se emiten realmente
+- El formateo es perezoso (estilo `%`): solo se formatea lo que se emite
+- Al cerrar la petición se emite un único resumen con los contadores
+
+Así el costo de logging de una carga grande es O(1) en registros.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import contextvars
+import functools
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from core.config import settings
+
+class TokenBucket:
+    """
+    Token bucket thread-safe.
+
+    Se recargan `rate` tokens por segundo hasta un máximo de `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Consume un token si hay disponible."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+class RequestLogScope:
+    """Contadores de eventos de una petición (compartidos entre hilos del executor)."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.events: Counter = Counter()
+        self.suppressed = 0
+        self._lock = threading.Lock()
+
+    def record(self, event: str, emitted: bool) -> None:
+        """Cuenta un evento y si fue suprimido por el rate limit."""
+        with self._lock:
+            self.events[event] += 1
+            if not emitted:
+                self.suppressed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Resumen de eventos de la petición."""
+        with self._lock:
+            return {"events": dict(self.events), "suppressed": self.suppressed}
+
+_current_scope: contextvars.ContextVar[Optional[RequestLogScope]] = contextvars.ContextVar(
+    "hot_log_scope", default=None
+)
+
+class HotPathLogger:
+    """
+    Envoltorio de `logging.Logger` para rutas críticas.
+
+    Uso:
+        hot_log = HotPathLogger(logger)
+        hot_log.event("chunk", logging.INFO, "Chunk %d: %d filas", index, size)
+    """
+
+    def __init__(self, logger: logging.Logger, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.logger = logger
+        self._bucket = TokenBucket(
+            rate if rate is not None else settings.HOT_LOG_RATE_PER_SECOND,
+            burst if burst is not None else settings.HOT_LOG_BURST
+        )
+        self._totals: Counter = Counter()
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def event(self, event: str, level: int, msg: str, *args: Any) -> bool:
+        """
+        Registra un evento y lo emite si el nivel está habilitado y hay tokens.
+
+        Args:
+            event: Tipo de evento (clave de agregación)
+            level: Nivel de logging
+            msg: Mensaje con marcadores `%` (formateo perezoso)
+            *args: Argumentos del mensaje
+
+        Returns:
+            bool: True si el registro se emitió
+        """
+        emitted = self.logger.isEnabledFor(level) and self._bucket.try_acquire()
+        if emitted:
+            self.logger.log(level, msg, *args)
+
+        with self._lock:
+            self._totals[event] += 1
+            if not emitted:
+                self._suppressed += 1
+
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.record(event, emitted)
+        return emitted
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Contadores acumulados desde el arranque."""
+        with self._lock:
+            return {"events": dict(self._totals), "suppressed": self._suppressed}
+
+@contextmanager
+def request_scope(name: str, logger: Optional[logging.Logger] = None) -> Iterator[RequestLogScope]:
+    """
+    Agrupa los eventos de una petición y emite un resumen al terminar.
+
+    Args:
+        name: Nombre de la operación (aparece en el resumen)
+        logger: Logger para el resumen (por defecto el de este módulo)
+    """
+    scope = RequestLogScope(name)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+        if scope.events:
+            (logger or logging.getLogger(__name__)).info(
+                "📋 Resumen de eventos (%s): %s; registros suprimidos: %d",
+                name, dict(scope.events), scope.suppressed
+            )
+
+def logged_request(name: str, logger: Optional[logging.Logger] = None) -> Callable[..., Any]:
+    """
+    Decorador para endpoints async: ejecuta el handler dentro de `request_scope`.
+
+    Conserva la firma original (FastAPI la inspecciona vía `__wrapped__`).
+    """
+    def decorator(handler: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(handler)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with request_scope(name, logger):
+                return await handler(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def in_current_context(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Envuelve una función para ejecutarla en el contexto actual.
+
+    `loop.run_in_executor` no propaga contextvars; con este envoltorio los
+    eventos de los hilos del executor se cuentan en la petición que los lanzó.
+    """
+    context = contextvars.copy_context()
+
+    def runner(*args: Any, **kwargs: Any) -> Any:
+        # Una copia por llamada: un mismo Context no puede entrarse desde dos hilos
+        return context.copy().run(func, *args, **kwargs)
+
+    return runner
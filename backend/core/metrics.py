@@ -0,0 +1,510 @@
+"""
+Métricas Estilo Prometheus
+=========================
+
+Subsistema de métricas sin dependencias externas, expuesto en formato de
+texto de Prometheus (exposition format 0.0.4) por el endpoint `/metrics`.
+
+Tipos soportados:
+- Counter: contadores monotónicos
+- Histogram: buckets acumulados + suma + conteo
+- Gauge: valores instantáneos (fijos o calculados al hacer scrape)
+
+Concurrencia:
+- Counters e histogramas usan shards por hilo: cada hilo escribe solo en
+  su propio diccionario (sin locks en el camino caliente) y el scrape
+  suma todos los shards.
+- Con varios procesos (workers), si `METRICS_MULTIPROC_DIR` está
+  configurado cada proceso vuelca periódicamente su estado a un archivo
+  JSON y `/metrics` agrega los archivos de todos los procesos. Los
+  gauges son del proceso que atiende el scrape (etiqueta `pid`); las
+  series `predictscore_worker_*` distinguen a cada worker de `serve.py`.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from core.config import settings
+from core.worker import process_memory
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+class _Metric:
+    """Base común: nombre, ayuda y etiquetas."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        """Valores de etiqueta en el orden declarado."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Etiquetas inválidas para {self.name}: {sorted(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+class _ShardedMetric(_Metric):
+    """Métrica con un shard por hilo (escritura sin locks)."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict[LabelValues, Any]] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[LabelValues, Any]:
+        """Shard del hilo actual (se registra la primera vez)."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _all_shards(self) -> List[Dict[LabelValues, Any]]:
+        """Copias de todos los shards (dict.copy es atómico bajo el GIL)."""
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+class Counter(_ShardedMetric):
+    """Contador monotónico."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Incrementa el contador."""
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def collect(self) -> Dict[LabelValues, float]:
+        """Suma de todos los shards por combinación de etiquetas."""
+        totals: Dict[LabelValues, float] = {}
+        for shard in self._all_shards():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def value(self, **labels: Any) -> float:
+        """Valor actual para una combinación de etiquetas."""
+        return self.collect().get(self._key(labels), 0.0)
+
+class Histogram(_ShardedMetric):
+    """Histograma con buckets acumulados."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Registra una observación."""
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [conteos por bucket (no acumulados)..., +Inf, suma]
+            state = [0] * (len(self.buckets) + 1) + [0.0]
+            shard[key] = state
+
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        state[index] += 1
+        state[-1] += value
+
+    def collect(self) -> Dict[LabelValues, List[float]]:
+        """Estado agregado por combinación de etiquetas (no acumulado)."""
+        totals: Dict[LabelValues, List[float]] = {}
+        for shard in self._all_shards():
+            for key, state in shard.items():
+                state = list(state)
+                current = totals.get(key)
+                if current is None:
+                    totals[key] = state
+                else:
+                    totals[key] = [a + b for a, b in zip(current, state)]
+        return totals
+
+class Gauge(_Metric):
+    """Valor instantáneo; puede calcularse al hacer scrape con `set_function`."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: Any) -> None:
+        """Fija el valor."""
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Incrementa el valor."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Decrementa el valor."""
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels: Any) -> None:
+        """Registra una función evaluada en cada scrape."""
+        with self._lock:
+            self._functions[self._key(labels)] = function
+
+    def collect(self) -> Dict[LabelValues, float]:
+        """Valores actuales (incluye los calculados)."""
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = float(function())
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} no disponible: {e}")
+        return values
+
+class MetricsRegistry:
+    """
+    Registro de métricas con exposición en texto y agregación multiproceso.
+    """
+
+    def __init__(self, multiproc_dir: Optional[str] = None, flush_seconds: float = 5.0):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self.multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self.flush_seconds = flush_seconds
+        self._flusher: Optional[threading.Thread] = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Registra una métrica (el nombre debe ser único)."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrica duplicada: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    # === MULTIPROCESO ===
+
+    def start_flusher(self) -> None:
+        """Inicia el volcado periódico del estado local (solo en modo multiproceso)."""
+        if self.multiproc_dir is None or self._flusher is not None:
+            return
+        self.multiproc_dir.mkdir(parents=True, exist_ok=True)
+
+        def loop() -> None:
+            while True:
+                time.sleep(self.flush_seconds)
+                self.flush()
+
+        self._flusher = threading.Thread(target=loop, name="metrics-flusher", daemon=True)
+        self._flusher.start()
+
+    def flush(self) -> None:
+        """Escribe el estado de este proceso en `<dir>/metrics_<pid>.json` (escritura atómica)."""
+        if self.multiproc_dir is None:
+            return
+        path = self.multiproc_dir / f"metrics_{os.getpid()}.json"
+        temporary = path.with_suffix(".tmp")
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self._local_state(), f)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.warning(f"No se pudieron volcar métricas a {path}: {e}")
+
+    def _local_state(self) -> Dict[str, Any]:
+        """Estado serializable de counters e histogramas de este proceso."""
+        state = {}
+        for metric in self._snapshot_metrics():
+            if isinstance(metric, (Counter, Histogram)):
+                state[metric.name] = [[list(key), value] for key, value in metric.collect().items()]
+        return state
+
+    def _merged_state(self, only: Optional[_Metric] = None) -> Dict[str, Dict[LabelValues, Any]]:
+        """Estado de este proceso sumado al de los demás procesos del directorio (o solo el de `only`)."""
+        merged: Dict[str, Dict[LabelValues, Any]] = {}
+        for metric in ([only] if only is not None else self._snapshot_metrics()):
+            if isinstance(metric, (Counter, Histogram)):
+                merged[metric.name] = metric.collect()
+
+        if self.multiproc_dir is None or not self.multiproc_dir.exists():
+            return merged
+
+        own_file = f"metrics_{os.getpid()}.json"
+        for path in self.multiproc_dir.glob("metrics_*.json"):
+            if path.name == own_file:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    other = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, entries in other.items():
+                target = merged.get(name)
+                if target is None:
+                    continue
+                for key, value in entries:
+                    key = tuple(key)
+                    current = target.get(key)
+                    if current is None:
+                        target[key] = value
+                    elif isinstance(current, list):
+                        target[key] = [a + b for a, b in zip(current, value)]
+                    else:
+                        target[key] = current + value
+        return merged
+
+    # === EXPOSICIÓN ===
+
+    def render(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus."""
+        merged = self._merged_state()
+        lines: List[str] = []
+
+        for metric in self._snapshot_metrics():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            if isinstance(metric, Histogram):
+                for key, state in sorted(merged.get(metric.name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip((*metric.buckets, float("inf")), state[:-1]):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _format_value(bound)
+                        labels = _format_labels(metric.labelnames + ("le",), key + (le,))
+                        lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(metric.labelnames, key)
+                    lines.append(f"{metric.name}_sum{labels} {_format_value(state[-1])}")
+                    lines.append(f"{metric.name}_count{labels} {cumulative}")
+            elif isinstance(metric, Counter):
+                for key, value in sorted(merged.get(metric.name, {}).items()):
+                    lines.append(f"{metric.name}_total{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+            else:
+                for key, value in sorted(metric.collect().items()):
+                    labels = _format_labels(metric.labelnames + ("pid",), key + (str(os.getpid()),))
+                    lines.append(f"{metric.name}{labels} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+    def histogram_summary(self, histogram: Histogram) -> Dict[LabelValues, Dict[str, Any]]:
+        """
+        Resumen de un histograma por combinación de etiquetas (todos los procesos):
+        conteo, suma, media, buckets acumulados y percentiles aproximados (límite
+        superior del bucket que contiene el cuantil; None si cae en +Inf).
+        """
+        summary = {}
+        for key, state in sorted(self._merged_state(histogram).get(histogram.name, {}).items()):
+            cumulative: List[float] = []
+            running = 0
+            for count in state[:-1]:
+                running += count
+                cumulative.append(running)
+            observations, total = cumulative[-1], state[-1]
+
+            def quantile(q: float) -> Optional[float]:
+                if not observations:
+                    return None
+                index = next(i for i, value in enumerate(cumulative) if value >= q * observations)
+                return histogram.buckets[index] if index < len(histogram.buckets) else None
+
+            summary[key] = {
+                "count": int(observations),
+                "sum_seconds": round(total, 6),
+                "mean_seconds": round(total / observations, 6) if observations else 0.0,
+                "buckets": {
+                    **{str(bound): int(cumulative[i]) for i, bound in enumerate(histogram.buckets)},
+                    "+Inf": int(observations)
+                },
+                "p50_seconds": quantile(0.50),
+                "p95_seconds": quantile(0.95),
+                "p99_seconds": quantile(0.99)
+            }
+        return summary
+
+    def _snapshot_metrics(self) -> Iterable[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Etiquetas en formato `{a="x",b="y"}` con escapes."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: float) -> str:
+    """Número en formato Prometheus."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+# Registro global (Singleton pattern)
+registry = MetricsRegistry(settings.METRICS_MULTIPROC_DIR or None, settings.METRICS_FLUSH_SECONDS)
+
+# === MÉTRICAS DE LA APLICACIÓN ===
+
+http_request_duration = registry.histogram(
+    "predictscore_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por endpoint",
+    ("method", "endpoint", "status")
+)
+http_requests = registry.counter(
+    "predictscore_http_requests",
+    "Peticiones HTTP atendidas",
+    ("method", "endpoint", "status")
+)
+rows_predicted = registry.counter(
+    "predictscore_rows_predicted",
+    "Filas (estudiantes) predichas",
+    ("source",)
+)
+chunk_duration = registry.histogram(
+    "predictscore_prediction_chunk_duration_seconds",
+    "Duración de cada chunk de predicción en el executor",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+stage_duration = registry.histogram(
+    "predictscore_stage_duration_seconds",
+    "Duración por etapa del pipeline de predicción",
+    ("stage",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+cache_requests = registry.counter(
+    "predictscore_cache_requests",
+    "Consultas a caches por resultado (hit/miss)",
+    ("cache", "result")
+)
+fallback_activations = registry.counter(
+    "predictscore_fallback_activations",
+    "Activaciones de rutas de fallback",
+    ("component", "reason")
+)
+executor_queue_depth = registry.gauge(
+    "predictscore_executor_queue_depth",
+    "Tareas pendientes en la cola de cada executor",
+    ("executor",)
+)
+llm_request_duration = registry.histogram(
+    "predictscore_llm_request_duration_seconds",
+    "Latencia de las llamadas al proveedor de IA",
+    ("mode", "outcome")
+)
+service_events = registry.counter(
+    "predictscore_ml_service_events",
+    "Eventos del servicio ML (predicciones, errores, cambios de modelo)",
+    ("event",)
+)
+
+model_reloads = registry.counter(
+    "predictscore_model_reloads",
+    "Recargas en caliente del modelo por origen y resultado",
+    ("trigger", "outcome")
+)
+
+worker_requests = registry.counter(
+    "predictscore_worker_requests",
+    "Peticiones atendidas por worker (serve.py numera los workers)",
+    ("worker",)
+)
+worker_busy_seconds = registry.counter(
+    "predictscore_worker_busy_seconds",
+    "Segundos atendiendo peticiones por worker (su tasa es la ocupación)",
+    ("worker",)
+)
+worker_memory = registry.gauge(
+    "predictscore_worker_memory_bytes",
+    "Memoria del proceso (pss reparte las páginas compartidas entre workers)",
+    ("kind",)
+)
+
+admission_decisions = registry.counter(
+    "predictscore_admission_decisions",
+    "Decisiones del control de admisión (admitida, tras cola o rechazada por motivo)",
+    ("controller", "outcome")
+)
+admission_wait = registry.histogram(
+    "predictscore_admission_wait_seconds",
+    "Espera en la cola de admisión de las peticiones admitidas",
+    ("controller",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+admission_in_flight_bytes = registry.gauge(
+    "predictscore_admission_in_flight_bytes",
+    "Bytes de uploads admitidos y en proceso",
+    ("controller",)
+)
+admission_queue_depth = registry.gauge(
+    "predictscore_admission_queue_depth",
+    "Peticiones esperando cupo en la cola de admisión",
+    ("controller",)
+)
+
+requests_cancelled = registry.counter(
+    "predictscore_requests_cancelled",
+    "Peticiones interrumpidas por plazo vencido o desconexión del cliente",
+    ("endpoint", "reason")
+)
+
+def track_executor(name: str, executor: Any) -> None:
+    """Expone la profundidad de cola de un ThreadPoolExecutor como gauge."""
+    executor_queue_depth.set_function(lambda: executor._work_queue.qsize(), executor=name)
+
+def track_worker_memory() -> None:
+    """Expone la memoria del proceso (desde /proc) como gauge."""
+    for kind in ("rss", "pss", "shared_clean", "private_dirty"):
+        worker_memory.set_function(lambda key=f"{kind}_bytes": process_memory()[key], kind=kind)
@@ -0,0 +1,295 @@
+"""
+Profiler Opcional para Peticiones Lentas
+=======================================
+
+Perfilado bajo demanda de peticiones individuales, pensado para
+producción (donde las cargas lentas no se reproducen en local):
+
+- Por cabecera: `X-Profile: sampling` o `X-Profile: cprofile`
+- Por umbral: con `PROFILING_SLOW_REQUEST_SECONDS > 0` cada petición se
+  muestrea y el perfil solo se guarda si supera el umbral
+
+Modos:
+- sampling: un hilo muestrea periódicamente las pilas (`sys._current_frames`)
+  del hilo del event loop y de los hilos del executor que trabajan para la
+  petición; salida en formato "collapsed stacks" (flamegraph)
+- cprofile: un `cProfile.Profile` por hilo participante, combinados en un
+  único archivo pstats. Un solo perfil cProfile por proceso a la vez (el
+  hilo del event loop admite un único profiler, y desde Python 3.12 el
+  intérprete entero): si ya hay uno en curso, la petición se muestrea.
+  Desde 3.12 el perfil del event loop cubre además todos los hilos
+
+El hilo del event loop es compartido: sus muestras (y su perfil cProfile)
+incluyen el trabajo de las peticiones concurrentes, no solo el de la
+perfilada. Los hilos del executor sí son exclusivos mientras se unen.
+
+Se guardan los últimos `PROFILING_KEEP` perfiles en `PROFILING_DIR`.
+Deshabilitado (por defecto) el costo es una consulta de contextvar.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import cProfile
+import contextvars
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLING = "sampling"
+CPROFILE = "cprofile"
+MODES = (SAMPLING, CPROFILE)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_SUFFIXES = {SAMPLING: ".collapsed", CPROFILE: ".prof"}
+
+_MAX_STACK_DEPTH = 64
+# Desde 3.12 cProfile usa sys.monitoring: un único profiler activo para todos los hilos
+_PER_THREAD_CPROFILE = sys.version_info < (3, 12)
+# Perfil cProfile en curso en el proceso (como máximo uno)
+_cprofile_lock = threading.Lock()
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+class ProfileSession:
+    """
+    Perfilado de una petición.
+
+    Los hilos del executor se unen con `thread_scope()`; el hilo que crea
+    la sesión (el del event loop) participa desde el inicio.
+    """
+
+    def __init__(self, mode: str, label: str, interval: float):
+        self.mode = mode
+        self.label = label
+        self.interval = interval
+        self.started_at = time.perf_counter()
+        self.duration = 0.0
+
+        self._threads: Set[int] = {threading.get_ident()}
+        self._lock = threading.Lock()
+        self._samples: Counter = Counter()
+        self._profiles: List[cProfile.Profile] = []
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._main_profile: Optional[cProfile.Profile] = None
+
+    def start(self) -> None:
+        """Inicia el muestreo o el cProfile del hilo principal."""
+        if self.mode == SAMPLING:
+            self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+            self._sampler.start()
+        else:
+            self._main_profile = cProfile.Profile()
+            self._main_profile.enable()
+
+    def stop(self) -> None:
+        """Detiene el perfilado."""
+        self.duration = time.perf_counter() - self.started_at
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+        if self._main_profile is not None:
+            self._main_profile.disable()
+            with self._lock:
+                self._profiles.append(self._main_profile)
+
+    @contextmanager
+    def join_thread(self) -> Iterator[None]:
+        """Incluye el hilo actual en el perfil mientras dure el bloque."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads.add(ident)
+
+        profile = None
+        if self.mode == CPROFILE and _PER_THREAD_CPROFILE:
+            profile = cProfile.Profile()
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            with self._lock:
+                self._threads.discard(ident)
+                if profile is not None:
+                    self._profiles.append(profile)
+
+    def write(self, path: Path) -> None:
+        """Guarda el perfil (collapsed stacks o pstats)."""
+        if self.mode == SAMPLING:
+            with self._lock:
+                samples = self._samples.most_common()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"# {self.label} duration={self.duration:.3f}s interval={self.interval * 1000:.1f}ms\n")
+                for stack, count in samples:
+                    f.write(f"{stack} {count}\n")
+            return
+
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.dump_stats(str(path))
+
+    def _sample_loop(self) -> None:
+        """Muestrea las pilas de los hilos participantes."""
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                threads = set(self._threads)
+            frames = sys._current_frames()
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self._samples[_collapse(frame)] += 1
+
+class ProfileStore:
+    """Perfiles guardados en disco (conserva los últimos `keep`)."""
+
+    def __init__(self, directory: Path, keep: int):
+        self.directory = Path(directory)
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def save(self, session: ProfileSession) -> Path:
+        """Escribe el perfil y elimina los más antiguos."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S_%f")
+        label = _SAFE_NAME.sub("-", session.label).strip("-") or "request"
+        name = f"{stamp}_{label}_{session.duration * 1000:.0f}ms{PROFILE_SUFFIXES[session.mode]}"
+        path = self.directory / name
+
+        with self._lock:
+            session.write(path)
+            for old in self._files()[self.keep:]:
+                try:
+                    old.unlink()
+                except OSError:
+                    pass
+        return path
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Perfiles disponibles, del más reciente al más antiguo."""
+        result = []
+        for path in self._files():
+            stat = path.stat()
+            result.append({
+                "name": path.name,
+                "mode": SAMPLING if path.suffix == PROFILE_SUFFIXES[SAMPLING] else CPROFILE,
+                "size_bytes": stat.st_size,
+                "created_at": stat.st_mtime
+            })
+        return result
+
+    def resolve(self, name: str) -> Optional[Path]:
+        """Ruta de un perfil por nombre (sin permitir salir del directorio)."""
+        if _SAFE_NAME.sub("", name) != name:
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def _files(self) -> List[Path]:
+        if not self.directory.exists():
+            return []
+        files = [p for p in self.directory.iterdir() if p.suffix in PROFILE_SUFFIXES.values()]
+        return sorted(files, key=lambda p: p.name, reverse=True)
+
+_current_session: contextvars.ContextVar[Optional[ProfileSession]] = contextvars.ContextVar(
+    "profile_session", default=None
+)
+
+# Almacén global de perfiles (Singleton pattern)
+profile_store = ProfileStore(Path(settings.PROFILING_DIR), settings.PROFILING_KEEP)
+
+def requested_mode(header_value: Optional[str]) -> Optional[str]:
+    """
+    Modo de perfilado para una petición (None = sin perfilar).
+
+    La cabecera solo se respeta con `PROFILING_ENABLED`; el umbral de
+    latencia activa el muestreo para todas las peticiones.
+    """
+    if not settings.PROFILING_ENABLED:
+        return None
+    if header_value:
+        value = header_value.strip().lower()
+        return value if value in MODES else SAMPLING
+    if settings.PROFILING_SLOW_REQUEST_SECONDS > 0:
+        return SAMPLING
+    return None
+
+@contextmanager
+def profile_request(mode: str, label: str, forced: bool) -> Iterator[ProfileSession]:
+    """
+    Perfila el bloque y guarda el resultado.
+
+    Args:
+        mode: `sampling` o `cprofile`
+        label: Identificador de la petición (aparece en el nombre del archivo)
+        forced: True si lo pidió la cabecera (se guarda siempre); False si
+            es por umbral (se guarda solo si la petición fue lenta)
+    """
+    exclusive = mode == CPROFILE and _cprofile_lock.acquire(blocking=False)
+    if mode == CPROFILE and not exclusive:
+        logger.info(f"🔬 Ya hay un perfil cProfile en curso; {label} se perfila por muestreo")
+        mode = SAMPLING
+
+    session = ProfileSession(mode, label, settings.PROFILING_SAMPLE_INTERVAL_MS / 1000)
+    token = _current_session.set(session)
+    try:
+        session.start()
+        yield session
+    finally:
+        session.stop()
+        _current_session.reset(token)
+        if exclusive:
+            _cprofile_lock.release()
+        if forced or session.duration >= settings.PROFILING_SLOW_REQUEST_SECONDS:
+            try:
+                path = profile_store.save(session)
+                logger.info(f"🔬 Perfil guardado: {path.name} ({session.duration:.2f}s)")
+            except Exception as e:
+                logger.warning(f"No se pudo guardar el perfil de {label}: {e}")
+
+def thread_scope():
+    """
+    Une el hilo actual (p. ej. del executor) al perfil de la petición en curso.
+
+    Sin perfil activo devuelve un contexto vacío (costo despreciable).
+    """
+    session = _current_session.get()
+    if session is None:
+        return _NULL_SCOPE
+    return session.join_thread()
+
+class _NullScope:
+    """Contexto vacío reutilizable."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+_NULL_SCOPE = _NullScope()
+
+def _collapse(frame: Any) -> str:
+    """Pila en formato collapsed: `modulo:funcion;...` de la raíz a la hoja."""
+    names = []
+    while frame is not None and len(names) < _MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
@@ -0,0 +1,144 @@
+"""
+Instrumentación de Tiempos por Etapa
+===================================
+
+Cronómetros con nombre para las etapas del pipeline de predicción
+(lectura, parseo, features, escalado, kernel, post-proceso, etc.).
+
+- Reloj monotónico de alta resolución (`time.perf_counter`)
+- Un `StageTimer` por petición, accesible vía contextvars (también desde
+  los hilos del executor si se usa `in_current_context`)
+- Cada medición alimenta además el histograma por etapa del registro de
+  métricas (`predictscore_stage_duration_seconds`) para ver dónde gasta
+  el tiempo una carga lenta (`/metrics` y `/api/v1/performance/stages`)
+- `timed_endpoint` serializa la respuesta midiendo también esa etapa y
+  agrega la cabecera `Server-Timing`
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from core.metrics import stage_duration
+
+class StageTimer:
+    """
+    Acumula la duración de cada etapa de una petición.
+
+    Si una etapa se repite (por ejemplo, una vez por chunk) sus duraciones
+    se suman. Es thread-safe para los chunks procesados en el executor.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._stages: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        """Suma una duración a una etapa."""
+        with self._lock:
+            self._stages[stage] = self._stages.get(stage, 0.0) + seconds
+            self._calls[stage] = self._calls.get(stage, 0) + 1
+
+    def breakdown(self, precision: int = 6) -> Dict[str, Any]:
+        """Desglose por etapa en segundos, en orden de primera aparición."""
+        with self._lock:
+            stages = {name: round(seconds, precision) for name, seconds in self._stages.items()}
+            calls = {name: count for name, count in self._calls.items() if count > 1}
+        return {
+            "stages_seconds": stages,
+            "stage_calls": calls,
+            "total_seconds": round(time.perf_counter() - self.started_at, precision)
+        }
+
+    def server_timing(self) -> str:
+        """Valor para la cabecera HTTP `Server-Timing` (duraciones en ms)."""
+        with self._lock:
+            return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in self._stages.items())
+
+_current_timer: contextvars.ContextVar[Optional[StageTimer]] = contextvars.ContextVar(
+    "stage_timer", default=None
+)
+
+# En falso durante el warm-up de arranque: sus tiempos en frío no deben sesgar los histogramas
+_recording: contextvars.ContextVar[bool] = contextvars.ContextVar("stage_recording", default=True)
+
+@contextmanager
+def unrecorded() -> Iterator[None]:
+    """Mide etapas solo en el timer de la petición, sin alimentar los histogramas globales."""
+    token = _recording.set(False)
+    try:
+        yield
+    finally:
+        _recording.reset(token)
+
+def recording() -> bool:
+    """Si las mediciones actuales alimentan las métricas globales."""
+    return _recording.get()
+
+@contextmanager
+def timed_request() -> Iterator[StageTimer]:
+    """Activa un `StageTimer` para la petición en curso."""
+    timer = StageTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+
+def current_timer() -> Optional[StageTimer]:
+    """Timer de la petición en curso (None fuera de `timed_request`)."""
+    return _current_timer.get()
+
+def timed_endpoint(handler: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorador para endpoints async: activa un `StageTimer`, mide la
+    serialización JSON de la respuesta y agrega la cabecera `Server-Timing`.
+
+    Conserva la firma original (FastAPI la inspecciona vía `__wrapped__`).
+    """
+    @functools.wraps(handler)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with timed_request() as timer:
+            result = await handler(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+
+            with stage("serialization"):
+                response = JSONResponse(content=jsonable_encoder(result))
+            response.headers["Server-Timing"] = timer.server_timing()
+            return response
+
+    return wrapper
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Mide una etapa: la suma al timer de la petición (si hay) y al histograma.
+
+    Args:
+        name: Nombre de la etapa
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+def record_stage(name: str, seconds: float) -> None:
+    """Registra una duración medida externamente."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(name, seconds)
+    if _recording.get():
+        stage_duration.observe(seconds, stage=name)
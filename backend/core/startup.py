@@ -0,0 +1,88 @@
+"""
+Línea de Tiempo de Arranque del Worker
+=====================================
+
+Mide cada fase del arranque, desde que se empieza a importar `main`
+hasta que termina el warm-up:
+
+- importaciones por grupo (framework, datos, módulos propios, routers)
+- definición de la app
+- arranque del servidor, carga del modelo y warm-up (lifespan)
+
+Se expone en `/api/v1/performance/startup` y se resume en el log al
+quedar listo; si el total supera `WORKER_BOOT_BUDGET_SECONDS` se emite
+una advertencia. No incluye el arranque del intérprete (decenas de ms).
+El detalle por módulo lo da `python -X importtime -c "import main"`
+(caso `startup_import` de benchmarks/suite.py).
+
+Con `serve.py` los workers heredan por fork la línea de tiempo del
+maestro; cada worker la reinicia al nacer (`restart_after_fork`) y
+conserva la precarga del maestro aparte, en `preload`.
+
+Solo depende de la biblioteca estándar: `main` lo importa primero.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+class StartupTimeline:
+    """Fases consecutivas del arranque (segundos desde la marca anterior)."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.ready_seconds: Optional[float] = None
+        self.preload: Optional[Dict[str, Any]] = None
+        self._last = self.origin
+        self._lock = threading.Lock()
+
+    def mark(self, phase: str) -> None:
+        """Cierra una fase: le asigna el tiempo transcurrido desde la marca anterior."""
+        now = time.perf_counter()
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+            self._last = now
+
+    def mark_ready(self) -> float:
+        """Marca el fin del arranque; devuelve el total en segundos."""
+        with self._lock:
+            self.ready_seconds = time.perf_counter() - self.origin
+            return self.ready_seconds
+
+    def restart_after_fork(self, forked_at: float, phase: str = "fork") -> None:
+        """
+        En el worker recién creado: guarda lo heredado del maestro como
+        `preload` y reinicia desde `forked_at` (la fase `phase` llega hasta ahora).
+        """
+        with self._lock:
+            self.preload = {
+                "phases_seconds": dict(self.phases),
+                "seconds": self.ready_seconds if self.ready_seconds is not None else self._last - self.origin
+            }
+            self.origin = forked_at
+            self.phases = {}
+            self.ready_seconds = None
+            self._last = forked_at
+        self.mark(phase)
+
+    def snapshot(self, precision: int = 4) -> Dict[str, Any]:
+        with self._lock:
+            report = {
+                "phases_seconds": {name: round(seconds, precision) for name, seconds in self.phases.items()},
+                "elapsed_seconds": round(time.perf_counter() - self.origin, precision),
+                "ready_seconds": None if self.ready_seconds is None else round(self.ready_seconds, precision)
+            }
+            if self.preload is not None:
+                report["preload"] = {
+                    "phases_seconds": {name: round(seconds, precision)
+                                       for name, seconds in self.preload["phases_seconds"].items()},
+                    "seconds": round(self.preload["seconds"], precision)
+                }
+            return report
+
+# Línea de tiempo del proceso (Singleton pattern)
+startup_timeline = StartupTimeline()
@@ -0,0 +1,206 @@
+"""
+Política de Hilos: Procesos × Executor × BLAS
+============================================
+
+Cada predicción corre en un hilo del executor (o del carril prioritario
+de la predicción individual) y dentro llama a NumPy, cuya biblioteca BLAS
+(OpenBLAS/MKL) puede abrir su propio pool de hilos. Sin coordinación el
+total de hilos activos es
+
+    procesos × (hilos del executor + carril prioritario) × hilos BLAS
+
+y por encima de los núcleos disponibles solo agrega cambios de contexto
+y competencia por caché: sumar workers baja el throughput. La política
+reparte los núcleos entre los tres niveles:
+
+- núcleos: afinidad del proceso y cuota de cgroup (contenedores), no el
+  total de la máquina
+- procesos: los workers de `serve.py` (uno por núcleo por defecto; sin
+  `serve.py`, uno)
+- carril prioritario: la mitad de los núcleos del proceso (al menos un
+  hilo); las predicciones individuales no esperan detrás de los chunks
+  de un dataset y siguen atendiéndose en paralelo
+- executor: los núcleos restantes del proceso (al menos uno). Más hilos
+  que núcleos no aceleran: el pipeline de features retiene el GIL y los
+  hilos extra solo compiten
+- BLAS: los núcleos que sobren (1 si el paralelismo ya lo dan los hilos
+  y procesos, que es lo habitual)
+
+Orden de precedencia: variables `THREAD_*` explícitas (para BLAS también
+`OMP_NUM_THREADS` y afines si el operador ya las exportó), luego la
+combinación medida por `python -m benchmarks.threading_tuner` en este host (si coincide
+la cantidad de núcleos y de procesos) y por último las reglas anteriores.
+
+Los límites BLAS se fijan por variables de entorno antes de importar
+NumPy (`main` importa este módulo primero; las ya exportadas no se
+pisan) y con threadpoolctl, si está instalado, para las bibliotecas ya
+cargadas.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+
+# Variables leídas por las bibliotecas nativas al cargarse
+BLAS_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "BLIS_NUM_THREADS",
+                 "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+@dataclass(frozen=True)
+class ThreadingPolicy:
+    """Reparto de núcleos vigente (por proceso, salvo `processes`)."""
+    cores: int
+    processes: int
+    executor_threads: int
+    priority_threads: int
+    blas_threads: int
+    source: str  # "env", "tuned" o "auto"
+
+    @property
+    def active_threads(self) -> int:
+        """Hilos de cómputo simultáneos en todo el host."""
+        return self.processes * (self.executor_threads + self.priority_threads) * self.blas_threads
+
+    def describe(self) -> str:
+        return (f"{self.processes} procesos × ({self.executor_threads} hilos de executor + "
+                f"{self.priority_threads} prioritarios) × {self.blas_threads} BLAS = {self.active_threads} sobre {self.cores} núcleos ({self.source})")
+
+def available_cores() -> int:
+    """Núcleos utilizables: afinidad del proceso y cuota de CPU de cgroup v2/v1."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count() or 1
+
+    quota = _cgroup_quota()
+    if quota is not None:
+        cores = min(cores, max(1, math.ceil(quota)))
+    return cores
+
+def _cgroup_quota() -> Optional[float]:
+    """Cuota de CPU del contenedor en núcleos (None si no hay límite)."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r", encoding="ascii") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r", encoding="ascii") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r", encoding="ascii") as f:
+            period = int(f.read())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+def exported_blas_threads() -> Optional[int]:
+    """Hilos BLAS que el operador ya exportó (`OMP_NUM_THREADS` y afines; None si ninguno)."""
+    for name in BLAS_ENV_VARS:
+        try:
+            value = int(os.environ.get(name, ""))
+        except ValueError:
+            continue
+        if value > 0:
+            return value
+    return None
+
+def load_tuned(path: Path, cores: int) -> Optional[Dict[str, Any]]:
+    """Combinación elegida por `benchmarks.threading_tuner` (None si no existe o es de otro host)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            tuned = json.load(f)
+    except (OSError, ValueError):
+        return None
+    best = tuned.get("best")
+    if not best or tuned.get("cores") != cores:
+        return None
+    return best
+
+def recommended_processes(cores: Optional[int] = None) -> int:
+    """Workers para `serve.py`: SERVER_WORKERS, la medición de este host o uno por núcleo."""
+    cores = cores or available_cores()
+    tuned = load_tuned(Path(settings.THREADING_POLICY_FILE), cores)
+    return settings.SERVER_WORKERS or (tuned["processes"] if tuned else cores)
+
+def resolve_policy(processes: int, cores: Optional[int] = None) -> ThreadingPolicy:
+    """Calcula la política de cada uno de `processes` workers."""
+    cores = cores or available_cores()
+    tuned = load_tuned(Path(settings.THREADING_POLICY_FILE), cores)
+    tuned = tuned if tuned and tuned["processes"] == processes else None
+
+    executor_threads = settings.THREAD_EXECUTOR_THREADS
+    blas_threads = settings.THREAD_BLAS_THREADS or exported_blas_threads()
+    source = "env" if executor_threads or blas_threads or settings.THREAD_PRIORITY_THREADS else "auto"
+    if tuned:
+        executor_threads = executor_threads or tuned["executor_threads"]
+        blas_threads = blas_threads or tuned["blas_threads"]
+        source = "env" if source == "env" else "tuned"
+
+    per_process = max(1, cores // processes)
+    priority_threads = settings.THREAD_PRIORITY_THREADS or max(1, per_process // 2)
+    executor_threads = executor_threads or max(1, per_process - priority_threads)
+    blas_threads = blas_threads or max(1, per_process // (executor_threads + priority_threads))
+    return ThreadingPolicy(cores, processes, executor_threads, priority_threads, blas_threads, source)
+
+class ThreadingController:
+    """Aplica la política del proceso (una vez) y reporta los pools nativos cargados."""
+
+    def __init__(self):
+        self.policy: Optional[ThreadingPolicy] = None
+        self._limits: Any = None
+
+    def configure(self, processes: Optional[int] = None) -> ThreadingPolicy:
+        """
+        Resuelve y aplica la política. `serve.py` la fija con su cantidad de
+        workers antes de importar la app y los workers la heredan; sin
+        maestro se asume un proceso (o `WEB_CONCURRENCY`, que es lo que usa
+        `uvicorn --workers` por defecto).
+        """
+        if self.policy is not None and processes in (None, self.policy.processes):
+            return self.policy
+
+        policy = resolve_policy(processes or int(os.getenv("WEB_CONCURRENCY", "1")))
+        # Las que exportó el operador se respetan (la política ya las tomó como fuente "env")
+        for name in BLAS_ENV_VARS:
+            os.environ.setdefault(name, str(policy.blas_threads))
+        try:
+            from threadpoolctl import threadpool_limits
+            self._limits = threadpool_limits(limits=policy.blas_threads)
+        except ImportError:
+            pass
+
+        self.policy = policy
+        return policy
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Política vigente y pools nativos efectivamente cargados."""
+        if self.policy is None:
+            return {"configured": False}
+        return {
+            **asdict(self.policy),
+            "active_threads": self.policy.active_threads,
+            "oversubscribed": self.policy.active_threads > self.policy.cores,
+            "native_pools": native_pools()
+        }
+
+def native_pools() -> List[Dict[str, Any]]:
+    """Bibliotecas nativas con pool de hilos cargadas en el proceso (requiere threadpoolctl)."""
+    try:
+        from threadpoolctl import threadpool_info
+    except ImportError:
+        return []
+    return [
+        {key: info.get(key) for key in ("user_api", "internal_api", "num_threads", "version")}
+        for info in threadpool_info()
+    ]
+
+# Controlador del proceso (Singleton pattern)
+threading_controller = ThreadingController()
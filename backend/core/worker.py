@@ -0,0 +1,90 @@
+"""
+Identidad y Memoria del Worker
+=============================
+
+Datos del proceso que atiende las peticiones, para distinguir workers
+cuando `serve.py` levanta varios a partir de un maestro con el modelo
+precargado:
+
+- número de worker (estable entre reinicios: el reemplazo hereda el
+  número del proceso que sustituye), pid y pid del maestro
+- si el modelo vino precargado del maestro (copy-on-write)
+- memoria desde /proc: RSS, PSS (la parte proporcional de las páginas
+  compartidas; su suma entre workers es la memoria real del conjunto),
+  compartida y privada
+
+Sin maestro (uvicorn directo) el proceso es el worker "0".
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+# Campos de /proc/self/smaps_rollup (kB) expuestos como bytes
+_SMAPS_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Shared_Clean": "shared_clean_bytes",
+    "Shared_Dirty": "shared_dirty_bytes",
+    "Private_Clean": "private_clean_bytes",
+    "Private_Dirty": "private_dirty_bytes"
+}
+
+class WorkerIdentity:
+    """Número de worker, origen del modelo y aviso de readiness al maestro."""
+
+    def __init__(self):
+        self.worker_id = "0"
+        self.master_pid: Optional[int] = None
+        self.preloaded = False
+        self.started_at = time.time()
+        self._ready_fd: Optional[int] = None
+
+    def assign(self, worker_id: int, master_pid: int, ready_fd: Optional[int] = None) -> None:
+        """Lo llama el maestro en el proceso hijo, justo después del fork."""
+        self.worker_id = str(worker_id)
+        self.master_pid = master_pid
+        self.preloaded = True
+        self.started_at = time.time()
+        self._ready_fd = ready_fd
+
+    def notify_ready(self) -> None:
+        """Avisa al maestro que el worker terminó el warm-up (reinicio escalonado)."""
+        if self._ready_fd is None:
+            return
+        try:
+            os.write(self._ready_fd, b"1")
+            os.close(self._ready_fd)
+        except OSError:
+            pass
+        self._ready_fd = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.worker_id,
+            "pid": os.getpid(),
+            "master_pid": self.master_pid,
+            "preloaded": self.preloaded,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "memory": process_memory()
+        }
+
+def process_memory(pid: Optional[int] = None) -> Dict[str, int]:
+    """Memoria del proceso desde /proc (vacío fuera de Linux)."""
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    memory: Dict[str, int] = {}
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in _SMAPS_FIELDS:
+                    memory[_SMAPS_FIELDS[name]] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        pass
+    return memory
+
+# Identidad del proceso actual (Singleton pattern)
+worker_identity = WorkerIdentity()
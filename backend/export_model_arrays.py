@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Exportación del Modelo SVR a Arreglos Mapeables en Memoria
+=========================================================
+
+Convierte los pickles vigentes (o los de `--version`) en el formato de
+arreglos `.npy` de `services/array_model.py`, que el servicio abre con
+`mmap_mode='r'`: los workers comparten las páginas a través de la caché
+del sistema operativo y no necesitan deserializar ni importar
+scikit-learn.
+
+Las publicaciones del registro (`retrain_svr_fast.py`,
+`refresh_model.py`) ya exportan los arreglos; este script sirve para
+modelos anteriores o para los pickles canónicos del repositorio.
+
+`--benchmark` mide en procesos nuevos el arranque en frío (importar +
+cargar + primera predicción) y la memoria de cada formato: RssAnon es
+memoria privada de cada worker; RssFile son páginas de archivos
+mapeados, compartidas entre workers.
+
+Uso:
+    python export_model_arrays.py
+    python export_model_arrays.py --version svr-0003
+    python export_model_arrays.py --benchmark --runs 5
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from services.array_model import read_manifest
+from services.model_registry import model_registry
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+# Se ejecuta en un proceso nuevo por medición (sin módulos ya importados)
+_PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import numpy as np
+if sys.argv[1] == "pickle":
+    import joblib
+    model, scaler = joblib.load(sys.argv[2]), joblib.load(sys.argv[3])
+else:
+    from services.array_model import load_arrays
+    model, scaler, _ = load_arrays(sys.argv[2])
+loaded = time.perf_counter()
+X = np.asarray(scaler.mean_, dtype=np.float64).reshape(1, -1).repeat(8, axis=0)
+model.predict(scaler.transform(X))
+finished = time.perf_counter()
+memory = {}
+try:
+    with open("/proc/self/status") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("VmRSS", "RssAnon", "RssFile"):
+                memory[name] = int(value.split()[0]) / 1024
+except OSError:
+    import resource
+    memory["VmRSS"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({"load_seconds": loaded - started, "cold_start_seconds": finished - started, **memory}))
+"""
+
+def probe(kind: str, *paths: Path) -> Dict[str, float]:
+    env = dict(os.environ, PYTHONWARNINGS="ignore", PYTHONPATH=str(BACKEND_DIR))
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, kind, *map(str, paths)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def benchmark(version: Optional[str], runs: int) -> Dict[str, Dict[str, float]]:
+    """Mediana de `runs` procesos nuevos por formato."""
+    directory = model_registry.fresh_arrays_dir(version)
+    if directory is None:
+        raise SystemExit("❌ No hay arreglos al día para comparar (ejecute la exportación primero)")
+
+    candidates = {
+        "pickle": model_registry.artifact_paths(version),
+        "arrays": (directory,)
+    }
+    results = {}
+    for kind, paths in candidates.items():
+        samples = [probe(kind, *paths) for _ in range(runs)]
+        results[kind] = {name: round(statistics.median(sample[name] for sample in samples), 3) for name in samples[0]}
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Exporta el modelo SVR a arreglos .npy mapeables en memoria")
+    parser.add_argument("--version", help="Versión del registro (por defecto la vigente)")
+    parser.add_argument("--benchmark", action="store_true", help="Comparar arranque en frío y memoria pickle vs arreglos")
+    parser.add_argument("--runs", type=int, default=5, help="Procesos por formato en el benchmark")
+    args = parser.parse_args(argv)
+
+    print(f"📦 Modelo: {args.version or model_registry.current_version() or 'pickles canónicos'}")
+    directory = model_registry.export_arrays(args.version)
+    manifest: Dict[str, Any] = read_manifest(directory) or {}
+    print(f"✅ Arreglos exportados en {directory}")
+    print(f"   {manifest.get('n_support')} vectores de soporte × {manifest.get('n_features')} features, "
+          f"diferencia máxima vs pickle {manifest.get('max_abs_difference', 0):.1e}")
+
+    if args.benchmark:
+        print(f"\n⏱️  Arranque en frío (mediana de {args.runs} procesos):")
+        results = benchmark(args.version, args.runs)
+        for kind, values in results.items():
+            memory = "  ".join(f"{name} {values[name]:.1f} MB" for name in ("VmRSS", "RssAnon", "RssFile") if name in values)
+            print(f"   {kind:<7} carga {values['load_seconds']:.3f}s  "
+                  f"primera predicción {values['cold_start_seconds']:.3f}s  {memory}")
+        pickle, arrays = results["pickle"], results["arrays"]
+        print(f"\n   Arranque: {pickle['cold_start_seconds'] / arrays['cold_start_seconds']:.1f}x más rápido")
+        if "RssAnon" in pickle and "RssAnon" in arrays:
+            print(f"   Memoria privada por worker: {pickle['RssAnon'] - arrays['RssAnon']:.1f} MB menos")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Generador Vectorizado de Datasets Sintéticos
+===========================================
+
+Genera estudiantes sintéticos a escala (10M+ filas) para pruebas de
+carga y benchmarks. Cada columna se muestrea completa con NumPy (sin
+bucles por fila) a partir de una especificación de distribuciones:
+
+- empirical: cuantiles ajustados de una columna numérica (CDF inversa)
+- normal: media/desviación, recortada a [min, max]
+- uniform: rango [min, max]
+- categorical: etiquetas con sus probabilidades
+- constant: un único valor
+
+La especificación se ajusta desde `ml/data/raw/StudentPerformanceFactors.csv`
+(por defecto), se puede guardar en JSON, editar y volver a cargar.
+
+Formatos de salida (`--layout`):
+- raw: columnas y etiquetas del CSV original (sin Exam_Score)
+- model: las features del modelo vía el pipeline compartido, listas
+  para `/api/v1/predictions/predict-dataset`
+
+Se escribe por chunks (memoria acotada): CSV o Parquet en un único
+archivo, o un archivo por chunk con `--split`. Cada chunk usa su propia
+semilla derivada, así que el resultado no depende del tamaño de chunk
+más que en el orden de generación.
+
+Uso:
+    python generate_synthetic_dataset.py --rows 10000000 --output sintetico.csv
+    python generate_synthetic_dataset.py --rows 1000000 --layout model --output carga.parquet
+    python generate_synthetic_dataset.py --save-spec spec.json    # editar y usar con --spec
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SOURCE = Path(__file__).resolve().parent / "ml" / "data" / "raw" / "StudentPerformanceFactors.csv"
+TARGET_COLUMN = "Exam_Score"
+QUANTILE_POINTS = 101
+
+class SyntheticStudentGenerator:
+    """
+    Muestreo vectorizado de estudiantes según una especificación por columna.
+
+    Las columnas son independientes entre sí (se conservan las
+    distribuciones marginales, no las correlaciones).
+    """
+
+    def __init__(self, spec: Dict[str, Dict[str, Any]]):
+        self.spec = spec
+        self.columns: List[str] = list(spec)
+        for column, definition in spec.items():
+            if definition.get("type") not in ("empirical", "normal", "uniform", "categorical", "constant"):
+                raise ValueError(f"Distribución desconocida para {column}: {definition.get('type')}")
+
+        # Arreglos precalculados para no reconstruirlos en cada chunk
+        self._compiled: Dict[str, Dict[str, Any]] = {}
+        for column, definition in spec.items():
+            compiled = dict(definition)
+            if definition["type"] == "empirical":
+                compiled["quantiles"] = np.asarray(definition["quantiles"], dtype=np.float64)
+                compiled["levels"] = np.linspace(0.0, 1.0, len(compiled["quantiles"]))
+            elif definition["type"] == "categorical":
+                probabilities = np.asarray(definition["probabilities"], dtype=np.float64)
+                compiled["probabilities"] = probabilities / probabilities.sum()
+                compiled["labels"] = pd.Index(definition["labels"])
+            self._compiled[column] = compiled
+
+    @classmethod
+    def from_csv(cls, path: Path, exclude: tuple = (TARGET_COLUMN,)) -> "SyntheticStudentGenerator":
+        """
+        Ajusta la especificación a las distribuciones de un CSV.
+
+        Numéricas: cuantiles empíricos (enteras si la columna lo es).
+        Categóricas: frecuencias de cada etiqueta (sin valores faltantes).
+        """
+        frame = pd.read_csv(path)
+        spec: Dict[str, Dict[str, Any]] = {}
+        for column in frame.columns:
+            if column in exclude:
+                continue
+            values = frame[column].dropna()
+            if pd.api.types.is_numeric_dtype(values):
+                quantiles = np.quantile(values.to_numpy(dtype=np.float64), np.linspace(0, 1, QUANTILE_POINTS))
+                spec[column] = {
+                    "type": "empirical",
+                    "quantiles": [round(float(q), 6) for q in quantiles],
+                    "integer": bool(pd.api.types.is_integer_dtype(values))
+                }
+            else:
+                frequencies = values.astype(str).value_counts(normalize=True)
+                spec[column] = {
+                    "type": "categorical",
+                    "labels": frequencies.index.tolist(),
+                    "probabilities": [round(float(p), 6) for p in frequencies.to_numpy()]
+                }
+        return cls(spec)
+
+    @classmethod
+    def from_json(cls, path: Path) -> "SyntheticStudentGenerator":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.spec, f, indent=2, ensure_ascii=False)
+
+    def sample(self, rows: int, rng: np.random.Generator) -> pd.DataFrame:
+        """Genera `rows` estudiantes (todas las columnas vectorizadas)."""
+        return pd.DataFrame({column: self._sample_column(self._compiled[column], rows, rng) for column in self.columns})
+
+    def iter_chunks(self, rows: int, chunk_rows: int, seed: int) -> Iterator[pd.DataFrame]:
+        """Genera `rows` filas en chunks de a lo sumo `chunk_rows`, cada uno con semilla propia."""
+        n_chunks = max(1, -(-rows // chunk_rows))
+        for index, child in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+            size = min(chunk_rows, rows - index * chunk_rows)
+            yield self.sample(size, np.random.default_rng(child))
+
+    @staticmethod
+    def _sample_column(definition: Dict[str, Any], rows: int, rng: np.random.Generator) -> Any:
+        kind = definition["type"]
+
+        if kind == "categorical":
+            codes = rng.choice(len(definition["labels"]), size=rows, p=definition["probabilities"])
+            return pd.Categorical.from_codes(codes, categories=definition["labels"])
+
+        if kind == "constant":
+            return np.full(rows, definition["value"])
+
+        if kind == "empirical":
+            values = np.interp(rng.random(rows), definition["levels"], definition["quantiles"])
+        elif kind == "normal":
+            values = rng.normal(definition["mean"], definition["std"], size=rows)
+        else:
+            values = rng.uniform(definition["min"], definition["max"], size=rows)
+
+        if "min" in definition or "max" in definition:
+            values = np.clip(values, definition.get("min", -np.inf), definition.get("max", np.inf))
+        if definition.get("integer"):
+            return np.rint(values).astype(np.int64)
+        return values
+
+def to_model_layout(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Convierte un chunk en las features del modelo (pipeline compartido con el servicio)."""
+    from services.feature_pipeline import feature_pipeline
+
+    frame = feature_pipeline.to_frame(chunk)
+    # Las features codificadas son enteras salvo las razones derivadas
+    integer_columns = [
+        name for name in frame.columns
+        if np.array_equal(frame[name].to_numpy(), np.round(frame[name].to_numpy()))
+    ]
+    return frame.astype({name: np.int64 for name in integer_columns})
+
+class ChunkWriter:
+    """Escritura incremental de chunks en CSV o Parquet."""
+
+    def __init__(self, output: Path, split: bool):
+        self.output = output
+        self.split = split
+        self.format = "parquet" if output.suffix == ".parquet" else "csv"
+        self.paths: List[Path] = []
+        self._parquet_writer = None
+        self._index = 0
+
+        if self.format == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise SystemExit("❌ La salida Parquet requiere pyarrow (pip install pyarrow)")
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        path = self.output.with_name(f"{self.output.stem}_{self._index:05d}{self.output.suffix}") if self.split else self.output
+        if self.format == "csv":
+            chunk.to_csv(path, mode="w" if self.split or self._index == 0 else "a",
+                          header=self.split or self._index == 0, index=False)
+        elif self.split:
+            chunk.to_parquet(path, index=False)
+        else:
+            self._write_parquet_row_group(chunk)
+
+        if path not in self.paths:
+            self.paths.append(path)
+        self._index += 1
+
+    def close(self) -> None:
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+    def _write_parquet_row_group(self, chunk: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.output, table.schema)
+        self._parquet_writer.write_table(table)
+
+def generate(
+    generator: SyntheticStudentGenerator,
+    rows: int,
+    output: Path,
+    chunk_rows: int = 500_000,
+    seed: int = 42,
+    layout: str = "raw",
+    split: bool = False
+) -> List[Path]:
+    """
+    Genera y escribe `rows` estudiantes por chunks.
+
+    Returns:
+        List[Path]: Archivos escritos
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    writer = ChunkWriter(output, split)
+    started = time.perf_counter()
+    written = 0
+    try:
+        for chunk in generator.iter_chunks(rows, chunk_rows, seed):
+            if layout == "model":
+                chunk = to_model_layout(chunk)
+            writer.write(chunk)
+            written += len(chunk)
+            elapsed = time.perf_counter() - started
+            print(f"  📦 {written:,}/{rows:,} filas ({written / elapsed:,.0f} filas/s)", end="\r", flush=True)
+    finally:
+        writer.close()
+    print()
+    return writer.paths
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generador vectorizado de estudiantes sintéticos")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--output", type=Path, default=Path("synthetic_students.csv"),
+                        help="Archivo de salida (.csv o .parquet)")
+    parser.add_argument("--layout", choices=("raw", "model"), default="raw",
+                        help="raw: columnas del CSV original; model: features del modelo")
+    parser.add_argument("--chunk-rows", type=int, default=500_000, help="Filas por chunk (memoria acotada)")
+    parser.add_argument("--split", action="store_true", help="Un archivo por chunk")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="CSV del que se ajustan las distribuciones")
+    parser.add_argument("--spec", type=Path, help="Especificación JSON (en lugar de ajustar desde --source)")
+    parser.add_argument("--save-spec", type=Path, help="Guardar la especificación y salir")
+    args = parser.parse_args(argv)
+
+    generator = (
+        SyntheticStudentGenerator.from_json(args.spec) if args.spec
+        else SyntheticStudentGenerator.from_csv(args.source)
+    )
+    if args.save_spec:
+        generator.save(args.save_spec)
+        print(f"💾 Especificación guardada en {args.save_spec}")
+        return 0
+
+    print(f"🎲 Generando {args.rows:,} estudiantes ({args.layout}) en {args.output}")
+    started = time.perf_counter()
+    paths = generate(generator, args.rows, args.output, args.chunk_rows, args.seed, args.layout, args.split)
+    print(f"✅ {len(paths)} archivo(s) en {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
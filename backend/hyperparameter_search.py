@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Búsqueda Paralela de Hiperparámetros del SVR
+===========================================
+
+Búsqueda en grilla o por "successive halving" sobre C / gamma / epsilon
+con validación cruzada K-fold. Cada ajuste (configuración × fold) es una
+tarea independiente en un pool de procesos:
+
+- Los arreglos de entrenamiento se escriben una vez en `.npy` y cada
+  worker los abre con `mmap_mode='r'` (solo lectura, compartidos vía la
+  caché de páginas; no se copian por tarea)
+- Cada worker limita BLAS/OpenMP a 1 hilo para no competir entre procesos
+- Cada ajuste registra su tiempo de fit y de predicción
+
+Successive halving: todas las configuraciones se evalúan primero con una
+fracción de las filas; en cada ronda se conserva el mejor 1/`factor`
+(por MAE medio) y se multiplica el presupuesto de filas por `factor`.
+
+Lo usa `retrain_svr_fast.py --search grid|halving`.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import itertools
+import math
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVR
+
+DEFAULT_GRID: Dict[str, List[Any]] = {
+    "C": [10, 30, 100],
+    "gamma": ["scale", 0.03, 0.1],
+    "epsilon": [0.1, 0.3]
+}
+
+# Arreglos compartidos por worker (abiertos en el initializer)
+_shared: Dict[str, np.ndarray] = {}
+
+def _init_worker(x_path: str, y_path: str, weight_path: Optional[str], fit_options: Dict[str, Any]) -> None:
+    """Abre los arreglos en modo solo lectura y limita los hilos nativos a 1."""
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+    _shared["X"] = np.load(x_path, mmap_mode="r")
+    _shared["y"] = np.load(y_path, mmap_mode="r")
+    _shared["weights"] = np.load(weight_path, mmap_mode="r") if weight_path else None
+    _shared["fit_options"] = fit_options
+
+def _fit_fold(params: Dict[str, Any], train_idx: np.ndarray, val_idx: np.ndarray) -> Dict[str, Any]:
+    """Ajusta y evalúa una configuración en un fold (se ejecuta en el worker)."""
+    X, y, weights = _shared["X"], _shared["y"], _shared["weights"]
+
+    # Escalado dentro del fold: sin fuga de media/desviación de validación
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_idx])
+    X_val = scaler.transform(X[val_idx])
+
+    model = SVR(kernel="rbf", **params, **_shared["fit_options"])
+    started, cpu_started = time.perf_counter(), time.process_time()
+    model.fit(X_train, y[train_idx], sample_weight=None if weights is None else weights[train_idx])
+    fit_seconds = time.perf_counter() - started
+    fit_cpu_seconds = time.process_time() - cpu_started
+
+    started = time.perf_counter()
+    predictions = model.predict(X_val)
+    predict_seconds = time.perf_counter() - started
+
+    return {
+        "mae": float(mean_absolute_error(y[val_idx], predictions)),
+        "r2": float(r2_score(y[val_idx], predictions)),
+        "fit_seconds": fit_seconds,
+        "fit_cpu_seconds": fit_cpu_seconds,
+        "predict_seconds": predict_seconds,
+        "n_support": int(model.support_.shape[0]),
+        "pid": os.getpid()
+    }
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Producto cartesiano de la grilla."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+class SVRSearch:
+    """
+    Búsqueda de hiperparámetros del SVR sobre un pool de procesos.
+
+    Uso:
+        search = SVRSearch(X_train, y_train, workers=8)
+        result = search.run(strategy="halving")
+        result["best_params"], result["leaderboard"]
+    """
+
+    def __init__(
+        self,
+        X: np.ndarray,
+        y: np.ndarray,
+        grid: Optional[Dict[str, Sequence[Any]]] = None,
+        folds: int = 5,
+        workers: Optional[int] = None,
+        seed: int = 42,
+        fit_options: Optional[Dict[str, Any]] = None,
+        sample_weight: Optional[np.ndarray] = None
+    ):
+        self.X = np.ascontiguousarray(X, dtype=np.float64)
+        self.y = np.ascontiguousarray(y, dtype=np.float64)
+        self.grid = dict(grid or DEFAULT_GRID)
+        self.folds = folds
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        # cache_size / shrinking: solo afectan el costo del ajuste
+        self.fit_options = dict(fit_options or {})
+        self.sample_weight = None if sample_weight is None else np.ascontiguousarray(sample_weight, dtype=np.float64)
+        self._fit_cpu_seconds = 0.0
+
+    def run(self, strategy: str = "halving", factor: int = 3, min_rows: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Ejecuta la búsqueda.
+
+        Args:
+            strategy: "grid" (todas las configuraciones con todas las filas) o "halving"
+            factor: Factor de reducción de candidatos / aumento de filas (halving)
+            min_rows: Filas de la primera ronda (halving; por defecto las necesarias
+                para llegar al total en las rondas disponibles)
+
+        Returns:
+            Dict[str, Any]: best_params, leaderboard (por MAE), rondas y tiempos
+        """
+        if strategy not in ("grid", "halving"):
+            raise ValueError(f"Estrategia desconocida: {strategy}")
+
+        candidates = expand_grid(self.grid)
+        self._fit_cpu_seconds = 0.0
+        started = time.perf_counter()
+
+        with tempfile.TemporaryDirectory(prefix="svr_search_") as tmp:
+            x_path, y_path = str(Path(tmp) / "X.npy"), str(Path(tmp) / "y.npy")
+            np.save(x_path, self.X)
+            np.save(y_path, self.y)
+            weight_path = None
+            if self.sample_weight is not None:
+                weight_path = str(Path(tmp) / "weights.npy")
+                np.save(weight_path, self.sample_weight)
+
+            initargs = (x_path, y_path, weight_path, self.fit_options)
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=initargs) as pool:
+                if strategy == "grid":
+                    rungs = [(candidates, len(self.y))]
+                    leaderboard = self._evaluate(pool, candidates, len(self.y), rung=0)
+                else:
+                    leaderboard, rungs = self._halving(pool, candidates, factor, min_rows)
+
+        wall_seconds = time.perf_counter() - started
+        fit_seconds = self._fit_cpu_seconds
+        return {
+            "strategy": strategy,
+            "folds": self.folds,
+            "workers": self.workers,
+            "grid": self.grid,
+            "fit_options": self.fit_options,
+            "rows": len(self.y),
+            "candidates": len(candidates),
+            "rungs": [{"candidates": len(rung_candidates), "rows": rows} for rung_candidates, rows in rungs],
+            "wall_seconds": round(wall_seconds, 2),
+            "total_fit_cpu_seconds": round(fit_seconds, 2),
+            # Tiempo de CPU en ajustes / tiempo real: ~workers si escala con los núcleos
+            "parallel_speedup": round(fit_seconds / wall_seconds, 2) if wall_seconds else None,
+            "best_params": leaderboard[0]["params"],
+            "leaderboard": leaderboard
+        }
+
+    def _halving(
+        self,
+        pool: ProcessPoolExecutor,
+        candidates: List[Dict[str, Any]],
+        factor: int,
+        min_rows: Optional[int]
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[List[Dict[str, Any]], int]]]:
+        """Rondas de successive halving; devuelve el leaderboard combinado (última ronda primero)."""
+        total_rows = len(self.y)
+        n_rungs = max(1, math.ceil(math.log(len(candidates), factor)) + 1) if len(candidates) > 1 else 1
+        rows = min_rows or max(self.folds * 50, total_rows // factor ** (n_rungs - 1))
+
+        rungs = []
+        finished: List[Dict[str, Any]] = []
+        rung = 0
+        while True:
+            rows = min(rows, total_rows)
+            rungs.append((candidates, rows))
+            results = self._evaluate(pool, candidates, rows, rung)
+            if len(candidates) <= 1 or rows >= total_rows:
+                return results + finished, rungs
+
+            keep = max(1, len(candidates) // factor)
+            finished = results[keep:] + finished
+            candidates = [entry["params"] for entry in results[:keep]]
+            rows *= factor
+            rung += 1
+
+    def _evaluate(self, pool: ProcessPoolExecutor, candidates: List[Dict[str, Any]], rows: int, rung: int) -> List[Dict[str, Any]]:
+        """Evalúa candidatos con K-fold sobre las primeras `rows` filas (permutadas)."""
+        rng = np.random.default_rng(self.seed)
+        subset = rng.permutation(len(self.y))[:rows]
+        splits = [
+            (subset[train], subset[val])
+            for train, val in KFold(self.folds, shuffle=True, random_state=self.seed).split(subset)
+        ]
+
+        futures = {
+            pool.submit(_fit_fold, params, train_idx, val_idx): index
+            for index, params in enumerate(candidates)
+            for train_idx, val_idx in splits
+        }
+        fold_results: Dict[int, List[Dict[str, Any]]] = {index: [] for index in range(len(candidates))}
+        for future in as_completed(futures):
+            fold_results[futures[future]].append(future.result())
+
+        leaderboard = []
+        for index, params in enumerate(candidates):
+            results = fold_results[index]
+            maes = [result["mae"] for result in results]
+            fit_times = [result["fit_seconds"] for result in results]
+            self._fit_cpu_seconds += sum(result["fit_cpu_seconds"] for result in results)
+            leaderboard.append({
+                "params": params,
+                "rung": rung,
+                "rows": rows,
+                "mean_mae": round(statistics.fmean(maes), 4),
+                "std_mae": round(statistics.pstdev(maes), 4),
+                "mean_r2": round(statistics.fmean(result["r2"] for result in results), 4),
+                "mean_fit_seconds": round(statistics.fmean(fit_times), 3),
+                "total_fit_seconds": round(sum(fit_times), 3),
+                "mean_predict_seconds": round(statistics.fmean(result["predict_seconds"] for result in results), 4),
+                "mean_n_support": round(statistics.fmean(result["n_support"] for result in results), 1)
+            })
+        leaderboard.sort(key=lambda entry: entry["mean_mae"])
+        return leaderboard
+
+def parse_grid_values(value: str) -> List[Any]:
+    """`'10,100'` -> [10.0, 100.0]; conserva valores no numéricos como 'scale'."""
+    values: List[Any] = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            values.append(float(item))
+        except ValueError:
+            values.append(item)
+    return values
@@ -16,24 +16,50 @@ Autor: Equipo Grupo 4
 Fecha: 2025
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+# Primero: mide las fases del resto del arranque (solo biblioteca estándar)
+from core.startup import startup_timeline
+# Antes de NumPy: las bibliotecas BLAS leen su cantidad de hilos al cargarse
+# (core.config, que importa la política, carga el .env: THREAD_* y SERVER_WORKERS valen también desde ahí)
+from core.threading_policy import threading_controller
+threading_policy = threading_controller.configure()
+
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
-import uvicorn
+from dataclasses import dataclass
 import logging
 import time
 import json
-import pandas as pd
-import numpy as np
 import io
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
-from dotenv import load_dotenv
+startup_timeline.mark("import_fastapi")
+
+# pandas / numpy se usan en toda petición y en el warm-up: diferirlos solo movería el costo a la primera
+import pandas as pd
+import numpy as np
+startup_timeline.mark("import_pandas_numpy")
 
-# Cargar variables de entorno
-load_dotenv()
+from core import metrics, profiling
+from core.admission import AdmissionRejected, dataset_admission
+from core.cancellation import (
+    DEADLINE_HEADER, DisconnectProbe, RequestCancelled, await_cancellable, cancellable, check_cancelled, parse_deadline
+)
+from core.config import settings
+from core.hot_logging import HotPathLogger, in_current_context, logged_request
+from core.stage_timing import (
+    current_timer, record_stage, recording, stage, timed_endpoint, timed_request, unrecorded
+)
+from core.worker import worker_identity
+from services.analysis_rules import dataset_rule_engine
+from services.feature_pipeline import feature_pipeline
+from services.heuristic_predictor import predict_basic_batch
+from services.model_registry import model_registry
+from services.postprocessing import sanitize_students, adjust_predictions
+startup_timeline.mark("import_app_modules")
 
 # Configurar logging optimizado
 logging.basicConfig(
@@ -41,6 +67,8 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
+# Logging con límite de tasa para rutas por fila/chunk (resumen al final de cada petición)
+hot_log = HotPathLogger(logger)
 
 # Configuración única y simple
 class Config:
@@ -50,7 +78,8 @@ class Config:
     HOST = "127.0.0.1"
     PORT = 8001
     DEBUG = True
-    MAX_WORKERS = 6  # Optimizado para datasets grandes
+    MAX_WORKERS = threading_policy.executor_threads  # Hilos del executor según núcleos y procesos (core/threading_policy.py)
+    PRIORITY_WORKERS = threading_policy.priority_threads  # Carril de la predicción individual (misma política)
     CHUNK_SIZE = 1000  # Procesar en chunks de 1000 para eficiencia
     
     ALLOWED_ORIGINS = [
@@ -59,14 +88,8 @@ class Config:
         "https://predictcore-ml.vercel.app"
     ]
     
-    # Features exactas del modelo SVR (17 variables ya procesadas)
-    SVR_FEATURES = [
-        'Hours_Studied', 'Attendance', 'Parental_Involvement', 'Access_to_Resources',
-        'Extracurricular_Activities', 'Previous_Scores', 'Motivation_Level', 'Tutoring_Sessions',
-        'Family_Income', 'Teacher_Quality', 'Peer_Influence', 'Learning_Disabilities',
-        'Parental_Education_Level', 'Distance_from_Home', 'Study_Efficiency', 'High_Support',
-        'Family_Education_Support'
-    ]
+    # Features exactas del modelo SVR (orden definido en ml/models/metadata.json)
+    SVR_FEATURES = list(feature_pipeline.feature_names)
 
 config = Config()
 
@@ -74,13 +97,37 @@ config = Config()
 async def lifespan(app: FastAPI):
     """Manejo del ciclo de vida de la aplicación usando el nuevo sistema de FastAPI"""
     # Startup
+    startup_timeline.mark("server_startup")
     logger.info("🚀 Iniciando PredictScore-ML API Optimizada...")
+    logger.info(f"🧵 Política de hilos: {threading_policy.describe()}")
     
-    # Cargar modelo SVR
-    if predictor.load_model():
+    # Métricas: profundidad de cola del executor y volcado multiproceso
+    metrics.track_executor("predictor", predictor.executor)
+    metrics.track_executor("predictor_priority", predictor.priority_executor)
+    metrics.track_worker_memory()
+    metrics.registry.start_flusher()
+    
+    # Cargar modelo SVR (con serve.py ya viene precargado del maestro y se comparte copy-on-write)
+    if predictor.is_loaded and predictor.active.stamp == model_artifact_stamp():
+        logger.info(f"♻️ Worker {worker_identity.worker_id}: modelo precargado por el maestro (versión {predictor.active.version})")
+    elif predictor.load_model():
         logger.info("✅ Sistema listo - Modelo SVR cargado")
     else:
         logger.warning("⚠️ Sistema en modo degradado - Predicción básica disponible")
+    startup_timeline.mark("model_load")
+    
+    # Warm-up en segundo plano: /health/live responde mientras tanto, /health/ready recién al terminar
+    warmup = None
+    if settings.WARMUP_ENABLED:
+        warmup = asyncio.create_task(run_warmup())
+    else:
+        mark_ready()
+    
+    # Recarga en caliente al publicarse una nueva versión (0 = solo vía /admin)
+    watcher = None
+    if settings.MODEL_RELOAD_WATCH_SECONDS > 0:
+        watcher = asyncio.create_task(predictor.watch_artifacts(settings.MODEL_RELOAD_WATCH_SECONDS))
+        logger.info(f"👀 Vigilando publicaciones del modelo cada {settings.MODEL_RELOAD_WATCH_SECONDS:g}s")
     
     logger.info(f"📍 API disponible en: http://{config.HOST}:{config.PORT}")
     logger.info(f"📚 Documentación: http://{config.HOST}:{config.PORT}/docs")
@@ -89,7 +136,12 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🔄 Cerrando PredictScore-ML API...")
+    for task in (warmup, watcher):
+        if task is not None:
+            task.cancel()
+    metrics.registry.flush()
     predictor.executor.shutdown(wait=True)
+    predictor.priority_executor.shutdown(wait=True)
 
 # Crear aplicación FastAPI con lifespan
 app = FastAPI(
@@ -101,15 +153,88 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Configurar CORS
+DATASET_UPLOAD_PATH = "/api/v1/predictions/predict-dataset"
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    """
+    Admisión de uploads de dataset antes de leer el cuerpo: presupuesto de bytes
+    en vuelo según `Content-Length` (sin cabecera se asume el máximo permitido)
+    """
+    if request.url.path != DATASET_UPLOAD_PATH or request.method != "POST":
+        return await call_next(request)
+
+    try:
+        size = int(request.headers.get("content-length", ""))
+    except ValueError:
+        size = dataset_admission.max_request_bytes
+    # Con plazo, la espera en cola no puede excederlo (el formato lo valida el endpoint)
+    try:
+        deadline = parse_deadline(request.headers.get(DEADLINE_HEADER), settings.REQUEST_DEADLINE_SECONDS)
+    except ValueError:
+        deadline = None
+    try:
+        async with dataset_admission.admit(size, None if deadline is None else deadline - time.monotonic()):
+            return await call_next(request)
+    except AdmissionRejected as e:
+        hot_log.event("admission_rejected", logging.WARNING, "🚦 Dataset rechazado (%s): %d bytes, %d en cola",
+                      e.reason, size, dataset_admission.queued)
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"detail": {"error": e.message, "reason": e.reason, "retry_after_seconds": e.retry_after}},
+            headers=e.headers
+        )
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latencia y conteo de peticiones por endpoint (plantilla de ruta, no URL cruda)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        # La admisión responde 413/503 antes del enrutado: su ruta es fija, se etiqueta igual
+        fallback = DATASET_UPLOAD_PATH if request.url.path == DATASET_UPLOAD_PATH else "unmatched"
+        endpoint = getattr(route, "path", fallback)
+        elapsed = time.perf_counter() - started
+        metrics.http_request_duration.observe(elapsed, method=request.method, endpoint=endpoint, status=status)
+        metrics.http_requests.inc(method=request.method, endpoint=endpoint, status=status)
+        metrics.worker_requests.inc(worker=worker_identity.worker_id)
+        metrics.worker_busy_seconds.inc(elapsed, worker=worker_identity.worker_id)
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Perfila la petición si lo pide `X-Profile` o si hay umbral de latencia configurado"""
+    header = request.headers.get(profiling.PROFILE_HEADER)
+    mode = profiling.requested_mode(header)
+    if mode is None:
+        return await call_next(request)
+
+    with profiling.profile_request(mode, f"{request.method}_{request.url.path}", forced=bool(header)):
+        return await call_next(request)
+
+# Configurar CORS: se agrega después de los middlewares anteriores para envolverlos,
+# así sus rechazos (413/503/504 de admisión) también llevan las cabeceras CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=config.ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
+# Detección de desconexión para @cancellable: debe ser el middleware más externo
+app.add_middleware(DisconnectProbe)
+
+# Rutas de administración (solo dependen de core/)
+from routes.admin import require_admin, router as admin_router
+app.include_router(admin_router)
+startup_timeline.mark("admin_router")
+
 # Importar y registrar rutas
 try:
     import sys
@@ -130,7 +255,7 @@ except ImportError as e:
             students_data = [data]
             
             # Predecir usando el predictor
-            predictions = await predictor.predict_dataset_async(students_data)
+            predictions = await predictor.predict_dataset_async(students_data, priority=True)
             if not predictions:
                 raise Exception("No se pudo generar predicción")
             
@@ -166,30 +291,8 @@ except ImportError as e:
                 ]
                 level = "error"
             
-            # Análisis básico de factores
-            hours_studied = data.get('Hours_Studied', 0)
-            previous_scores = data.get('Previous_Scores', 0)
-            tutoring = data.get('Tutoring_Sessions', 0)
-            
-            risk_factors = []
-            strengths = []
-            improvement_areas = []
-            
-            if hours_studied < 10:
-                risk_factors.append("Horas de estudio insuficientes")
-                improvement_areas.append("Incrementar tiempo de estudio")
-            else:
-                strengths.append("Dedicación adecuada al estudio")
-            
-            if previous_scores < 60:
-                risk_factors.append("Historial académico bajo")
-            elif previous_scores >= 80:
-                strengths.append("Excelente historial académico")
-            
-            if tutoring == 0 and score < 14:
-                improvement_areas.append("Considerar apoyo académico")
-            elif tutoring > 0:
-                strengths.append("Búsqueda de apoyo académico")
+            # Análisis básico de factores (tabla de reglas vectorizada)
+            analysis = dataset_rule_engine.analyze_one(data, score)
             
             return {
                 "success": True,
@@ -204,11 +307,7 @@ except ImportError as e:
                     "urgency_level": level,
                     "source": "fallback"
                 },
-                "analysis": {
-                    "risk_factors": risk_factors if risk_factors else ["Ningún factor de riesgo identificado"],
-                    "strengths": strengths if strengths else ["Análisis en progreso"],
-                    "improvement_areas": improvement_areas if improvement_areas else ["Mantener el rendimiento actual"]
-                }
+                "analysis": analysis
             }
         except Exception as e:
             logger.error(f"Error generando recomendaciones: {e}")
@@ -217,177 +316,211 @@ except ImportError as e:
     logger.info("✅ Endpoint básico de recomendaciones registrado")
 except Exception as e:
     logger.error(f"❌ Error registrando rutas de recomendaciones: {e}")
+startup_timeline.mark("recommendations_router")
+
+WARMUP_ROWS = 3  # Filas de prueba antes de activar un modelo recargado
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """Modelo y scaler de una misma versión: se reemplazan juntos, nunca por separado"""
+    model: Any
+    scaler: Any
+    version: str
+    loaded_at: float
+    stamp: Tuple
+    format: str = "pickle"
 
-# Importar dependencias ML
-import joblib
+def model_artifact_stamp() -> Tuple:
+    """
+    Huella de los artefactos vigentes (para detectar publicaciones).
+
+    Con registro de versiones basta la versión de metadata.json; sin él,
+    las fechas de modificación de los pickles canónicos.
+    """
+    version = model_registry.current_version()
+    if version and model_registry.has_version(version):
+        return ("version", version)
+    model_path, scaler_path = model_registry.artifact_paths()
+    return tuple(("file", path.name, path.stat().st_mtime_ns if path.exists() else None)
+                 for path in (model_path, scaler_path))
 
 class OptimizedSVRPredictor:
     """Predictor optimizado usando únicamente SVR para datasets grandes (SOLID - Single Responsibility)"""
-    
+
     def __init__(self):
-        self.model = None
-        self.scaler = None
-        self.is_loaded = False
+        # Referencia única al modelo activo: la recarga la reemplaza en una sola asignación
+        self.active: Optional[LoadedModel] = None
+        self.reloads = 0
+        self.last_reload: Optional[Dict[str, Any]] = None
         self.executor = ThreadPoolExecutor(max_workers=config.MAX_WORKERS)
-        
-        # Mapeo para conversión de datos API (CORREGIDO - incluye features derivadas)
-        self.api_to_features_mapping = {
-            'study_hours': 'Hours_Studied',
-            'attendance': 'Attendance', 
-            'parental_involvement': 'Parental_Involvement',
-            'access_to_resources': 'Access_to_Resources',
-            'extracurricular_activities': 'Extracurricular_Activities',
-            'previous_scores': 'Previous_Scores',
-            'motivation_level': 'Motivation_Level',
-            'tutoring_sessions': 'Tutoring_Sessions',
-            'family_income': 'Family_Income',
-            'teacher_quality': 'Teacher_Quality',
-            'peer_influence': 'Peer_Influence',
-            'learning_disabilities': 'Learning_Disabilities',
-            'parental_education_level': 'Parental_Education_Level',
-            'distance_from_home': 'Distance_from_Home',
-            'study_efficiency': 'Study_Efficiency',
-            'high_support': 'High_Support',
-            'family_education_support': 'Family_Education_Support'
-        }
-    
+        # Carril prioritario: la predicción individual no espera detrás de los chunks de un dataset
+        self.priority_executor = ThreadPoolExecutor(max_workers=config.PRIORITY_WORKERS, thread_name_prefix="priority")
+        self._reload_lock = asyncio.Lock()
+
+    @property
+    def model(self) -> Any:
+        return self.active.model if self.active else None
+
+    @property
+    def scaler(self) -> Any:
+        return self.active.scaler if self.active else None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.active is not None
+
     def load_model(self) -> bool:
         """Carga el modelo SVR optimizado"""
         try:
-            # Rutas a los archivos del modelo
-            model_path = Path("ml/models/mejor_modelo_avanzado_svr.pkl")
-            scaler_path = Path("ml/models/scaler_avanzado.pkl")
-            
-            if not model_path.exists():
-                logger.error(f"❌ Modelo no encontrado en: {model_path}")
-                return False
-                
-            if not scaler_path.exists():
-                logger.error(f"❌ Scaler no encontrado en: {scaler_path}")
-                return False
-            
-            # Cargar modelo y scaler
-            self.model = joblib.load(model_path)
-            self.scaler = joblib.load(scaler_path)
-            
-            self.is_loaded = True
-            logger.info("✅ Modelo SVR y scaler cargados correctamente")
+            self.active = self._load_artifacts()
+            logger.info(f"✅ Modelo SVR y scaler cargados correctamente (versión {self.active.version}, {self.active.format})")
             return True
-            
+
         except Exception as e:
             logger.error(f"❌ Error cargando modelo SVR: {e}")
             return False
-    
-    def _prepare_features_dataset(self, students_data: List[Dict[str, Any]]) -> np.ndarray:
-        """Prepara features para predicción de dataset completo (CORREGIDO - usa features derivadas correctamente)"""
-        try:
-            total_students = len(students_data)
-            logger.info(f"📊 Preparando features para {total_students} estudiantes")
-            
-            features_batch = []
-            
-            for student_data in students_data:
-                # Crear copia para no modificar original
-                student_copy = student_data.copy()
-                
-                # CALCULAR FEATURES DERIVADAS CORRECTAMENTE (como en el entrenamiento)
+
+    def _load_artifacts(self, version: Optional[str] = None) -> LoadedModel:
+        """Lee modelo y scaler de una versión (por defecto la vigente) sin tocar el modelo activo"""
+        for _ in range(3):
+            stamp = model_artifact_stamp()
+            # Arreglos mapeados en memoria (compartidos entre workers) o pickles
+            model, scaler, artifact_format = model_registry.load_serving(
+                version, prefer_arrays=settings.MODEL_ARRAYS_ENABLED
+            )
+
+            # Los pickles canónicos se reemplazan de a uno: si cambiaron durante la
+            # lectura, el par podría ser de versiones distintas y se vuelve a leer
+            if version or model_artifact_stamp() == stamp:
+                label = version or model_registry.current_version() or "canonical"
+                return LoadedModel(model, scaler, label, time.time(), stamp, artifact_format)
+        raise RuntimeError("Los artefactos del modelo cambiaron durante la carga")
+
+    @staticmethod
+    def _warm_up(candidate: LoadedModel) -> None:
+        """Predicciones de prueba (media ± desviación del scaler) antes de activar el modelo"""
+        n_features = getattr(candidate.scaler, "n_features_in_", feature_pipeline.n_features)
+        if n_features != feature_pipeline.n_features:
+            raise ValueError(f"El modelo espera {n_features} features y el pipeline genera {feature_pipeline.n_features}")
+
+        mean = getattr(candidate.scaler, "mean_", np.zeros(n_features))
+        spread = getattr(candidate.scaler, "scale_", np.ones(n_features))
+        X = mean + spread * np.linspace(-1.0, 1.0, WARMUP_ROWS).reshape(-1, 1)
+        predictions = candidate.model.predict(candidate.scaler.transform(X))
+        if predictions.shape != (WARMUP_ROWS,) or not np.all(np.isfinite(predictions)):
+            raise ValueError("El modelo recargado produjo predicciones inválidas")
+
+    def _prepare_candidate(self, version: Optional[str]) -> Tuple[LoadedModel, float, float]:
+        started = time.perf_counter()
+        candidate = self._load_artifacts(version)
+        load_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        self._warm_up(candidate)
+        return candidate, load_seconds, time.perf_counter() - started
+
+    async def reload_model(self, version: Optional[str] = None, trigger: str = "admin") -> Dict[str, Any]:
+        """
+        Recarga en caliente: carga y calienta el nuevo modelo en segundo plano y
+        luego reemplaza la referencia activa. Las peticiones en curso terminan
+        con el modelo que tomaron al empezar; si algo falla, sigue el anterior.
+        """
+        async with self._reload_lock:
+            previous = self.active
+            loop = asyncio.get_running_loop()
+            try:
+                candidate, load_seconds, warmup_seconds = await loop.run_in_executor(
+                    None, self._prepare_candidate, version
+                )
+            except Exception as e:
+                metrics.model_reloads.inc(trigger=trigger, outcome="failed")
+                logger.error(f"❌ Recarga del modelo fallida ({trigger}): {e} - se mantiene la versión activa")
+                self.last_reload = {"trigger": trigger, "outcome": "failed", "error": str(e), "timestamp": time.time()}
+                raise
+
+            self.active = candidate
+            self.reloads += 1
+            metrics.model_reloads.inc(trigger=trigger, outcome="success")
+            self.last_reload = {
+                "trigger": trigger,
+                "outcome": "success",
+                "previous_version": previous.version if previous else None,
+                "version": candidate.version,
+                "load_seconds": round(load_seconds, 3),
+                "warmup_seconds": round(warmup_seconds, 3),
+                "timestamp": candidate.loaded_at
+            }
+            logger.info(f"🔁 Modelo recargado ({trigger}): {self.last_reload['previous_version']} -> {candidate.version} "
+                        f"(carga {load_seconds:.2f}s, warm-up {warmup_seconds:.3f}s)")
+            return self.last_reload
+
+    async def watch_artifacts(self, interval: float) -> None:
+        """
+        Vigila las publicaciones del registro y recarga al detectar una nueva.
+
+        El cambio debe mantenerse estable durante un intervalo antes de recargar,
+        para no leer una publicación a medio escribir.
+        """
+        known = self.active.stamp if self.active else None
+        pending = None
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                current = model_artifact_stamp()
+            except OSError as e:
+                logger.warning(f"⚠️ No se pudieron leer los artefactos del modelo: {e}")
+                continue
+
+            if current == known:
+                pending = None
+            elif current != pending:
+                pending = current
+            else:
+                known, pending = current, None
                 try:
-                    # Study_Efficiency = Hours_Studied / Attendance (ratio como en entrenamiento)
-                    hours = float(student_copy.get('study_hours', student_copy.get('Hours_Studied', 10)))
-                    attendance = float(student_copy.get('attendance', student_copy.get('Attendance', 85)))
-                    study_efficiency = hours / max(attendance, 1) if attendance > 0 else 0.1
-                    
-                    # High_Support = 1 if tutoring > 2, else 0
-                    tutoring = float(student_copy.get('tutoring_sessions', student_copy.get('Tutoring_Sessions', 1)))
-                    high_support = 1.0 if tutoring > 2 else 0.0
-                    
-                    # Family_Education_Support = 1 if Bachelor+, else 0
-                    parental_edu = student_copy.get('parental_education_level', student_copy.get('Parental_Education_Level', 'High School'))
-                    if isinstance(parental_edu, str):
-                        family_edu_support = 1.0 if parental_edu in ['Bachelor', 'Master', 'PhD'] else 0.0
-                    else:
-                        # Si es numérico: 0=High School, 1=Bachelor, 2=Master, 3=PhD
-                        family_edu_support = 1.0 if int(parental_edu) >= 1 else 0.0
-                    
-                    # Añadir features derivadas
-                    student_copy['Study_Efficiency'] = study_efficiency
-                    student_copy['High_Support'] = high_support
-                    student_copy['Family_Education_Support'] = family_edu_support
-                    
-                except Exception as e:
-                    logger.warning(f"Error calculando features derivadas: {e}")
-                    student_copy['Study_Efficiency'] = 0.25
-                    student_copy['High_Support'] = 0.0
-                    student_copy['Family_Education_Support'] = 0.0
-                
-                features = []
-                
-                # Convertir cada característica según el orden requerido
-                for feature_name in config.SVR_FEATURES:
-                    # Buscar el valor en los datos del estudiante
-                    api_key = None
-                    for api_name, model_name in self.api_to_features_mapping.items():
-                        if model_name == feature_name:
-                            api_key = api_name
-                            break
-                    
-                    if api_key and api_key in student_copy:
-                        value = student_copy[api_key]
-                    elif feature_name in student_copy:  # Para datos CSV directos
-                        value = student_copy[feature_name]
-                    else:
-                        # Valores por defecto solo si NO se encuentra la feature
-                        defaults = {
-                            'Hours_Studied': 10.0, 'Attendance': 85.0, 'Previous_Scores': 75.0,
-                            'Tutoring_Sessions': 1.0, 'Study_Efficiency': 0.25, 'High_Support': 0.0,
-                            'Family_Education_Support': 0.0
-                        }
-                        value = defaults.get(feature_name, 1.0)
-                        logger.warning(f"Usando valor por defecto para {feature_name}: {value}")
-                    
-                    # Convertir a float
-                    try:
-                        if isinstance(value, str):
-                            # Conversiones categóricas básicas (mismas que el entrenamiento)
-                            categorical_map = {
-                                'Low': 0, 'Medium': 1, 'High': 2,
-                                'No': 0, 'Yes': 1,
-                                'Poor': 0, 'Average': 1, 'Good': 2, 'Excellent': 3,
-                                'Negative': 0, 'Neutral': 1, 'Positive': 2,
-                                'Near': 0, 'Moderate': 1, 'Far': 2,
-                                'High School': 0, 'Bachelor': 1, 'Master': 2, 'PhD': 3
-                            }
-                            value = categorical_map.get(value, 1)
-                        
-                        features.append(float(value))
-                    except:
-                        features.append(1.0)  # Fallback
-                
-                # Verificar que tenemos 17 features
-                if len(features) != 17:
-                    logger.warning(f"⚠️ Feature count mismatch: {len(features)}/17")
-                    # Completar o truncar a 17
-                    features = (features + [1.0] * 17)[:17]
-                
-                features_batch.append(features)
-            
-            result = np.array(features_batch)
-            logger.info(f"✅ Features preparadas: {result.shape}")
+                    await self.reload_model(trigger="watcher")
+                except Exception:
+                    pass  # Ya registrado; se reintenta con la próxima publicación
+
+    def _prepare_features_dataset(
+        self,
+        students_data: List[Dict[str, Any]],
+        unknown_labels: Optional[Dict[str, Dict[str, int]]] = None
+    ) -> np.ndarray:
+        """Prepara features para predicción de dataset completo (pipeline compilado compartido con el entrenamiento)"""
+        try:
+            with stage("feature_build"):
+                result = feature_pipeline.transform(students_data, unknown_labels)
+            hot_log.event("features_prepared", logging.DEBUG, "✅ Features preparadas: %s", result.shape)
             return result
             
         except Exception as e:
-            logger.error(f"❌ Error preparando features: {e}")
+            hot_log.event("features_error", logging.ERROR, "❌ Error preparando features: %s", e)
+            metrics.fallback_activations.inc(component="predictor", reason="features_error")
             # Retornar datos por defecto
-            return np.ones((len(students_data), 17))
+            return np.ones((len(students_data), feature_pipeline.n_features))
     
-    async def predict_dataset_async(self, students_data: List[Dict[str, Any]]) -> List[float]:
-        """Predicción asíncrona de dataset completo optimizada para datasets grandes (1000-2000+ estudiantes)"""
+    async def predict_dataset_async(
+        self,
+        students_data: List[Dict[str, Any]],
+        unknown_labels: Optional[Dict[str, Dict[str, int]]] = None,
+        priority: bool = False
+    ) -> List[float]:
+        """
+        Predicción asíncrona de dataset completo optimizada para datasets grandes (1000-2000+ estudiantes)
+        
+        `unknown_labels` acumula las etiquetas categóricas desconocidas de todos los chunks.
+        Con `priority` se usa el carril propio de la predicción individual.
+        """
         total_students = len(students_data)
         logger.info(f"🚀 Iniciando predicción de dataset completo: {total_students} estudiantes")
         
-        if not self.is_loaded:
+        # El modelo se toma una vez: una recarga en curso no cambia la versión a mitad del dataset
+        active = self.active
+        if active is None:
             logger.warning("⚠️ Modelo no cargado, usando predicción básica")
-            return [self._predict_basic(data) for data in students_data]
+            metrics.fallback_activations.inc(component="predictor", reason="model_not_loaded")
+            return predict_basic_batch(students_data).tolist()
         
         try:
             start_time = time.time()
@@ -397,156 +530,192 @@ class OptimizedSVRPredictor:
             all_predictions = []
             
             for i in range(0, total_students, chunk_size):
+                # Petición abandonada (plazo o desconexión): no se envían más chunks
+                await check_cancelled()
                 chunk = students_data[i:i + chunk_size]
                 chunk_size_actual = len(chunk)
                 
-                logger.info(f"📊 Procesando chunk {i//chunk_size + 1}: {chunk_size_actual} estudiantes")
+                hot_log.event("chunk_started", logging.INFO, "📊 Procesando chunk %d: %d estudiantes",
+                              i // chunk_size + 1, chunk_size_actual)
                 
-                # Ejecutar en hilo separado para no bloquear
+                # Ejecutar en hilo separado para no bloquear (conservando el contexto de la petición);
+                # si la petición se abandona mientras espera, el chunk pendiente se cancela
                 loop = asyncio.get_event_loop()
-                predictions = await loop.run_in_executor(
-                    self.executor, 
-                    self._predict_dataset_sync, 
-                    chunk
-                )
+                predictions = await await_cancellable(loop.run_in_executor(
+                    self.priority_executor if priority else self.executor, 
+                    in_current_context(self._predict_dataset_sync), 
+                    chunk,
+                    unknown_labels,
+                    active
+                ))
                 all_predictions.extend(predictions)
                 
                 # Log de progreso para datasets grandes
                 progress = min(i + chunk_size, total_students)
-                percentage = (progress / total_students) * 100
-                logger.info(f"📈 Progreso: {progress}/{total_students} estudiantes ({percentage:.1f}%)")
+                hot_log.event("chunk_progress", logging.INFO, "📈 Progreso: %d/%d estudiantes (%.1f%%)",
+                              progress, total_students, progress / total_students * 100)
             
             processing_time = time.time() - start_time
             logger.info(f"✅ Dataset completo procesado en {processing_time:.2f}s ({total_students/processing_time:.1f} estudiantes/s)")
             
             return all_predictions
             
+        except RequestCancelled as e:
+            logger.info(f"🛑 Predicción de dataset cancelada ({e.reason}) tras {len(all_predictions)}/{total_students} estudiantes")
+            raise
         except Exception as e:
             logger.error(f"❌ Error en predicción de dataset: {e}")
-            return [self._predict_basic(data) for data in students_data]
+            metrics.fallback_activations.inc(component="predictor", reason="dataset_error")
+            return predict_basic_batch(students_data).tolist()
     
-    def _predict_dataset_sync(self, students_data: List[Dict[str, Any]]) -> List[float]:
+    def _predict_dataset_sync(
+        self,
+        students_data: List[Dict[str, Any]],
+        unknown_labels: Optional[Dict[str, Dict[str, int]]] = None,
+        active: Optional[LoadedModel] = None
+    ) -> List[float]:
         """Predicción síncrona para un chunk del dataset"""
+        chunk_started = time.perf_counter()
         try:
-            # Preparar features
-            X = self._prepare_features_dataset(students_data)
-            
-            # Escalar
-            X_scaled = self.scaler.transform(X)
-            
-            # Predecir en lote (vectorizado - mucho más rápido)
-            predictions = self.model.predict(X_scaled)
-            
-            # Asegurar rango 0-100
-            predictions = np.clip(predictions, 0, 100)
-            
-            return predictions.tolist()
+            with profiling.thread_scope():
+                return self._predict_chunk(students_data, unknown_labels, active or self.active)
             
         except Exception as e:
-            logger.error(f"❌ Error en predicción síncrona: {e}")
-            return [self._predict_basic(data) for data in students_data]
+            hot_log.event("chunk_error", logging.ERROR, "❌ Error en predicción síncrona: %s", e)
+            metrics.fallback_activations.inc(component="predictor", reason="chunk_error")
+            return predict_basic_batch(students_data).tolist()
+        
+        finally:
+            if recording():
+                metrics.chunk_duration.observe(time.perf_counter() - chunk_started)
     
-    def _predict_basic(self, student_data: Dict[str, Any]) -> float:
-        """
-        Predicción básica de fallback realista (KISS + DRY)
-        Aplica lógica de negocio educativa real
-        """
-        try:
-            # Factores críticos que determinan rendimiento académico
-            critical_factors = {
-                'attendance': student_data.get('attendance', 85),
-                'previous_scores': student_data.get('previous_scores', 75),
-                'study_hours': student_data.get('study_hours', 10)
-            }
-            
-            # VALIDACIÓN REALISTA: Casos extremos
-            attendance = critical_factors['attendance']
-            previous_scores = critical_factors['previous_scores']
-            study_hours = critical_factors['study_hours']
-            
-            # Regla 1: Asistencia crítica = rendimiento crítico
-            if attendance < 20:
-                logger.warning(f"Asistencia crítica: {attendance}%")
-                return max(10, min(30, previous_scores * 0.4))  # Máximo 30/100
-            
-            # Regla 2: Sin historial académico previo
-            if previous_scores < 30:
-                logger.warning(f"Historial académico crítico: {previous_scores}")
-                return max(15, min(40, previous_scores * 0.6))  # Máximo 40/100
-            
-            # Regla 3: Muy pocas horas de estudio
-            if study_hours < 2:
-                logger.warning(f"Horas de estudio insuficientes: {study_hours}")
-                base_score = (attendance + previous_scores) / 2
-                return max(20, min(base_score * 0.7, 45))  # Penalización por falta de estudio
-            
-            # Factores con pesos realistas basados en investigación educativa
-            weights = {
-                'previous_scores': 0.35,    # Predictor más fuerte
-                'attendance': 0.25,         # Crítico para rendimiento
-                'study_hours': 0.15,        # Importante pero no determinante
-                'motivation_level': 0.10,   # Factor psicológico
-                'parental_involvement': 0.08, # Apoyo familiar
-                'access_to_resources': 0.07  # Factores socioeconómicos
-            }
-            
-            score = 0
-            total_weight = 0
-            
-            for feature, weight in weights.items():
-                if feature in student_data:
-                    value = student_data[feature]
-                    
-                    # Normalización realista a 0-100
-                    if feature == 'previous_scores':
-                        normalized = min(float(value), 100)
-                    elif feature == 'attendance':
-                        normalized = min(float(value), 100)
-                    elif feature == 'study_hours':
-                        # Hasta 10 horas = 100, más de 10 = saturación
-                        normalized = min(float(value) * 10, 100)
-                    else:
-                        # Conversión categórica realista
-                        if isinstance(value, str):
-                            mapping = {
-                                'Low': 20, 'Medium': 60, 'High': 90,
-                                'Poor': 20, 'Average': 50, 'Good': 80, 'Excellent': 95,
-                                'Negative': 15, 'Neutral': 50, 'Positive': 85,
-                                'No': 30, 'Yes': 70
-                            }
-                            normalized = mapping.get(value, 50)
-                        else:
-                            normalized = min(float(value) * 20, 100)
-                    
-                    score += normalized * weight
-                    total_weight += weight
-            
-            # Cálculo final con límites realistas
-            final_score = score / total_weight if total_weight > 0 else 50
-            
-            # Aplicar factores correctivos adicionales
-            negative_factors = 0
-            if student_data.get('learning_disabilities') == 'Yes': negative_factors += 1
-            if student_data.get('peer_influence') == 'Negative': negative_factors += 1
-            if student_data.get('family_income') == 'Low': negative_factors += 0.5
-            if student_data.get('distance_from_home') == 'Far': negative_factors += 0.5
-            
-            # Aplicar penalización por factores negativos
-            if negative_factors > 0:
-                penalty = min(negative_factors * 0.1, 0.3)  # Máximo 30% penalización
-                final_score *= (1 - penalty)
-                logger.info(f"Aplicada penalización por factores negativos: {penalty:.1%}")
-            
-            # Límites finales realistas
-            return max(10, min(95, final_score))
-            
-        except Exception as e:
-            logger.error(f"❌ Error en predicción básica: {e}")
-            return 50.0  # Valor neutro por defecto
+    def _predict_chunk(
+        self,
+        students_data: List[Dict[str, Any]],
+        unknown_labels: Optional[Dict[str, Dict[str, int]]],
+        active: LoadedModel
+    ) -> List[float]:
+        """Features, escalado y kernel SVR de un chunk"""
+        # Preparar features
+        X = self._prepare_features_dataset(students_data, unknown_labels)
+        
+        # Escalar
+        with stage("scale"):
+            X_scaled = active.scaler.transform(X)
+        
+        # Predecir en lote (vectorizado - mucho más rápido)
+        with stage("kernel_predict"):
+            predictions = active.model.predict(X_scaled)
+        
+        # Asegurar rango 0-100
+        predictions = np.clip(predictions, 0, 100)
+        
+        return predictions.tolist()
 
 # Instancia global del predictor
 predictor = OptimizedSVRPredictor()
 
+class WarmupState:
+    """Estado de arranque: liveness (proceso vivo) separado de readiness (warm-up terminado)"""
+
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.report: Optional[Dict[str, Any]] = None
+
+# Estado global del warm-up (Singleton pattern)
+warmup_state = WarmupState()
+
+def warmup_dataset(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Estudiantes de prueba con el formato de /predict-dataset (valores por defecto con variación)"""
+    rng = np.random.default_rng(seed)
+    students = pd.DataFrame([StudentData().dict()] * rows)
+    students["study_hours"] = rng.uniform(1, 40, rows).round(1)
+    students["attendance"] = rng.uniform(60, 100, rows).round(1)
+    students["previous_scores"] = rng.uniform(50, 100, rows).round(1)
+    students["tutoring_sessions"] = rng.integers(0, 5, rows)
+    for field in ("parental_involvement", "access_to_resources", "motivation_level", "family_income"):
+        students[field] = rng.choice(["Low", "Medium", "High"], rows)
+    return feature_pipeline.to_frame(students)
+
+async def warm_up_service() -> Dict[str, Any]:
+    """
+    Predicciones representativas por cada ruta antes de declarar el servicio listo.
+
+    Recorre la predicción individual, el dataset (parseo CSV, sanitizado, chunks
+    en todos los hilos del executor, post-proceso y análisis) y el fallback
+    heurístico, para pagar antes de la primera petición las importaciones
+    diferidas, el arranque de hilos/BLAS y los fallos de página sobre los
+    vectores de soporte. Sus tiempos no entran en los histogramas globales.
+    """
+    paths: Dict[str, float] = {}
+    total_started = time.perf_counter()
+    with timed_request() as timer, unrecorded():
+        # Individual
+        started = time.perf_counter()
+        frame, risk_adjustment = sanitize_students(pd.DataFrame([StudentData().dict()]))
+        predictions = await predictor.predict_dataset_async(frame.to_dict('records'), priority=True)
+        adjust_predictions(np.array(predictions), frame, risk_adjustment)
+        paths["single"] = time.perf_counter() - started
+
+        # Dataset completo
+        started = time.perf_counter()
+        with stage("csv_parse"):
+            df = pd.read_csv(io.StringIO(warmup_dataset(settings.WARMUP_BATCH_ROWS).to_csv(index=False)))
+        sanitized_df, risk_adjustment = sanitize_students(df)
+        records = sanitized_df.to_dict('records')
+        predictions_array = np.array(await predictor.predict_dataset_async(records))
+        adjusted, _ = adjust_predictions(predictions_array, sanitized_df, risk_adjustment)
+        dataset_rule_engine.analyze(df, adjusted * 0.2)
+        paths["dataset"] = time.perf_counter() - started
+
+        # Un lote concurrente por hilo del executor: los crea a todos antes del tráfico real
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            predictor.predict_dataset_async(records[index::config.MAX_WORKERS])
+            for index in range(config.MAX_WORKERS)
+        ))
+        paths["executor_threads"] = time.perf_counter() - started
+
+        # Fallback heurístico (modo degradado o error de chunk)
+        started = time.perf_counter()
+        predict_basic_batch(records)
+        paths["fallback"] = time.perf_counter() - started
+
+        stages = timer.breakdown()["stages_seconds"]
+
+    return {
+        "seconds": round(time.perf_counter() - total_started, 3),
+        "rows": len(records),
+        "model_version": predictor.active.version if predictor.active else None,
+        "paths_seconds": {name: round(seconds, 4) for name, seconds in paths.items()},
+        "stages_seconds": stages
+    }
+
+async def run_warmup() -> None:
+    """Warm-up de arranque; el servicio queda listo aunque falle (con el error en el reporte)"""
+    warmup_state.started_at = time.time()
+    try:
+        warmup_state.report = await warm_up_service()
+        logger.info(f"🔥 Warm-up completado en {warmup_state.report['seconds']:.2f}s: {warmup_state.report['paths_seconds']}")
+    except Exception as e:
+        warmup_state.report = {"error": str(e)}
+        logger.error(f"❌ Error en warm-up (el servicio se declara listo igualmente): {e}")
+    startup_timeline.mark("warmup")
+    mark_ready()
+
+def mark_ready() -> None:
+    """Declara el worker listo y resume su arranque contra el presupuesto"""
+    warmup_state.ready = True
+    worker_identity.notify_ready()
+    total = startup_timeline.mark_ready()
+    phases = {name: round(seconds, 3) for name, seconds in startup_timeline.phases.items()}
+    logger.info(f"⏱️ Worker listo en {total:.2f}s: {phases}")
+    if startup_timeline.preload is not None:
+        logger.info(f"📦 Precarga compartida del maestro: {startup_timeline.preload['seconds']:.2f}s")
+    if total > settings.WORKER_BOOT_BUDGET_SECONDS:
+        logger.warning(f"⚠️ Arranque ({total:.2f}s) por encima del presupuesto de {settings.WORKER_BOOT_BUDGET_SECONDS:g}s")
+
 # Crear aplicación FastAPI con lifespan
 
 # === ENDPOINTS OPTIMIZADOS ===
@@ -565,13 +734,37 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Verificación de salud del sistema"""
-    return {
-        "status": "healthy",
+    """Verificación de salud del sistema (503 hasta terminar el warm-up)"""
+    return JSONResponse(status_code=200 if warmup_state.ready else 503, content={
+        "status": "healthy" if warmup_state.ready else "warming_up",
+        "ready": warmup_state.ready,
         "model_loaded": predictor.is_loaded,
+        "model_version": predictor.active.version if predictor.active else None,
+        "model_format": predictor.active.format if predictor.active else None,
+        "model_loaded_at": predictor.active.loaded_at if predictor.active else None,
+        "model_reloads": predictor.reloads,
         "timestamp": time.time(),
-        "features_count": len(config.SVR_FEATURES)
-    }
+        "features_count": len(config.SVR_FEATURES),
+        "warmup": warmup_state.report,
+        "worker": worker_identity.snapshot(),
+        "threading": threading_controller.snapshot()
+    })
+
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: el proceso responde (no depende del modelo ni del warm-up)"""
+    return {"status": "alive", "timestamp": time.time()}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: 200 solo cuando el warm-up terminó y puede recibir tráfico"""
+    return JSONResponse(status_code=200 if warmup_state.ready else 503, content={
+        "status": "ready" if warmup_state.ready else "warming_up",
+        "model_loaded": predictor.is_loaded,
+        "model_version": predictor.active.version if predictor.active else None,
+        "warmup_started_at": warmup_state.started_at,
+        "warmup": warmup_state.report
+    })
 
 @app.get("/api/v1/predictions/dataset-format")
 async def get_dataset_format():
@@ -592,6 +785,54 @@ async def get_dataset_format():
         "performance": "Puede procesar 1000+ estudiantes en segundos"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/v1/performance/stages")
+async def get_stage_histograms():
+    """Histogramas acumulados de duración por etapa del pipeline de predicción (los mismos de /metrics)"""
+    return {
+        "unit": "seconds",
+        "buckets": list(metrics.stage_duration.buckets),
+        "stages": {
+            stage_name: summary
+            for (stage_name,), summary in metrics.registry.histogram_summary(metrics.stage_duration).items()
+        },
+        "timestamp": time.time()
+    }
+
+@app.get("/api/v1/performance/admission")
+async def get_admission_state():
+    """Control de admisión de datasets: bytes en vuelo, cola y decisiones de este worker"""
+    return {**dataset_admission.snapshot(), "timestamp": time.time()}
+
+@app.get("/api/v1/performance/startup")
+async def get_startup_timeline():
+    """Fases del arranque de este worker (importaciones, app, modelo, warm-up; con serve.py, desde el fork)"""
+    return {
+        **startup_timeline.snapshot(),
+        "ready": warmup_state.ready,
+        "budget_seconds": settings.WORKER_BOOT_BUDGET_SECONDS
+    }
+
+@app.post("/api/v1/admin/model/reload", tags=["admin"], dependencies=[Depends(require_admin)])
+async def reload_model(
+    version: Optional[str] = Query(None, description="Versión del registro a activar (por defecto la vigente)")
+):
+    """
+    Recarga el modelo sin reiniciar: las peticiones en curso terminan con la
+    versión anterior. Solo afecta a este worker; con varios workers usar
+    `MODEL_RELOAD_WATCH_SECONDS`.
+    """
+    if version and not model_registry.has_version(version):
+        raise HTTPException(status_code=404, detail=f"Versión no encontrada: {version}")
+    try:
+        return await predictor.reload_model(version, trigger="admin")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Recarga fallida, se mantiene la versión activa: {e}")
+
 # Esquemas de datos
 from pydantic import BaseModel
 
@@ -611,98 +852,31 @@ class StudentData(BaseModel):
     parental_education_level: str = "Bachelor"
     distance_from_home: str = "Near"
 
-def validate_and_sanitize_student_data(student_data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Valida y sanitiza los datos del estudiante aplicando reglas de negocio realistas.
-    Principio KISS: Simple validación que evita predicciones irreales.
-    """
-    sanitized = student_data.copy()
-    
-    # Validaciones críticas para evitar predicciones irreales
-    # REGLA: Asistencia muy baja = rendimiento muy bajo
-    if sanitized.get('attendance', 85) < 10:
-        logger.warning(f"Asistencia crítica detectada: {sanitized['attendance']}%")
-        # Forzar datos realistas para asistencia extremadamente baja
-        sanitized['previous_scores'] = min(sanitized.get('previous_scores', 75), 30)
-        sanitized['motivation_level'] = 'Low'
-        
-    # REGLA: Calificaciones previas muy bajas = tendencia negativa
-    if sanitized.get('previous_scores', 75) < 30:
-        logger.warning(f"Calificaciones previas críticas: {sanitized['previous_scores']}")
-        
-    # REGLA: Múltiples factores negativos = resultado realista
-    negative_factors = 0
-    if sanitized.get('attendance', 85) < 50: negative_factors += 2
-    if sanitized.get('previous_scores', 75) < 50: negative_factors += 2
-    if sanitized.get('study_hours', 10) < 3: negative_factors += 1
-    if sanitized.get('parental_involvement') == 'Low': negative_factors += 1
-    if sanitized.get('access_to_resources') == 'Low': negative_factors += 1
-    if sanitized.get('motivation_level') == 'Low': negative_factors += 1
-    if sanitized.get('learning_disabilities') == 'Yes': negative_factors += 1
-    if sanitized.get('peer_influence') == 'Negative': negative_factors += 1
-    
-    # Si hay muchos factores negativos, aplicar corrección realista
-    if negative_factors >= 6:
-        logger.warning(f"Múltiples factores negativos detectados ({negative_factors})")
-        # Ajustar expectativas de manera realista
-        sanitized['_risk_adjustment'] = True
-        
-    return sanitized
-
 @app.post("/api/v1/predictions/predict")
-async def predict_single(student: StudentData):
+@logged_request("predict", logger)
+@timed_endpoint
+async def predict_single(
+    student: StudentData,
+    include_timings: bool = Query(False, description="Incluir desglose de tiempos por etapa")
+):
     """Predicción individual optimizada con validación realista"""
     try:
         start_time = time.time()
         
-        # Convertir a diccionario
-        student_data = student.dict()
-        
-        # VALIDAR Y SANITIZAR DATOS (Principio SOLID - Single Responsibility)
-        student_data = validate_and_sanitize_student_data(student_data)
-        
-        # CALCULAR FEATURES DERIVADAS CORRECTAMENTE
-        # Study_Efficiency = Hours_Studied / max(Attendance, 1) para evitar división por 0
-        attendance_safe = max(student_data['attendance'], 1)  # Mínimo 1% para evitar división por 0
-        study_eff = student_data['study_hours'] / attendance_safe
-        student_data['study_efficiency'] = study_eff
-        
-        # High_Support = 1 si tutoring > 2, sino 0
-        student_data['high_support'] = 1.0 if student_data['tutoring_sessions'] > 2 else 0.0
-        
-        # Family_Education_Support = 1 si Bachelor+, sino 0
-        student_data['family_education_support'] = 1.0 if student_data['parental_education_level'] in ['Bachelor', 'Master', 'PhD'] else 0.0
+        # VALIDAR Y SANITIZAR DATOS (misma etapa vectorizada que el dataset)
+        with stage("sanitize"):
+            frame, risk_adjustment = sanitize_students(pd.DataFrame([student.dict()]))
+            student_data = frame.to_dict('records')[0]
         
+        # Las features derivadas las calcula el pipeline compartido
         # Predecir
-        predictions = await predictor.predict_dataset_async([student_data])
-        prediction = predictions[0]
-        
-        # APLICAR POTENCIADOR PARA CASOS EXCEPCIONALES (para alcanzar AD)
-        excellence_bonus = 0
-        if (student_data['attendance'] >= 98 and 
-            student_data['previous_scores'] >= 95 and 
-            student_data['study_hours'] >= 12 and
-            student_data['tutoring_sessions'] >= 4 and
-            student_data['parental_education_level'] in ['Master', 'PhD']):
-            excellence_bonus = 15  # Bonus del 15% para casos excepcionales
-            logger.info(f"Aplicado bonus de excelencia: +{excellence_bonus}%")
-        
-        # APLICAR CORRECCIÓN REALISTA si hay factores de riesgo extremos
-        if student_data.get('_risk_adjustment'):
-            # Aplicar penalización por múltiples factores negativos
-            risk_penalty = 0.3  # 30% de penalización
-            prediction = prediction * (1 - risk_penalty)
-            logger.info(f"Aplicada corrección de riesgo: {prediction:.1f}")
-        
-        # Aplicar bonus de excelencia
-        if excellence_bonus > 0:
-            prediction = min(prediction * (1 + excellence_bonus/100), 100)
-        
-        # Validación final: Casos extremos
-        if student_data['attendance'] < 10 or student_data['previous_scores'] < 20:
-            # Forzar resultado realista para casos extremos
-            prediction = min(prediction, 35)  # Máximo 35/100 para casos críticos
-            logger.warning("Aplicada corrección para caso extremo")
+        predictions = await predictor.predict_dataset_async([student_data], priority=True)
+        
+        # APLICAR CORRECCIONES: riesgo, bonus de excelencia y casos extremos
+        with stage("post_process"):
+            adjusted, _ = adjust_predictions(np.array(predictions), frame, risk_adjustment)
+            prediction = float(adjusted[0])
+        metrics.rows_predicted.inc(source="single")
         
         processing_time = time.time() - start_time
         
@@ -714,7 +888,7 @@ async def predict_single(student: StudentData):
             "B" if prediction_20 >= 10 else "C"
         )
         
-        return {
+        response = {
             "prediction_100": round(prediction, 2),
             "prediction_20": round(prediction_20, 2),
             "letter_grade": letter_grade,
@@ -723,13 +897,23 @@ async def predict_single(student: StudentData):
             "processing_time": round(processing_time, 3),
             "timestamp": time.time()
         }
+        if include_timings:
+            response["performance"] = current_timer().breakdown()
+        return response
         
     except Exception as e:
         logger.error(f"❌ Error en predicción individual: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/v1/predictions/predict-dataset")
-async def predict_dataset(file: UploadFile = File(...)):
+@logged_request("predict-dataset", logger)
+@timed_endpoint
+@cancellable
+async def predict_dataset(
+    request: Request,
+    file: UploadFile = File(...),
+    include_timings: bool = Query(False, description="Incluir desglose de tiempos por etapa")
+):
     """Predicción de dataset completo desde CSV optimizada para datasets grandes"""
     try:
         start_time = time.time()
@@ -739,8 +923,14 @@ async def predict_dataset(file: UploadFile = File(...)):
             raise HTTPException(status_code=400, detail="Archivo debe ser CSV")
         
         # Leer CSV
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+        with stage("upload_read"):
+            content = await file.read()
+        if len(content) > dataset_admission.max_request_bytes:
+            raise HTTPException(status_code=413, detail=f"El archivo supera el máximo de {settings.MAX_FILE_SIZE_MB:g} MB")
+        with stage("decode"):
+            text = content.decode('utf-8')
+        with stage("csv_parse"):
+            df = pd.read_csv(io.StringIO(text))
         
         total_students = len(df)
         logger.info(f"� Dataset cargado: {file.filename} ({total_students} estudiantes)")
@@ -766,34 +956,56 @@ async def predict_dataset(file: UploadFile = File(...)):
         # Convertir DataFrame a lista de diccionarios
         students_data = df.to_dict('records')
         
+        # Sanitizar con la misma etapa vectorizada que la predicción individual
+        with stage("sanitize"):
+            sanitized_df, risk_adjustment = sanitize_students(df)
+            model_input = students_data if sanitized_df is df else sanitized_df.to_dict('records')
+        
         # Predicción optimizada para dataset completo
         logger.info(f"🚀 Iniciando predicción de dataset completo: {total_students} estudiantes")
-        predictions = await predictor.predict_dataset_async(students_data)
+        unknown_labels: Dict[str, Dict[str, int]] = {}
+        predictions = await predictor.predict_dataset_async(model_input, unknown_labels)
+        if unknown_labels:
+            logger.warning(f"⚠️ Etiquetas desconocidas en {file.filename}: {unknown_labels}")
+        # Post-proceso, análisis y respuesta son por fila: no vale la pena si nadie la espera
+        await check_cancelled()
+        
+        # Correcciones de negocio sobre todo el arreglo (sin bucle por fila)
+        with stage("post_process"):
+            predictions_array, adjustment_counts = adjust_predictions(np.array(predictions), sanitized_df, risk_adjustment)
+            predictions = predictions_array.tolist()
+        metrics.rows_predicted.inc(total_students, source="dataset")
+        
+        # Análisis por estudiante en una sola pasada (máscaras NumPy sobre todo el dataset)
+        with stage("analysis"):
+            row_analysis, rule_counts = dataset_rule_engine.analyze(df, predictions_array * 0.2)
         
         processing_time = time.time() - start_time
         
         # Generar resultados completos
-        results = []
-        for i, prediction in enumerate(predictions):
-            prediction_20 = prediction * 0.2
-            
-            # Determinar letra basada en escala 20 (NO en escala 100)
-            letter_grade = (
-                "AD" if prediction_20 >= 18 else
-                "A" if prediction_20 >= 14 else
-                "B" if prediction_20 >= 10 else "C"
-            )
-            
-            results.append({
-                "estudiante_id": i + 1,
-                "prediction_100": round(prediction, 2),
-                "prediction_20": round(prediction_20, 2),
-                "letter_grade": letter_grade,
-                "original_data": students_data[i]
-            })
+        with stage("response_build"):
+            results = []
+            for i, prediction in enumerate(predictions):
+                prediction_20 = prediction * 0.2
+                
+                # Determinar letra basada en escala 20 (NO en escala 100)
+                letter_grade = (
+                    "AD" if prediction_20 >= 18 else
+                    "A" if prediction_20 >= 14 else
+                    "B" if prediction_20 >= 10 else "C"
+                )
+                
+                results.append({
+                    "estudiante_id": i + 1,
+                    "prediction_100": round(prediction, 2),
+                    "prediction_20": round(prediction_20, 2),
+                    "letter_grade": letter_grade,
+                    "original_data": students_data[i],
+                    "analysis": row_analysis[i]
+                })
         
         # Estadísticas del dataset
-        predictions_array = np.array(predictions)
+        statistics_started = time.perf_counter()
         letter_counts = {"AD": 0, "A": 0, "B": 0, "C": 0}
         for result in results:
             letter_counts[result["letter_grade"]] += 1
@@ -814,7 +1026,11 @@ async def predict_dataset(file: UploadFile = File(...)):
                 "percentages": {k: round(v, 1) for k, v in percentages.items()},
                 "max_score_100": round(predictions_array.max(), 2),
                 "min_score_100": round(predictions_array.min(), 2),
-                "std_score_100": round(predictions_array.std(), 2)
+                "std_score_100": round(predictions_array.std(), 2),
+                "analysis_rule_counts": rule_counts,
+                "adjustments": adjustment_counts,
+                "unknown_labels": unknown_labels,
+                "unknown_labels_total": sum(sum(counts.values()) for counts in unknown_labels.values())
             },
             "performance": {
                 "model_used": "SVR",
@@ -823,11 +1039,16 @@ async def predict_dataset(file: UploadFile = File(...)):
                 "timestamp": time.time()
             }
         }
+        record_stage("statistics", time.perf_counter() - statistics_started)
+        
+        # Desglose por etapa (la serialización se mide después; ver cabecera Server-Timing)
+        if include_timings:
+            response["performance"].update(current_timer().breakdown())
         
         logger.info(f"✅ Dataset procesado exitosamente: {total_students} estudiantes en {processing_time:.2f}s ({total_students/processing_time:.1f} est/s)")
         return response
         
-    except HTTPException:
+    except (HTTPException, RequestCancelled):
         raise
     except Exception as e:
         logger.error(f"❌ Error procesando dataset: {e}")
@@ -840,7 +1061,11 @@ async def predict_dataset(file: UploadFile = File(...)):
             }
         )
 
+startup_timeline.mark("app_definition")
+
 if __name__ == "__main__":
+    import uvicorn
+    
     print("🚀 Iniciando PredictScore-ML API Simplificada...")
     print(f"📍 URL: http://{config.HOST}:{config.PORT}")
     print(f"📚 Docs: http://{config.HOST}:{config.PORT}/docs")
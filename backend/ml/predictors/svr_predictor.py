@@ -11,6 +11,7 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Union
 from .base_predictor import BasePredictor
+from services.feature_pipeline import feature_pipeline
 import logging
 
 logger = logging.getLogger(__name__)
@@ -81,15 +82,14 @@ class SVRPredictor(BasePredictor):
             raise RuntimeError("Model not loaded")
             
         try:
-            # Convertir todas las features
-            feature_arrays = []
-            for features in features_list:
-                if self.validate_features(features):
-                    feature_arrays.append(self._features_to_array(features))
+            # Convertir todas las features en una sola pasada del pipeline
+            valid_features = [features for features in features_list if self.validate_features(features)]
                     
-            if not feature_arrays:
+            if not valid_features:
                 raise ValueError("No valid features found")
                 
+            feature_arrays = feature_pipeline.transform(valid_features)
+                
             # Escalar en lote
             if self.scaler:
                 feature_arrays = self.scaler.transform(feature_arrays)
@@ -126,16 +126,5 @@ class SVRPredictor(BasePredictor):
         }
         
     def _features_to_array(self, features: Dict[str, Any]) -> np.ndarray:
-        """Convierte features dict a array numpy."""
-        # Orden específico de features para el modelo
-        feature_order = [
-            'study_hours', 'attendance', 'parental_involvement',
-            'access_to_resources', 'extracurricular_activities', 
-            'sleep_hours', 'previous_scores', 'motivation_level',
-            'internet_access', 'tutoring_sessions', 'family_income',
-            'teacher_quality', 'school_type', 'peer_influence',
-            'physical_activity', 'learning_disabilities', 
-            'parental_education_level', 'distance_from_home', 'gender'
-        ]
-        
-        return np.array([features.get(feature, 0) for feature in feature_order])
+        """Convierte features dict a array numpy (orden y codificación del entrenamiento)."""
+        return feature_pipeline.transform([features])[0]
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Refresco Incremental del Modelo SVR (warm start)
+===============================================
+
+En lugar de reentrenar con todo el historial cada período, el refresco
+entrena con:
+
+- Semilla: los vectores de soporte del modelo vigente (las únicas filas
+  que definen la función de decisión del SVR), guardados por el registro
+  de versiones en `seed_set.npz`
+- Datos nuevos: los CSV etiquetados que se agregan (formato procesado o
+  crudo; el crudo pasa por el pipeline de features compartido)
+
+Así el costo es proporcional a (vectores de soporte + filas nuevas), no
+al historial completo. Se conserva el scaler vigente para que la semilla
+siga en el mismo espacio de features.
+
+Antes de publicar se compara el candidato con el modelo vigente sobre la
+validación reservada (la de `retrain_svr_fast.split_data` + una fracción
+de los datos nuevos). Si el MAE empeora más que `--max-regression`, no se
+publica (salvo `--force`). Al publicar se crea una versión nueva en
+`ml/models/versions/` y `metadata.json` pasa a apuntar a ella.
+
+Uso:
+    python refresh_model.py --new-data ml/data/processed/nuevos_2025_2.csv
+    python refresh_model.py --new-data a.csv b.csv --dry-run
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.svm import SVR
+
+from retrain_svr_fast import load_and_prepare_data, split_data
+from services.feature_pipeline import feature_pipeline
+from services.model_registry import model_registry
+
+TARGET_COLUMN = "Exam_Score"
+MIN_NEW_ROWS = 2  # Con holdout > 0: al menos una fila para ajustar y otra para validar
+
+def load_new_data(paths: Sequence[Path]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lee CSV etiquetados nuevos (procesados o crudos) como (X sin escalar, y).
+    """
+    frames = []
+    for path in paths:
+        frame = pd.read_csv(path)
+        if TARGET_COLUMN not in frame.columns:
+            raise ValueError(f"{path} no tiene la columna {TARGET_COLUMN}")
+        frames.append(frame)
+        print(f'   📄 {path}: {len(frame)} filas')
+
+    data = pd.concat(frames, ignore_index=True)
+    X = feature_pipeline.transform(data)
+    y = data[TARGET_COLUMN].to_numpy(dtype=np.float64)
+    return X, y
+
+def current_seed_set(model: Any, scaler: Any, X_train: np.ndarray, y_train: np.ndarray) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Vectores de soporte sin escalar del modelo vigente.
+
+    Si la versión vigente no guardó su semilla (modelos anteriores al
+    registro), se reconstruye desde la partición de entrenamiento usando
+    `model.support_`; si no coincide, se usa la partición completa.
+    """
+    seed = model_registry.load_seed_set()
+    if seed is not None:
+        return seed[0], seed[1], "seed_set"
+
+    support = getattr(model, "support_", None)
+    if (
+        support is not None and len(support) == len(model.support_vectors_)
+        and support.max() < len(X_train)
+        and np.allclose(scaler.transform(X_train[support]), model.support_vectors_)
+    ):
+        return X_train[support], y_train[support], "reconstructed"
+
+    print('   ⚠️  No se pudo recuperar la semilla: se usa la partición de entrenamiento completa')
+    return X_train, y_train, "full_train_split"
+
+def evaluate(model: Any, scaler: Any, X: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    predictions = model.predict(scaler.transform(X))
+    return {
+        "mae": float(mean_absolute_error(y, predictions)),
+        "rmse": float(np.sqrt(mean_squared_error(y, predictions))),
+        "r2": float(r2_score(y, predictions))
+    }
+
+def refresh(
+    new_paths: Sequence[Path],
+    holdout: float = 0.2,
+    max_regression: float = 0.02,
+    force: bool = False,
+    dry_run: bool = False
+) -> Optional[str]:
+    """
+    Ejecuta el refresco incremental.
+
+    Con `holdout` = 0 todos los datos nuevos se usan para ajustar y la
+    validación es solo la partición base.
+
+    Returns:
+        Optional[str]: Versión publicada (None si no se publicó)
+
+    Raises:
+        ValueError: `holdout` fuera de [0, 1) o datos nuevos insuficientes
+    """
+    if not 0 <= holdout < 1:
+        raise ValueError(f"holdout debe estar en [0, 1) (recibido: {holdout})")
+
+    print('📦 Modelo vigente:', model_registry.current_version() or 'sin versión (pickles canónicos)')
+    model, scaler = model_registry.load()
+
+    print('\n📊 Cargando datos nuevos...')
+    X_new, y_new = load_new_data(new_paths)
+    if not len(y_new):
+        raise ValueError("Los datos nuevos no tienen filas")
+    if holdout == 0:
+        X_new_train, y_new_train = X_new, y_new
+        X_new_val, y_new_val = X_new[:0], y_new[:0]
+    else:
+        if len(y_new) < MIN_NEW_ROWS or np.ceil(holdout * len(y_new)) >= len(y_new):
+            raise ValueError(f"{len(y_new)} filas nuevas no alcanzan para reservar {holdout:.0%} "
+                             f"y ajustar con el resto (use más datos o --holdout 0)")
+        X_new_train, X_new_val, y_new_train, y_new_val = train_test_split(
+            X_new, y_new, test_size=holdout, random_state=42
+        )
+
+    X_train, X_val, y_train, y_val = (
+        part.to_numpy(dtype=np.float64) for part in split_data(load_and_prepare_data())
+    )
+    seed_X, seed_y, seed_source = current_seed_set(model, scaler, X_train, y_train)
+    print(f'   🌱 Semilla ({seed_source}): {len(seed_y)} vectores de soporte')
+
+    # Validación reservada: la partición base + la fracción reservada de los datos nuevos
+    X_val = np.vstack([X_val, X_new_val])
+    y_val = np.concatenate([y_val, y_new_val])
+
+    X_fit = np.vstack([seed_X, X_new_train])
+    y_fit = np.concatenate([seed_y, y_new_train])
+    params = model.get_params()
+    print(f'\n🔧 Ajustando con {len(y_fit)} filas ({len(seed_y)} semilla + {len(y_new_train)} nuevas)...')
+
+    candidate = SVR(**params)
+    started = time.perf_counter()
+    candidate.fit(scaler.transform(X_fit), y_fit)
+    fit_seconds = time.perf_counter() - started
+    print(f'   ⏱️  Ajuste: {fit_seconds:.1f}s, {len(candidate.support_)} vectores de soporte')
+
+    current_metrics = evaluate(model, scaler, X_val, y_val)
+    candidate_metrics = evaluate(candidate, scaler, X_val, y_val)
+    new_current = evaluate(model, scaler, X_new_val, y_new_val) if len(y_new_val) else None
+    new_candidate = evaluate(candidate, scaler, X_new_val, y_new_val) if len(y_new_val) else None
+
+    print(f'\n📈 Validación ({len(y_val)} filas):')
+    print(f'   Vigente:   MAE {current_metrics["mae"]:.3f}  R² {current_metrics["r2"]:.4f}')
+    print(f'   Candidato: MAE {candidate_metrics["mae"]:.3f}  R² {candidate_metrics["r2"]:.4f}')
+    if new_candidate is not None:
+        print(f'   Solo datos nuevos: MAE {new_current["mae"]:.3f} -> {new_candidate["mae"]:.3f}')
+
+    limit = current_metrics["mae"] * (1 + max_regression)
+    if candidate_metrics["mae"] > limit and not force:
+        print(f'\n❌ El candidato empeora el MAE más de {max_regression:.0%}: no se publica (use --force)')
+        return None
+    if dry_run:
+        print('\n🧪 --dry-run: no se publica')
+        return None
+
+    entry = {
+        "performance": {
+            "r2_score": round(candidate_metrics["r2"], 4),
+            "mae": round(candidate_metrics["mae"], 2),
+            "rmse": round(candidate_metrics["rmse"], 2),
+            "training_time": f"{fit_seconds:.1f}s"
+        },
+        "refresh": {
+            "refreshed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "parent_version": model_registry.current_version(),
+            "seed_source": seed_source,
+            "seed_rows": int(len(seed_y)),
+            "new_rows": int(len(y_new)),
+            "new_train_rows": int(len(y_new_train)),
+            "fit_rows": int(len(y_fit)),
+            "fit_seconds": round(fit_seconds, 2),
+            "new_data_files": [str(path) for path in new_paths],
+            "validation_rows": int(len(y_val)),
+            "previous_mae": round(current_metrics["mae"], 4),
+            "candidate_mae": round(candidate_metrics["mae"], 4)
+        }
+    }
+    fitted = candidate.support_
+    version = model_registry.publish(candidate, scaler, X_fit[fitted], y_fit[fitted], entry, source="refresh")
+    print(f'\n✅ Versión publicada: {version}')
+    return version
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Refresco incremental (warm start) del modelo SVR')
+    parser.add_argument('--new-data', type=Path, nargs='+', required=True, help='CSV etiquetados nuevos (con Exam_Score)')
+    parser.add_argument('--holdout', type=float, default=0.2,
+                        help='Fracción de los datos nuevos reservada para validar, en [0, 1) (0 = solo la partición base)')
+    parser.add_argument('--max-regression', type=float, default=0.02,
+                        help='Empeoramiento relativo de MAE tolerado frente al modelo vigente')
+    parser.add_argument('--force', action='store_true', help='Publicar aunque empeore la validación')
+    parser.add_argument('--dry-run', action='store_true', help='Entrenar y validar sin publicar')
+    args = parser.parse_args(argv)
+    if not 0 <= args.holdout < 1:
+        parser.error(f'--holdout debe estar en [0, 1) (recibido: {args.holdout})')
+
+    print('🔄 REFRESCO INCREMENTAL SVR')
+    print('=' * 50)
+    try:
+        version = refresh(args.new_data, args.holdout, args.max_regression, args.force, args.dry_run)
+    except ValueError as e:
+        print(f'\n❌ {e}')
+        return 1
+    return 0 if version or args.dry_run else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
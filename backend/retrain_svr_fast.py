@@ -11,11 +11,29 @@ from sklearn.model_selection import train_test_split
 from sklearn.svm import SVR
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
-import joblib
+import argparse
 import json
 import os
 from datetime import datetime
 
+from hyperparameter_search import DEFAULT_GRID, SVRSearch, parse_grid_values
+from services.feature_pipeline import feature_pipeline
+from services.model_registry import model_registry
+from training_subsampling import METHODS, fit_tradeoff_report, select_training_rows
+
+# Hiperparámetros por defecto (sin búsqueda)
+DEFAULT_SVR_PARAMS = {
+    'C': 100,           # Parámetro de regularización
+    'gamma': 'scale',   # Parámetro del kernel RBF
+    'epsilon': 0.1      # Tolerancia
+}
+
+# Opciones del solver libsvm (no cambian el modelo, solo el costo del ajuste)
+DEFAULT_FIT_OPTIONS = {
+    'cache_size': 500,  # MB de caché del kernel (sklearn usa 200 por defecto)
+    'shrinking': True   # Heurística de shrinking de libsvm
+}
+
 def load_and_prepare_data():
     """
     Carga y prepara los datos para entrenamiento
@@ -44,73 +62,79 @@ def load_and_prepare_data():
 def preprocess_raw_data(df):
     """
     Procesa datos raw si es necesario (fallback)
+    Usa el mismo pipeline de features que la API para no divergir de la codificación servida
     """
     print('🔄 Procesando datos raw...')
     
-    # Mapear variables categóricas a numéricas (como en el dataset procesado)
-    parental_map = {'Low': 0, 'Medium': 1, 'High': 2}
-    access_map = {'Low': 0, 'Medium': 1, 'High': 2}
-    binary_map = {'No': 0, 'Yes': 1}
-    motivation_map = {'Low': 0, 'Medium': 1, 'High': 2}
-    income_map = {'Low': 0, 'Medium': 1, 'High': 2}
-    teacher_map = {'Poor': 0, 'Average': 1, 'Good': 2}
-    school_map = {'Public': 0, 'Private': 1}
-    peer_map = {'Negative': 0, 'Neutral': 1, 'Positive': 2}
-    parent_edu_map = {'High School': 0, 'College': 1, 'Postgraduate': 2}
-    distance_map = {'Near': 0, 'Moderate': 1, 'Far': 2}
-    gender_map = {'Male': 0, 'Female': 1}
-    
-    # Aplicar mapeos
-    df['Parental_Involvement'] = df['Parental_Involvement'].map(parental_map)
-    df['Access_to_Resources'] = df['Access_to_Resources'].map(access_map)
-    df['Extracurricular_Activities'] = df['Extracurricular_Activities'].map(binary_map)
-    df['Motivation_Level'] = df['Motivation_Level'].map(motivation_map)
-    df['Internet_Access'] = df['Internet_Access'].map(binary_map)
-    df['Family_Income'] = df['Family_Income'].map(income_map)
-    df['Teacher_Quality'] = df['Teacher_Quality'].map(teacher_map)
-    df['School_Type'] = df['School_Type'].map(school_map)
-    df['Peer_Influence'] = df['Peer_Influence'].map(peer_map)
-    df['Learning_Disabilities'] = df['Learning_Disabilities'].map(binary_map)
-    df['Parental_Education_Level'] = df['Parental_Education_Level'].map(parent_edu_map)
-    df['Distance_from_Home'] = df['Distance_from_Home'].map(distance_map)
-    df['Gender'] = df['Gender'].map(gender_map)
-    
-    # Mantener solo las características que tenemos en los CSVs de prueba
-    keep_columns = [
-        'Hours_Studied', 'Attendance', 'Parental_Involvement', 'Access_to_Resources',
-        'Extracurricular_Activities', 'Previous_Scores', 'Motivation_Level', 
-        'Tutoring_Sessions', 'Family_Income', 'Teacher_Quality', 'Peer_Influence',
-        'Learning_Disabilities', 'Parental_Education_Level', 'Distance_from_Home',
-        'Exam_Score'
-    ]
-    
-    df = df[keep_columns]
-    
-    # Agregar características calculadas
-    df['Study_Efficiency'] = df['Hours_Studied'] / df['Attendance']
-    df['High_Support'] = (df['Parental_Involvement'] == 2).astype(int)
-    df['Family_Education_Support'] = (df['Parental_Education_Level'] == 2).astype(int)
+    processed = feature_pipeline.to_frame(df)
+    processed['Exam_Score'] = df['Exam_Score'].to_numpy()
     
-    return df
+    return processed
+
+def split_data(df):
+    """
+    División entrenamiento/validación (la misma para la búsqueda y el ajuste final)
+    """
+    feature_columns = list(feature_pipeline.feature_names)
+    X = df[feature_columns]
+    y = df['Exam_Score']
+    
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=None)
+
+def search_hyperparameters(df, strategy, grid, folds, workers, factor, fit_options=None, subsample=None, subsample_method='stratified'):
+    """
+    Búsqueda paralela de C/gamma/epsilon sobre la parte de entrenamiento
+    (la validación queda reservada para evaluar al ganador)
+    """
+    X_train, _, y_train, _ = split_data(df)
+    X_train, y_train = X_train.to_numpy(), y_train.to_numpy()
+    
+    # Mismo submuestreo que el ajuste final (seleccionado sobre features escaladas)
+    indices, weights = select_training_rows(
+        StandardScaler().fit_transform(X_train), y_train, subsample, subsample_method
+    )
+    search = SVRSearch(
+        X_train[indices], y_train[indices], grid=grid, folds=folds, workers=workers,
+        fit_options=fit_options, sample_weight=weights
+    )
+    
+    n_candidates = 1
+    for values in search.grid.values():
+        n_candidates *= len(values)
+    print(f'\n🔎 Búsqueda {strategy}: {n_candidates} configuraciones × {folds} folds en {search.workers} procesos')
+    
+    result = search.run(strategy=strategy, factor=factor)
+    
+    for rung in result['rungs']:
+        print(f'   Ronda: {rung["candidates"]} configuraciones con {rung["rows"]} filas')
+    print(f'   ⏱️  Tiempo real: {result["wall_seconds"]:.1f}s '
+          f'(CPU en ajustes: {result["total_fit_cpu_seconds"]:.1f}s, aceleración x{result["parallel_speedup"]})')
+    print('   🏅 Mejores configuraciones:')
+    for entry in result['leaderboard'][:5]:
+        print(f'      {entry["params"]}  MAE {entry["mean_mae"]:.3f} ± {entry["std_mae"]:.3f}  '
+              f'R² {entry["mean_r2"]:.4f}  fit {entry["mean_fit_seconds"]:.2f}s  ({entry["rows"]} filas)')
+    
+    return result
 
-def train_svr_model(df):
+def train_svr_model(df, params=None, fit_options=None, subsample=None, subsample_method='stratified'):
     """
     Entrena el modelo SVR optimizado
+    
+    `subsample` (filas o fracción) entrena con un subconjunto estratificado por
+    Exam_Score o un coreset; las métricas se calculan siempre sobre los datos completos.
     """
     print('\n🤖 Entrenando modelo SVR...')
+    params = dict(params or DEFAULT_SVR_PARAMS)
+    fit_options = {**DEFAULT_FIT_OPTIONS, **(fit_options or {})}
     
     # Separar características y target
-    feature_columns = [col for col in df.columns if col != 'Exam_Score']
-    X = df[feature_columns]
-    y = df['Exam_Score']
+    feature_columns = list(feature_pipeline.feature_names)
     
     print(f'   Características usadas: {len(feature_columns)}')
     print(f'   Características: {feature_columns}')
     
     # División entrenamiento/validación
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=None
-    )
+    X_train, X_val, y_train, y_val = split_data(df)
     
     print(f'   Datos de entrenamiento: {len(X_train)}')
     print(f'   Datos de validación: {len(X_val)}')
@@ -121,17 +145,21 @@ def train_svr_model(df):
     X_train_scaled = scaler.fit_transform(X_train)
     X_val_scaled = scaler.transform(X_val)
     
+    # Submuestreo (opcional)
+    indices, sample_weight = select_training_rows(X_train_scaled, y_train.to_numpy(), subsample, subsample_method)
+    if len(indices) < len(X_train_scaled):
+        print(f'   ✂️  Submuestreo {subsample_method}: {len(indices)} de {len(X_train_scaled)} filas')
+    
     # Entrenar SVR con parámetros optimizados
-    print('\n🔧 Entrenando SVR...')
-    svr = SVR(
-        kernel='rbf',
-        C=100,           # Parámetro de regularización
-        gamma='scale',   # Parámetro del kernel RBF
-        epsilon=0.1      # Tolerancia
-    )
+    print(f'\n🔧 Entrenando SVR {params} {fit_options}...')
+    svr = SVR(kernel='rbf', **params, **fit_options)
     
     start_time = datetime.now()
-    svr.fit(X_train_scaled, y_train)
+    svr.fit(X_train_scaled[indices], y_train.to_numpy()[indices], sample_weight=sample_weight)
+    
+    # Vectores de soporte sin escalar: semilla del próximo refresco incremental
+    fitted_rows = indices[svr.support_]
+    seed_set = (X_train.to_numpy()[fitted_rows], y_train.to_numpy()[fitted_rows])
     training_time = datetime.now() - start_time
     
     # Validación
@@ -151,69 +179,69 @@ def train_svr_model(df):
     print(f'   ✅ RMSE validación: {rmse_val:.2f}')
     print(f'   ⏱️  Tiempo entrenamiento: {training_time.total_seconds():.1f}s')
     
-    return svr, scaler, {
+    return svr, scaler, seed_set, {
         'r2_train': r2_train,
         'r2_val': r2_val,
         'mae_val': mae_val,
         'rmse_val': rmse_val,
         'training_time': f'{training_time.total_seconds():.1f}s',
-        'features': feature_columns
+        'features': feature_columns,
+        'hyperparameters': params,
+        'training_options': {
+            **fit_options,
+            'rows': int(len(indices)),
+            'subsample_method': subsample_method if len(indices) < len(X_train_scaled) else None
+        }
     }
 
-def save_model_and_metadata(svr, scaler, metrics, feature_columns):
+def save_model_and_metadata(svr, scaler, metrics, feature_columns, search=None, seed_set=None):
     """
     Guarda el modelo, scaler y metadatos
+    
+    Publica una versión nueva en ml/models/versions (con los vectores de soporte
+    como semilla para refresh_model.py) y actualiza los pickles canónicos.
     """
     print('\n💾 Guardando modelo y scaler...')
     
-    # Crear directorio si no existe
-    os.makedirs('ml/models', exist_ok=True)
-    
-    # Guardar modelo SVR
-    model_file = 'ml/models/mejor_modelo_avanzado_svr.pkl'
-    joblib.dump(svr, model_file)
-    print(f'   ✅ Modelo guardado: {model_file}')
-    
-    # Guardar scaler
-    scaler_file = 'ml/models/scaler_avanzado.pkl'
-    joblib.dump(scaler, scaler_file)
-    print(f'   ✅ Scaler guardado: {scaler_file}')
-    
-    # Actualizar metadatos
-    metadata = {
-        "models": {
-            "svr": {
-                "file": "mejor_modelo_avanzado_svr.pkl",
-                "scaler": "scaler_avanzado.pkl",
-                "type": "SVR",
-                "performance": {
-                    "r2_score": round(metrics['r2_val'], 4),
-                    "mae": round(metrics['mae_val'], 2),
-                    "rmse": round(metrics['rmse_val'], 2),
-                    "training_time": metrics['training_time']
-                },
-                "features": feature_columns
-            },
-            "ridge": {
-                "file": "ridge_alpha_10.pkl",
-                "scaler": "scaler.pkl",
-                "type": "Ridge",
-                "performance": {
-                    "r2_score": 0.7234,
-                    "training_time": "5s"
-                },
-                "use_case": "fallback_model"
-            }
-        },
+    # Conservar la especificación del pipeline de features y el historial de versiones
+    metadata = model_registry.read_metadata()
+    metadata.update({
         "default_model": "svr",
         "fallback_model": "ridge",
-        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "feature_pipeline": metadata.get("feature_pipeline", feature_pipeline.spec)
+    })
+    metadata.setdefault("models", {})["ridge"] = {
+        "file": "ridge_alpha_10.pkl",
+        "scaler": "scaler.pkl",
+        "type": "Ridge",
+        "performance": {
+            "r2_score": 0.7234,
+            "training_time": "5s"
+        },
+        "use_case": "fallback_model"
     }
-    
-    metadata_file = 'ml/models/metadata.json'
-    with open(metadata_file, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, indent=2)
-    print(f'   ✅ Metadatos actualizados: {metadata_file}')
+    model_registry.write_metadata(metadata)
+    
+    entry = {
+        "type": "SVR",
+        "performance": {
+            "r2_score": round(metrics['r2_val'], 4),
+            "mae": round(metrics['mae_val'], 2),
+            "rmse": round(metrics['rmse_val'], 2),
+            "training_time": metrics['training_time']
+        },
+        "hyperparameters": metrics['hyperparameters'],
+        "training_options": metrics['training_options'],
+        "features": feature_columns
+    }
+    if search is not None:
+        entry["search"] = search
+    
+    seed_X, seed_y = seed_set
+    version = model_registry.publish(svr, scaler, seed_X, seed_y, entry, source="retrain", replace_entry=True)
+    print(f'   ✅ Versión publicada: {version} (ml/models/versions/{version})')
+    print(f'   ✅ Modelo y scaler canónicos actualizados')
+    print(f'   ✅ Metadatos actualizados: {model_registry.metadata_path}')
 
 def test_model_quickly(svr, scaler):
     """
@@ -222,46 +250,24 @@ def test_model_quickly(svr, scaler):
     print('\n🧪 Prueba rápida del modelo...')
     
     # Estudiante con características altas (debería dar A o AD)
-    test_case_high = np.array([[
-        40,   # Hours_Studied
-        95,   # Attendance  
-        2,    # Parental_Involvement (High)
-        2,    # Access_to_Resources (High)
-        1,    # Extracurricular_Activities (Yes)
-        90,   # Previous_Scores
-        2,    # Motivation_Level (High)
-        3,    # Tutoring_Sessions
-        2,    # Family_Income (High)
-        2,    # Teacher_Quality (Good)
-        2,    # Peer_Influence (Positive)
-        0,    # Learning_Disabilities (No)
-        2,    # Parental_Education_Level (Master)
-        0,    # Distance_from_Home (Near)
-        40/95,  # Study_Efficiency
-        1,    # High_Support
-        1     # Family_Education_Support
-    ]])
+    test_case_high = feature_pipeline.transform([{
+        'study_hours': 40, 'attendance': 95, 'parental_involvement': 'High',
+        'access_to_resources': 'High', 'extracurricular_activities': 'Yes',
+        'previous_scores': 90, 'motivation_level': 'High', 'tutoring_sessions': 3,
+        'family_income': 'High', 'teacher_quality': 'High', 'peer_influence': 'Positive',
+        'learning_disabilities': 'No', 'parental_education_level': 'Postgraduate',
+        'distance_from_home': 'Near'
+    }])
     
     # Estudiante con características medias (debería dar B o C)
-    test_case_medium = np.array([[
-        20,   # Hours_Studied
-        75,   # Attendance  
-        1,    # Parental_Involvement (Medium)
-        1,    # Access_to_Resources (Medium)
-        0,    # Extracurricular_Activities (No)
-        70,   # Previous_Scores
-        1,    # Motivation_Level (Medium)
-        1,    # Tutoring_Sessions
-        1,    # Family_Income (Medium)
-        1,    # Teacher_Quality (Average)
-        1,    # Peer_Influence (Neutral)
-        0,    # Learning_Disabilities (No)
-        1,    # Parental_Education_Level (Bachelor)
-        1,    # Distance_from_Home (Moderate)
-        20/75,  # Study_Efficiency
-        0,    # High_Support
-        0     # Family_Education_Support
-    ]])
+    test_case_medium = feature_pipeline.transform([{
+        'study_hours': 20, 'attendance': 75, 'parental_involvement': 'Medium',
+        'access_to_resources': 'Medium', 'extracurricular_activities': 'No',
+        'previous_scores': 70, 'motivation_level': 'Medium', 'tutoring_sessions': 1,
+        'family_income': 'Medium', 'teacher_quality': 'Medium', 'peer_influence': 'Neutral',
+        'learning_disabilities': 'No', 'parental_education_level': 'College',
+        'distance_from_home': 'Moderate'
+    }])
     
     # Escalar y predecir
     test_high_scaled = scaler.transform(test_case_high)
@@ -292,7 +298,64 @@ def test_model_quickly(svr, scaler):
         print('   ⚠️  Modelo necesita ajuste - poca discriminación')
         return False
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Reentrenamiento rápido del modelo SVR')
+    parser.add_argument('--search', choices=('grid', 'halving'),
+                        help='Buscar C/gamma/epsilon antes de entrenar (grilla completa o successive halving)')
+    parser.add_argument('--workers', type=int, default=None, help='Procesos de la búsqueda (por defecto: núcleos)')
+    parser.add_argument('--folds', type=int, default=5, help='Folds de validación cruzada')
+    parser.add_argument('--factor', type=int, default=3, help='Factor de successive halving')
+    parser.add_argument('--C', dest='C', default=None, help='Valores de C separados por coma')
+    parser.add_argument('--gamma', default=None, help="Valores de gamma separados por coma ('scale', 'auto' o números)")
+    parser.add_argument('--epsilon', default=None, help='Valores de epsilon separados por coma')
+    parser.add_argument('--leaderboard-size', type=int, default=20, help='Entradas del leaderboard guardadas en metadata.json')
+    parser.add_argument('--cache-size', type=float, default=DEFAULT_FIT_OPTIONS['cache_size'],
+                        help='MB de caché del kernel de libsvm')
+    parser.add_argument('--no-shrinking', action='store_true', help='Desactivar la heurística de shrinking')
+    parser.add_argument('--subsample', default=None, help="Filas de entrenamiento (número, fracción o 'full')")
+    parser.add_argument('--subsample-method', choices=METHODS, default='stratified',
+                        help='stratified: por cuantiles de Exam_Score; coreset: k-means con pesos')
+    parser.add_argument('--tradeoff-report', default=None,
+                        help="Tamaños a comparar (p. ej. '1000,0.25,0.5,full'): reporta tiempo vs precisión y no guarda modelo")
+    parser.add_argument('--tradeoff-methods', default='stratified', help='Métodos a comparar en el reporte')
+    return parser.parse_args()
+
+def run_tradeoff_report(df, sizes, methods, params, fit_options):
+    """
+    Reporte de tiempo de ajuste vs precisión para distintos tamaños de entrenamiento
+    """
+    X_train, X_val, y_train, y_val = split_data(df)
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_val_scaled = scaler.transform(X_val)
+    
+    print(f'\n⚖️  Reporte tiempo vs precisión ({len(X_train)} filas de entrenamiento, {len(X_val)} de validación)')
+    print(f'   SVR {params} {fit_options}')
+    report = fit_tradeoff_report(
+        X_train_scaled, y_train.to_numpy(), X_val_scaled, y_val.to_numpy(),
+        {**params, **fit_options}, sizes, methods
+    )
+    
+    print(f'   {"método":<11} {"filas":>8} {"fit (s)":>9} {"pred (s)":>9} {"SV":>7} {"MAE":>7} {"R²":>7}')
+    for row in report:
+        print(f'   {row["method"]:<11} {row["rows"]:>8} {row["fit_seconds"]:>9.2f} {row["predict_seconds"]:>9.3f} '
+              f'{row["n_support"]:>7} {row["mae_val"]:>7.3f} {row["r2_val"]:>7.4f}')
+    
+    report_file = 'ml/models/fit_tradeoff_report.json'
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "train_rows": len(X_train),
+            "validation_rows": len(X_val),
+            "hyperparameters": params,
+            "fit_options": fit_options,
+            "results": report
+        }, f, indent=2, ensure_ascii=False)
+    print(f'   💾 Reporte guardado: {report_file}')
+    return report
+
 def main():
+    args = parse_args()
     print('🎯 REENTRENAMIENTO RÁPIDO SVR')
     print('=' * 50)
     print('📋 Estrategia: KISS + DRY')
@@ -305,11 +368,35 @@ def main():
         # Cargar datos
         df = load_and_prepare_data()
         
+        fit_options = {'cache_size': args.cache_size, 'shrinking': not args.no_shrinking}
+        
+        # Reporte tiempo vs precisión (no entrena el modelo final)
+        if args.tradeoff_report:
+            sizes = [size.strip() for size in args.tradeoff_report.split(',') if size.strip()]
+            methods = [method.strip() for method in args.tradeoff_methods.split(',') if method.strip()]
+            run_tradeoff_report(df, sizes, methods, DEFAULT_SVR_PARAMS, fit_options)
+            return
+        
+        # Búsqueda de hiperparámetros (opcional)
+        params, search = None, None
+        if args.search:
+            grid = {
+                name: parse_grid_values(value) if value else DEFAULT_GRID[name]
+                for name, value in (('C', args.C), ('gamma', args.gamma), ('epsilon', args.epsilon))
+            }
+            search = search_hyperparameters(
+                df, args.search, grid, args.folds, args.workers, args.factor,
+                fit_options, args.subsample, args.subsample_method
+            )
+            params = search['best_params']
+            search['leaderboard'] = search['leaderboard'][:args.leaderboard_size]
+            search['completed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
         # Entrenar modelo
-        svr, scaler, metrics = train_svr_model(df)
+        svr, scaler, seed_set, metrics = train_svr_model(df, params, fit_options, args.subsample, args.subsample_method)
         
         # Guardar modelo
-        save_model_and_metadata(svr, scaler, metrics, metrics['features'])
+        save_model_and_metadata(svr, scaler, metrics, metrics['features'], search, seed_set)
         
         # Prueba rápida
         model_ok = test_model_quickly(svr, scaler)
@@ -324,7 +411,8 @@ def main():
         
         if model_ok:
             print('\n🚀 SIGUIENTE PASO:')
-            print('   1. Reinicia el backend')
+            print('   1. Carga la versión nueva sin reiniciar: la toma el vigilante si MODEL_RELOAD_WATCH_SECONDS > 0,')
+            print('      si no POST /api/v1/admin/model/reload (o SIGHUP al maestro de serve.py)')
             print('   2. Prueba el dataset extremo')
             print('   3. Deberías ver calificaciones A y AD')
         else:
@@ -0,0 +1,68 @@
+"""
+Rutas de Administración
+======================
+
+Endpoints operativos protegidos por token (cabecera `X-Admin-Token`).
+Si `ADMIN_TOKEN` no está configurado, responden 404 como si no existieran.
+
+- Listado y descarga de perfiles capturados por el profiler
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import hmac
+import logging
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from core.config import settings
+from core.profiling import profile_store
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Valida el token de administración."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Token de administración inválido")
+
+# Router de administración
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+    responses={
+        401: {"description": "Invalid admin token"},
+        404: {"description": "Not found"}
+    }
+)
+
+@router.get("/profiles", summary="Listar perfiles capturados")
+async def list_profiles() -> Dict[str, Any]:
+    """
+    Perfiles guardados, del más reciente al más antiguo.
+
+    Los `.collapsed` se visualizan con flamegraph.pl o speedscope;
+    los `.prof` con `python -m pstats` o snakeviz.
+    """
+    profiles = profile_store.list()
+    return {
+        "profiles": profiles,
+        "count": len(profiles),
+        "keep": profile_store.keep,
+        "enabled": settings.PROFILING_ENABLED,
+        "slow_request_seconds": settings.PROFILING_SLOW_REQUEST_SECONDS
+    }
+
+@router.get("/profiles/{name}", summary="Descargar un perfil")
+async def download_profile(name: str) -> FileResponse:
+    """Descarga un perfil por nombre."""
+    path = profile_store.resolve(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Perfil no encontrado: {name}")
+    return FileResponse(path, filename=path.name, media_type="application/octet-stream")
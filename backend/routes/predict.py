@@ -11,20 +11,14 @@ Fecha: 2025
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from typing import Dict, Any
-import numpy as np
 import joblib
-import os
 
-# Rutas de los modelos entrenados
-MODELO_PATH = os.path.join(os.path.dirname(__file__), '../../../Machine-Learning/modelos/mejor_modelo_avanzado_svr.pkl')
-SCALER_PATH = os.path.join(os.path.dirname(__file__), '../../../Machine-Learning/modelos/scaler_avanzado.pkl')
-METADATOS_PATH = os.path.join(os.path.dirname(__file__), '../../../Machine-Learning/modelos/metadatos_mejor_modelo_avanzado.pkl')
+from core.config import settings
+from services.feature_pipeline import feature_pipeline
+from services.model_registry import model_registry
 
-CAMPOS = [
-    "Hours_Studied", "Attendance", "Parental_Involvement", "Access_to_Resources", "Extracurricular_Activities",
-    "Previous_Scores", "Motivation_Level", "Tutoring_Sessions", "Family_Income", "Teacher_Quality",
-    "Peer_Influence", "Learning_Disabilities", "Parental_Education_Level", "Distance_from_Home"
-]
+# Metadatos del entrenamiento original (modelo y scaler los resuelve el registro)
+METADATOS_PATH = settings.ML_MODELS_PATH / 'metadatos_mejor_modelo_avanzado.pkl'
 
 class StudentData(BaseModel):
     """
@@ -63,13 +57,11 @@ metadatos = None
 
 def cargar_modelo():
     """
-    Carga el modelo SVR y el scaler desde disco.
+    Carga el modelo SVR y el scaler desde disco (arreglos mapeados o pickles, igual que main.py).
     """
     global modelo, scaler, metadatos
-    if modelo is None:
-        modelo = joblib.load(MODELO_PATH)
-    if scaler is None:
-        scaler = joblib.load(SCALER_PATH)
+    if modelo is None or scaler is None:
+        modelo, scaler, _ = model_registry.load_serving(prefer_arrays=settings.MODEL_ARRAYS_ENABLED)
     if metadatos is None:
         metadatos = joblib.load(METADATOS_PATH)
 
@@ -84,10 +76,10 @@ def startup_event():
 def predict(data: StudentData):
     """
     Endpoint para predecir el rendimiento académico de un estudiante.
-    Recibe los 14 campos, aplica el preprocesamiento y devuelve la predicción y metadatos del modelo.
+    Recibe los 14 campos, aplica el pipeline de features y devuelve la predicción y metadatos del modelo.
     """
-    # Convertir datos a array ordenado
-    X = np.array([[getattr(data, campo) for campo in CAMPOS]])
+    # Convertir datos a array ordenado (pipeline compartido, agrega las features derivadas)
+    X = feature_pipeline.transform([data.dict()])
     # Aplicar escalado
     X_scaled = scaler.transform(X)
     # Realizar predicción
@@ -16,13 +16,16 @@ Autor: Equipo Grupo 4 - Tech Lead: Napanga Ruiz Jhonatan Jesus
 Fecha: 2025
 """
 
+import json
 import logging
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from ..models.schemas import StudentInput, RecommendationResponse
-from ..services.openai_service import openai_service
-from ..services.ml_service import ml_service
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from models.schemas import StudentInput, RecommendationResponse
+from services.openai_service import openai_service
+from services.ml_service import ml_service
+from services.analysis_rules import student_rule_engine
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -78,18 +81,13 @@ async def generate_recommendations(student_data: StudentInput) -> Recommendation
         student_dict = student_data.student_data
         analysis_data = student_data.analysis
         
-        # Convertir predicción en escala 20 a otras escalas si es necesario
-        prediction_100 = prediction_score * 5  # De escala 20 a 100
-        grade_letter = (
-            "AD" if prediction_score >= 18 else
-            "A" if prediction_score >= 14 else
-            "B" if prediction_score >= 10 else "C"
-        )
+        prediction_summary = _build_prediction_summary(prediction_score, analysis_data)
         
-        logger.info(f"Usando predicción existente: {prediction_score}/20 = {grade_letter}")
+        logger.info(f"Usando predicción existente: {prediction_score}/20 = {prediction_summary['grade_letter']}")
         
-        # 2. Generar recomendaciones con IA
-        ai_recommendations = openai_service.generate_recommendations(
+        # 2. Generar recomendaciones con IA (fuera del event loop, acotado por el breaker)
+        ai_recommendations = await run_in_threadpool(
+            openai_service.generate_recommendations,
             prediction_score=prediction_score,
             student_data=student_dict,
             prediction_confidence=analysis_data.get("confidence", "High")
@@ -98,13 +96,7 @@ async def generate_recommendations(student_data: StudentInput) -> Recommendation
         # 3. Construir respuesta completa usando datos correctos
         response_data = {
             "success": True,
-            "prediction": {
-                "exam_score": prediction_score,  # En escala 20
-                "grade_letter": grade_letter,     # Basado en la predicción correcta
-                "grade_20": prediction_score,     # Misma que exam_score
-                "grade_100": round(prediction_100, 2),  # Conversión a escala 100
-                "confidence": analysis_data.get("confidence", "High")
-            },
+            "prediction": prediction_summary,
             "recommendations": {
                 "suggestions": ai_recommendations["recommendations"],
                 "urgency_level": ai_recommendations["level"],
@@ -112,11 +104,7 @@ async def generate_recommendations(student_data: StudentInput) -> Recommendation
                 "ai_confidence": ai_recommendations.get("confidence"),
                 "tokens_used": ai_recommendations.get("tokens_used")
             },
-            "analysis": {
-                "risk_factors": _analyze_risk_factors(student_dict, prediction_score),
-                "strengths": _analyze_strengths(student_dict, prediction_score),
-                "improvement_areas": _identify_improvement_areas(student_dict, prediction_score)
-            }
+            "analysis": _build_student_analysis(student_dict, prediction_score)
         }
         
         logger.info(f"Recomendaciones generadas exitosamente. Score: {prediction_score}")
@@ -131,6 +119,58 @@ async def generate_recommendations(student_data: StudentInput) -> Recommendation
             detail="Error interno del servidor al generar recomendaciones"
         )
 
+@router.post(
+    "/stream",
+    summary="Generar Recomendaciones en Streaming",
+    description="""
+    Variante en streaming de `/generate` usando Server-Sent Events.
+    
+    Orden de eventos:
+    1. `prediction`: resumen de la predicción
+    2. `analysis`: factores de riesgo, fortalezas y áreas de mejora
+    3. `token`: fragmentos de texto a medida que los genera la IA
+    4. `recommendation`: cada recomendación en cuanto su línea está completa
+    5. `done`: fuente, nivel de urgencia y cierre del stream
+    """,
+    response_description="Stream text/event-stream con recomendaciones"
+)
+async def stream_recommendations(student_data: StudentInput) -> StreamingResponse:
+    """
+    Genera recomendaciones académicas emitiendo los tokens de la IA como SSE.
+    
+    La predicción y el análisis se envían antes de contactar a la IA, de modo que
+    la latencia percibida pasa a ser el tiempo hasta el primer token.
+    
+    Args:
+        student_data: Datos del estudiante para análisis (incluye prediction y analysis)
+        
+    Returns:
+        StreamingResponse: Stream de eventos SSE
+    """
+    prediction_score = student_data.prediction
+    student_dict = student_data.student_data
+    
+    prediction_summary = _build_prediction_summary(prediction_score, student_data.analysis)
+    analysis = _build_student_analysis(student_dict, prediction_score)
+    
+    def event_stream():
+        # Starlette itera generadores síncronos en su threadpool (no bloquea el event loop)
+        yield _format_sse("prediction", prediction_summary)
+        yield _format_sse("analysis", analysis)
+        
+        try:
+            for event, data in openai_service.stream_recommendations(prediction_score, student_dict):
+                yield _format_sse(event, data)
+        except Exception as e:
+            logger.error(f"Error en streaming de recomendaciones: {e}")
+            yield _format_sse("error", {"detail": "Error interno generando recomendaciones"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get(
     "/health",
     summary="Estado del Servicio de Recomendaciones",
@@ -151,6 +191,7 @@ async def health_check() -> Dict[str, Any]:
                 "openai_service": "available" if openai_service.is_available() else "unavailable",
                 "fallback": "available"
             },
+            "circuit_breaker": openai_service.get_breaker_status(),
             "timestamp": "2025-01-21T12:00:00Z"
         }
     except Exception as e:
@@ -159,93 +200,54 @@ async def health_check() -> Dict[str, Any]:
 
 # Funciones auxiliares para análisis (aplicando DRY)
 
-def _analyze_risk_factors(student_data: Dict, prediction_score: float) -> list:
+def _build_prediction_summary(prediction_score: float, analysis_data: Dict) -> Dict[str, Any]:
     """
-    Identifica factores de riesgo académico.
+    Construye el resumen de la predicción en las distintas escalas.
     
     Args:
-        student_data: Datos del estudiante
-        prediction_score: Puntuación predicha
+        prediction_score: Puntuación predicha (escala 20)
+        analysis_data: Datos de análisis enviados por el cliente
         
     Returns:
-        list: Lista de factores de riesgo
+        Dict: Resumen de la predicción
     """
-    risk_factors = []
-    
-    # Factores basados en datos del estudiante
-    if student_data.get('hours_studied', 0) < 10:
-        risk_factors.append("Horas de estudio insuficientes (menos de 10 por semana)")
-    
-    if student_data.get('sleep_hours', 8) < 6:
-        risk_factors.append("Horas de sueño insuficientes (menos de 6 horas)")
-    
-    if student_data.get('previous_scores', 15) < 11:
-        risk_factors.append("Historial académico previo bajo")
-    
-    if student_data.get('tutoring_sessions', 0) == 0 and prediction_score < 14:
-        risk_factors.append("Falta de apoyo académico adicional")
-    
-    if student_data.get('extracurricular_activities', 0) > 3:
-        risk_factors.append("Posible sobrecarga de actividades extracurriculares")
-    
-    return risk_factors[:5]  # Máximo 5 factores
+    grade_letter = (
+        "AD" if prediction_score >= 18 else
+        "A" if prediction_score >= 14 else
+        "B" if prediction_score >= 10 else "C"
+    )
+    
+    return {
+        "exam_score": prediction_score,  # En escala 20
+        "grade_letter": grade_letter,     # Basado en la predicción correcta
+        "grade_20": prediction_score,     # Misma que exam_score
+        "grade_100": round(prediction_score * 5, 2),  # Conversión a escala 100
+        "confidence": analysis_data.get("confidence", "High")
+    }
 
-def _analyze_strengths(student_data: Dict, prediction_score: float) -> list:
+def _build_student_analysis(student_data: Dict, prediction_score: float) -> Dict[str, list]:
     """
-    Identifica fortalezas del estudiante.
+    Agrupa factores de riesgo, fortalezas y áreas de mejora.
     
     Args:
         student_data: Datos del estudiante
         prediction_score: Puntuación predicha
         
     Returns:
-        list: Lista de fortalezas
+        Dict: Análisis del estudiante
     """
-    strengths = []
-    
-    if student_data.get('hours_studied', 0) >= 15:
-        strengths.append("Excelente dedicación al estudio")
-    
-    if student_data.get('previous_scores', 0) >= 16:
-        strengths.append("Historial académico destacado")
-    
-    if student_data.get('tutoring_sessions', 0) > 2:
-        strengths.append("Búsqueda proactiva de apoyo académico")
-    
-    if student_data.get('sleep_hours', 8) >= 7:
-        strengths.append("Buenos hábitos de descanso")
-    
-    if prediction_score >= 14:
-        strengths.append("Predicción favorable de rendimiento")
-    
-    return strengths[:5]  # Máximo 5 fortalezas
+    # Tabla de reglas declarativa (services/analysis_rules.py), máximo 5 por categoría
+    return student_rule_engine.analyze_one(student_data, prediction_score)
 
-def _identify_improvement_areas(student_data: Dict, prediction_score: float) -> list:
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
     """
-    Identifica áreas específicas de mejora.
+    Serializa un evento en formato Server-Sent Events.
     
     Args:
-        student_data: Datos del estudiante
-        prediction_score: Puntuación predicha
+        event: Nombre del evento
+        data: Datos del evento (se envían como JSON)
         
     Returns:
-        list: Lista de áreas de mejora
+        str: Evento SSE listo para enviar
     """
-    improvement_areas = []
-    
-    if student_data.get('hours_studied', 0) < 15:
-        improvement_areas.append("Incrementar tiempo dedicado al estudio")
-    
-    if student_data.get('tutoring_sessions', 0) < 2 and prediction_score < 16:
-        improvement_areas.append("Considerar sesiones de tutoría adicionales")
-    
-    if student_data.get('sleep_hours', 8) < 7:
-        improvement_areas.append("Mejorar hábitos de sueño y descanso")
-    
-    if student_data.get('extracurricular_activities', 0) == 0:
-        improvement_areas.append("Incorporar actividades extracurriculares balanceadas")
-    
-    if prediction_score < 14:
-        improvement_areas.append("Reforzar estrategias de estudio y preparación")
-    
-    return improvement_areas[:5]  # Máximo 5 áreas
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Servidor Multi-Worker con Modelo Precargado
+==========================================
+
+Modo de producción: un proceso maestro importa la app y carga el modelo
+una sola vez, abre el socket y hace fork de N workers uvicorn que
+heredan ambos (la semántica `--preload` de gunicorn, sin dependencias
+nuevas):
+
+- Memoria: los workers comparten copy-on-write las páginas del modelo y
+  de los módulos ya importados. Con arreglos `.npy` mapeados el modelo
+  son páginas de archivo de solo lectura, compartidas aunque el heap se
+  ensucie; `gc.freeze()` antes del fork evita que el recolector toque
+  los objetos precargados (y copie sus páginas) en cada worker.
+- Arranque: cada worker solo ejecuta el lifespan (warm-up); no reimporta
+  ni vuelve a cargar el modelo salvo que se haya publicado otra versión.
+- Señales del maestro:
+    SIGTERM / SIGINT: cierre ordenado; los workers terminan las peticiones
+        en curso (hasta `SERVER_GRACEFUL_TIMEOUT_SECONDS`, luego SIGKILL)
+    SIGHUP: reinicio escalonado; el maestro recarga el modelo si cambió y
+        reemplaza los workers de a uno, deteniendo cada uno recién cuando
+        su reemplazo terminó el warm-up
+  Un worker que termina inesperadamente se reemplaza con el mismo número.
+- Métricas: `/metrics` agrega a todos los workers mediante
+  `METRICS_MULTIPROC_DIR` (si está vacío se usa un directorio temporal);
+  `predictscore_worker_*` y el campo `worker` de `/health` muestran
+  peticiones, ocupación y memoria de cada uno.
+
+Requiere fork (Linux/macOS). Para desarrollo, `python main.py` sigue
+levantando un único proceso con recarga automática.
+
+Uso (desde backend/):
+    python serve.py                         # SERVER_WORKERS (0 = según la política de hilos)
+    python serve.py --workers 4 --host 0.0.0.0 --port 8001
+    kill -HUP <pid del maestro>             # reinicio escalonado
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import argparse
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger("serve")
+
+LISTEN_BACKLOG = 2048
+READY_TIMEOUT_SECONDS = 120
+RESPAWN_BACKOFF_SECONDS = 1.0
+POLL_SECONDS = 0.5
+
+class PreforkServer:
+    """Proceso maestro: precarga, fork de workers, supervisión y reinicios."""
+
+    def __init__(self, host: Optional[str], port: Optional[int], workers: int, graceful_timeout: float, log_level: str):
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.main: Any = None
+        self.sock: Optional[socket.socket] = None
+        self.master_pid = os.getpid()
+        self.workers: Dict[int, int] = {}       # pid -> número de worker
+        self.ready_pipes: Dict[int, int] = {}   # pid -> extremo de lectura (aviso de readiness)
+        self.spawned_at: Dict[int, float] = {}
+        self.retiring: Set[int] = set()
+        self._stopping = False
+        self._restart_requested = False
+
+    # === PRECARGA ===
+
+    def preload(self) -> None:
+        """Importa la app y carga el modelo en el maestro (lo heredan todos los workers)."""
+        started = time.perf_counter()
+        import main
+
+        self.main = main
+        self.host = self.host or main.config.HOST
+        self.port = self.port or main.config.PORT
+        if not main.predictor.load_model():
+            logger.warning("⚠️ Modelo no precargado: cada worker intentará cargarlo en su arranque")
+        self._freeze()
+        # Cierra la precarga en la línea de tiempo que heredan los workers
+        main.startup_timeline.mark("preload_model")
+        main.startup_timeline.mark_ready()
+        active = main.predictor.active
+        logger.info(f"📦 App y modelo precargados en {time.perf_counter() - started:.2f}s "
+                    f"(versión {active.version if active else '-'}, {active.format if active else 'sin modelo'})")
+
+    @staticmethod
+    def _freeze() -> None:
+        """Saca del recolector los objetos ya creados: sus páginas siguen compartidas tras el fork."""
+        gc.collect()
+        gc.freeze()
+
+    def _refresh_model(self) -> None:
+        """Antes de un reinicio escalonado: recarga el modelo si se publicó otra versión."""
+        from main import model_artifact_stamp
+
+        predictor = self.main.predictor
+        if predictor.is_loaded and predictor.active.stamp == model_artifact_stamp():
+            return
+        if predictor.load_model():
+            self._freeze()
+            logger.info(f"📦 Modelo recargado en el maestro: versión {predictor.active.version}")
+
+    def bind(self) -> None:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(LISTEN_BACKLOG)
+        sock.set_inheritable(True)
+        self.sock = sock
+
+    # === WORKERS ===
+
+    def spawn(self, number: int) -> int:
+        """Fork de un worker; hereda app, modelo y socket del maestro."""
+        read_fd, write_fd = os.pipe()
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            code = 0
+            try:
+                self._run_worker(number, write_fd, forked_at)
+            except BaseException as e:
+                logger.error(f"❌ Worker {number} terminó con error: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+
+        os.close(write_fd)
+        self.workers[pid] = number
+        self.ready_pipes[pid] = read_fd
+        self.spawned_at[pid] = time.monotonic()
+        logger.info(f"👷 Worker {number} iniciado (pid {pid})")
+        return pid
+
+    def _run_worker(self, number: int, ready_fd: int, forked_at: float) -> None:
+        import uvicorn
+        from core.worker import worker_identity
+
+        # Grupo propio: Ctrl+C llega solo al maestro, que coordina el cierre
+        os.setpgid(0, 0)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_DFL)
+        for fd in self.ready_pipes.values():
+            os.close(fd)
+
+        worker_identity.assign(number, self.master_pid, ready_fd)
+        # El arranque del worker se mide desde el fork, no desde la precarga del maestro
+        self.main.startup_timeline.restart_after_fork(forked_at)
+        config = uvicorn.Config(
+            self.main.app,
+            lifespan="on",
+            log_level=self.log_level,
+            timeout_graceful_shutdown=self.graceful_timeout
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def _poll(self, timeout: float) -> List[int]:
+        """Espera avisos de readiness; devuelve los pids que quedaron listos."""
+        if not self.ready_pipes:
+            time.sleep(timeout)
+            return []
+        readable, _, _ = select.select(list(self.ready_pipes.values()), [], [], timeout)
+        ready = []
+        for pid, fd in list(self.ready_pipes.items()):
+            if fd not in readable:
+                continue
+            if os.read(fd, 1):
+                ready.append(pid)
+                logger.info(f"✅ Worker {self.workers.get(pid)} (pid {pid}) listo "
+                            f"en {time.monotonic() - self.spawned_at[pid]:.2f}s")
+            os.close(fd)
+            del self.ready_pipes[pid]
+        return ready
+
+    def _reap(self) -> None:
+        """Recoge workers terminados y reemplaza los que no se detuvieron a propósito."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            number = self.workers.pop(pid, None)
+            fd = self.ready_pipes.pop(pid, None)
+            if fd is not None:
+                os.close(fd)
+            spawned_at = self.spawned_at.pop(pid, time.monotonic())
+            if number is None or self._stopping or pid in self.retiring:
+                self.retiring.discard(pid)
+                continue
+
+            code = os.waitstatus_to_exitcode(status)
+            logger.warning(f"⚠️ Worker {number} (pid {pid}) terminó inesperadamente (código {code}); reemplazándolo")
+            # Evita un bucle de reinicios si el worker muere al arrancar
+            if time.monotonic() - spawned_at < RESPAWN_BACKOFF_SECONDS:
+                time.sleep(RESPAWN_BACKOFF_SECONDS)
+            self.spawn(number)
+
+    def _signal(self, pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def rolling_restart(self) -> None:
+        """Reemplaza los workers de a uno: el anterior se detiene cuando el nuevo está listo."""
+        logger.info(f"🔄 Reinicio escalonado de {len(self.workers)} workers")
+        self._refresh_model()
+        for old_pid, number in list(self.workers.items()):
+            if self._stopping:
+                return
+            new_pid = self.spawn(number)
+            # Si el reemplazo muere, su pipe se cierra sin aviso (EOF)
+            ready = False
+            deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+            while not ready and new_pid in self.ready_pipes and time.monotonic() < deadline:
+                ready = new_pid in self._poll(POLL_SECONDS)
+
+            if not ready:
+                logger.error(f"❌ El reemplazo del worker {number} no quedó listo; se mantiene el anterior")
+                self.retiring.add(new_pid)
+                self._signal(new_pid, signal.SIGKILL)
+                continue
+            self.retiring.add(old_pid)
+            self._signal(old_pid, signal.SIGTERM)
+        logger.info("✅ Reinicio escalonado completado")
+
+    # === CICLO PRINCIPAL ===
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_restart)
+
+        self.preload()
+        self.bind()
+        logger.info(f"🚀 Maestro {self.master_pid} escuchando en http://{self.host}:{self.port} "
+                    f"con {self.worker_count} workers")
+        for number in range(self.worker_count):
+            self.spawn(number)
+
+        while not self._stopping:
+            self._poll(POLL_SECONDS)
+            self._reap()
+            if self._restart_requested:
+                self._restart_requested = False
+                self.rolling_restart()
+
+        self.shutdown()
+        return 0
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        self._stopping = True
+
+    def _handle_restart(self, signum: int, frame: Any) -> None:
+        self._restart_requested = True
+
+    def shutdown(self) -> None:
+        """Cierre ordenado: SIGTERM a todos y SIGKILL a los que excedan el plazo."""
+        logger.info(f"🔄 Deteniendo {len(self.workers)} workers...")
+        for pid in list(self.workers):
+            self._signal(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"⚠️ Worker {self.workers[pid]} (pid {pid}) no terminó a tiempo; SIGKILL")
+            self._signal(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        if self.sock is not None:
+            self.sock.close()
+        logger.info("👋 Maestro detenido")
+
+def prepare_metrics_dir() -> Path:
+    """
+    Directorio compartido de métricas (antes de importar la app, que lo lee
+    al configurarse). Se vacía al arrancar: los archivos de una ejecución
+    anterior sumarían contadores ajenos.
+    """
+    directory = os.getenv("METRICS_MULTIPROC_DIR")
+    if not directory:
+        directory = tempfile.mkdtemp(prefix="predictscore-metrics-")
+        os.environ["METRICS_MULTIPROC_DIR"] = directory
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for stale in path.glob("metrics_*.json"):
+        stale.unlink(missing_ok=True)
+    return path
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servidor multi-worker de PredictScore-ML con modelo precargado")
+    parser.add_argument("--host", help="Por defecto Config.HOST de main.py")
+    parser.add_argument("--port", type=int, help="Por defecto Config.PORT de main.py")
+    parser.add_argument("--workers", type=int, help="Workers (por defecto SERVER_WORKERS; 0 = según la política de hilos)")
+    parser.add_argument("--graceful-timeout", type=float, help="Segundos para terminar peticiones en curso al detener un worker")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    # El .env antes de leer METRICS_MULTIPROC_DIR (core.config lo vuelve a cargar sin pisar nada)
+    from dotenv import load_dotenv
+    load_dotenv()
+    metrics_dir = prepare_metrics_dir()
+    from core.config import settings
+    from core.threading_policy import recommended_processes, threading_controller
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Antes de importar la app: fija executor y BLAS para esta cantidad de workers (0 = la de la política)
+    policy = threading_controller.configure(args.workers or recommended_processes())
+    logger.info(f"🧵 Política de hilos: {policy.describe()}")
+    server = PreforkServer(
+        args.host,
+        args.port,
+        policy.processes,
+        args.graceful_timeout if args.graceful_timeout is not None else settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        args.log_level
+    )
+    logger.info(f"📊 Métricas multiproceso en {metrics_dir}")
+    return server.run()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
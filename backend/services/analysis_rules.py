@@ -0,0 +1,295 @@
+"""
+Motor de Reglas Vectorizado para Análisis Académico
+==================================================
+
+Reglas declarativas para identificar factores de riesgo, fortalezas y
+áreas de mejora. Cada regla se evalúa como una máscara booleana de NumPy
+sobre todas las filas a la vez, de modo que el costo del análisis no
+escala en Python por estudiante.
+
+Las filas con el mismo patrón de reglas activadas comparten el mismo
+resultado: el análisis se construye una vez por patrón, no por fila.
+
+Principios aplicados:
+- Open/Closed: nuevas reglas se agregan a la tabla, no al código
+- DRY: una sola implementación para un estudiante y para datasets
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Categorías del análisis (mismo orden que la respuesta de la API)
+CATEGORIES = ("risk_factors", "strengths", "improvement_areas")
+
+# Columna especial: puntuación predicha en escala 20
+SCORE = "score"
+
+_OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+class AnalysisRule:
+    """
+    Regla declarativa: se activa cuando se cumplen todas sus condiciones.
+
+    Cada condición es una tupla `(columna, operador, umbral)`; la columna
+    `score` se refiere a la puntuación predicha en escala 20.
+    """
+
+    __slots__ = ("rule_id", "category", "message", "conditions")
+
+    def __init__(
+        self,
+        rule_id: str,
+        category: str,
+        message: str,
+        conditions: Sequence[Tuple[str, str, float]]
+    ):
+        if category not in CATEGORIES:
+            raise ValueError(f"Categoría de regla desconocida: {category}")
+        for _, operator, _ in conditions:
+            if operator not in _OPERATORS:
+                raise ValueError(f"Operador de regla desconocido: {operator}")
+
+        self.rule_id = rule_id
+        self.category = category
+        self.message = message
+        self.conditions = tuple(conditions)
+
+class RuleEngine:
+    """
+    Evalúa una tabla de reglas sobre columnas de datos como máscaras NumPy.
+
+    Características:
+    - Una máscara booleana por regla, calculada sobre todo el dataset
+    - Conteo por regla para toda la clase
+    - Análisis por fila construido una vez por patrón de reglas
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[AnalysisRule],
+        defaults: Dict[str, float],
+        max_per_category: int = 5,
+        empty_messages: Optional[Dict[str, str]] = None
+    ):
+        if len(rules) > 63:
+            raise ValueError("El motor soporta como máximo 63 reglas")
+
+        self.rules = tuple(rules)
+        self.defaults = defaults
+        self.max_per_category = max_per_category
+        self.empty_messages = empty_messages or {}
+        self._bit_weights = np.left_shift(np.uint64(1), np.arange(len(self.rules), dtype=np.uint64))
+
+    def evaluate(self, data: Any, scores: Any) -> np.ndarray:
+        """
+        Evalúa todas las reglas sobre los datos.
+
+        Args:
+            data: DataFrame o mapping columna -> valores (escalares o arrays)
+            scores: Puntuaciones predichas en escala 20
+
+        Returns:
+            np.ndarray: Matriz booleana (filas x reglas)
+        """
+        scores = np.atleast_1d(np.asarray(scores, dtype=float))
+        n_rows = len(scores)
+        columns: Dict[str, np.ndarray] = {SCORE: scores}
+        mask = np.empty((n_rows, len(self.rules)), dtype=bool)
+
+        for index, rule in enumerate(self.rules):
+            rule_mask = np.ones(n_rows, dtype=bool)
+            for column, operator, threshold in rule.conditions:
+                if column not in columns:
+                    columns[column] = self._column_values(data, column, n_rows)
+                rule_mask &= _OPERATORS[operator](columns[column], threshold)
+            mask[:, index] = rule_mask
+
+        return mask
+
+    def rule_counts(self, mask: np.ndarray) -> Dict[str, int]:
+        """
+        Cuenta cuántas filas activan cada regla.
+
+        Args:
+            mask: Matriz booleana devuelta por `evaluate`
+
+        Returns:
+            Dict[str, int]: Conteo por identificador de regla
+        """
+        totals = mask.sum(axis=0)
+        return {rule.rule_id: int(total) for rule, total in zip(self.rules, totals)}
+
+    def analyze(self, data: Any, scores: Any) -> Tuple[List[Dict[str, List[str]]], Dict[str, int]]:
+        """
+        Analiza todas las filas en una sola pasada.
+
+        Args:
+            data: DataFrame o mapping columna -> valores
+            scores: Puntuaciones predichas en escala 20
+
+        Returns:
+            Tuple: Análisis por fila y conteo de reglas para todo el dataset
+        """
+        mask = self.evaluate(data, scores)
+        if len(mask) == 0:
+            return [], self.rule_counts(mask)
+
+        # Codificar las reglas activadas de cada fila como un entero de bits
+        patterns = mask.astype(np.uint64) @ self._bit_weights
+        unique_patterns, inverse = np.unique(patterns, return_inverse=True)
+        analyses = [self._build_analysis(int(pattern)) for pattern in unique_patterns]
+
+        return [analyses[i] for i in inverse.ravel().tolist()], self.rule_counts(mask)
+
+    def analyze_one(self, data: Mapping[str, Any], score: float) -> Dict[str, List[str]]:
+        """
+        Analiza un solo estudiante.
+
+        Args:
+            data: Datos del estudiante
+            score: Puntuación predicha en escala 20
+
+        Returns:
+            Dict[str, List[str]]: Mensajes por categoría
+        """
+        analyses, _ = self.analyze(data, [score])
+        return analyses[0]
+
+    def _column_values(self, data: Any, column: str, n_rows: int) -> np.ndarray:
+        """Obtiene una columna numérica; los valores no numéricos no activan reglas."""
+        if column in data:
+            values = data[column]
+            if isinstance(values, pd.Series):
+                return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+            try:
+                return np.broadcast_to(np.asarray(values, dtype=float), (n_rows,))
+            except (TypeError, ValueError):
+                return np.full(n_rows, np.nan)
+
+        return np.full(n_rows, float(self.defaults.get(column, np.nan)))
+
+    def _build_analysis(self, pattern: int) -> Dict[str, List[str]]:
+        """Construye los mensajes por categoría para un patrón de reglas."""
+        analysis: Dict[str, List[str]] = {category: [] for category in CATEGORIES}
+
+        for index, rule in enumerate(self.rules):
+            if pattern >> index & 1:
+                analysis[rule.category].append(rule.message)
+
+        for category, messages in analysis.items():
+            del messages[self.max_per_category:]
+            if not messages and category in self.empty_messages:
+                messages.append(self.empty_messages[category])
+
+        return analysis
+
+# === TABLAS DE REGLAS ===
+
+# Reglas para el endpoint de recomendaciones (datos del formulario, campos en minúscula)
+STUDENT_RULES = [
+    AnalysisRule("low_study_hours", "risk_factors",
+                 "Horas de estudio insuficientes (menos de 10 por semana)",
+                 [("hours_studied", "<", 10)]),
+    AnalysisRule("low_sleep", "risk_factors",
+                 "Horas de sueño insuficientes (menos de 6 horas)",
+                 [("sleep_hours", "<", 6)]),
+    AnalysisRule("low_previous_scores", "risk_factors",
+                 "Historial académico previo bajo",
+                 [("previous_scores", "<", 11)]),
+    AnalysisRule("no_support", "risk_factors",
+                 "Falta de apoyo académico adicional",
+                 [("tutoring_sessions", "==", 0), (SCORE, "<", 14)]),
+    AnalysisRule("activity_overload", "risk_factors",
+                 "Posible sobrecarga de actividades extracurriculares",
+                 [("extracurricular_activities", ">", 3)]),
+
+    AnalysisRule("high_study_hours", "strengths",
+                 "Excelente dedicación al estudio",
+                 [("hours_studied", ">=", 15)]),
+    AnalysisRule("high_previous_scores", "strengths",
+                 "Historial académico destacado",
+                 [("previous_scores", ">=", 16)]),
+    AnalysisRule("proactive_support", "strengths",
+                 "Búsqueda proactiva de apoyo académico",
+                 [("tutoring_sessions", ">", 2)]),
+    AnalysisRule("good_sleep", "strengths",
+                 "Buenos hábitos de descanso",
+                 [("sleep_hours", ">=", 7)]),
+    AnalysisRule("favorable_prediction", "strengths",
+                 "Predicción favorable de rendimiento",
+                 [(SCORE, ">=", 14)]),
+
+    AnalysisRule("increase_study_time", "improvement_areas",
+                 "Incrementar tiempo dedicado al estudio",
+                 [("hours_studied", "<", 15)]),
+    AnalysisRule("more_tutoring", "improvement_areas",
+                 "Considerar sesiones de tutoría adicionales",
+                 [("tutoring_sessions", "<", 2), (SCORE, "<", 16)]),
+    AnalysisRule("improve_sleep", "improvement_areas",
+                 "Mejorar hábitos de sueño y descanso",
+                 [("sleep_hours", "<", 7)]),
+    AnalysisRule("add_activities", "improvement_areas",
+                 "Incorporar actividades extracurriculares balanceadas",
+                 [("extracurricular_activities", "==", 0)]),
+    AnalysisRule("reinforce_strategies", "improvement_areas",
+                 "Reforzar estrategias de estudio y preparación",
+                 [(SCORE, "<", 14)]),
+]
+
+# Reglas para datasets CSV (columnas del modelo, Previous_Scores en escala 100)
+DATASET_RULES = [
+    AnalysisRule("insufficient_study_hours", "risk_factors",
+                 "Horas de estudio insuficientes",
+                 [("Hours_Studied", "<", 10)]),
+    AnalysisRule("low_academic_history", "risk_factors",
+                 "Historial académico bajo",
+                 [("Previous_Scores", "<", 60)]),
+
+    AnalysisRule("adequate_study_hours", "strengths",
+                 "Dedicación adecuada al estudio",
+                 [("Hours_Studied", ">=", 10)]),
+    AnalysisRule("excellent_academic_history", "strengths",
+                 "Excelente historial académico",
+                 [("Previous_Scores", ">=", 80)]),
+    AnalysisRule("seeks_support", "strengths",
+                 "Búsqueda de apoyo académico",
+                 [("Tutoring_Sessions", ">", 0)]),
+
+    AnalysisRule("increase_study_time", "improvement_areas",
+                 "Incrementar tiempo de estudio",
+                 [("Hours_Studied", "<", 10)]),
+    AnalysisRule("consider_support", "improvement_areas",
+                 "Considerar apoyo académico",
+                 [("Tutoring_Sessions", "==", 0), (SCORE, "<", 14)]),
+]
+
+# Motores listos para usar (Singleton pattern)
+student_rule_engine = RuleEngine(
+    STUDENT_RULES,
+    defaults={
+        "hours_studied": 0, "sleep_hours": 8, "previous_scores": 15,
+        "tutoring_sessions": 0, "extracurricular_activities": 0
+    }
+)
+
+dataset_rule_engine = RuleEngine(
+    DATASET_RULES,
+    defaults={"Hours_Studied": 0, "Previous_Scores": 0, "Tutoring_Sessions": 0},
+    empty_messages={
+        "risk_factors": "Ningún factor de riesgo identificado",
+        "strengths": "Análisis en progreso",
+        "improvement_areas": "Mantener el rendimiento actual"
+    }
+)
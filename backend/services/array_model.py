@@ -0,0 +1,231 @@
+"""
+Artefactos del Modelo en Arreglos NumPy (carga rápida y compartida)
+==================================================================
+
+El SVR (kernel RBF) y el StandardScaler se exportan como arreglos
+planos, un `.npy` por arreglo, más `arrays.json` con los escalares:
+
+- support_vectors.npy (n_sv × n_features), support_norms.npy, dual_coef.npy
+- scaler_mean.npy, scaler_scale.npy
+- arrays.json: intercept, gamma, formato y huella (sha256) de los pickles de origen
+
+Los `.npy` se abren con `mmap_mode='r'`: cada worker mapea los mismos
+archivos de solo lectura y comparte las páginas a través de la caché
+del sistema operativo, sin deserializar pickles ni importar
+scikit-learn. (Un `.npz` es un zip y NumPy no puede mapearlo; por eso
+un archivo por arreglo.)
+
+La predicción reproduce `SVR.predict`:
+
+    f(x) = Σ dual_coef_i · exp(-gamma · ||x - sv_i||²) + intercept
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "arrays.json"
+PREDICT_BLOCK_ROWS = 2048  # Filas por bloque de la matriz de kernel (memoria acotada)
+EXPORT_TOLERANCE = 1e-6
+
+class ArrayScaler:
+    """StandardScaler reducido a media y escala (interfaz `transform`)."""
+
+    def __init__(self, mean: np.ndarray, scale: np.ndarray):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.n_features_in_ = len(scale)
+
+    def transform(self, X: Any) -> np.ndarray:
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+class ArraySVR:
+    """SVR RBF evaluado con NumPy sobre arreglos (posiblemente mapeados en memoria)."""
+
+    kernel = "rbf"
+
+    def __init__(
+        self,
+        support_vectors: np.ndarray,
+        support_norms: np.ndarray,
+        dual_coef: np.ndarray,
+        intercept: float,
+        gamma: float
+    ):
+        self.support_vectors_ = support_vectors
+        self.support_norms_ = support_norms
+        self.dual_coef_ = dual_coef
+        self.intercept_ = intercept
+        self.gamma = gamma
+        self.n_features_in_ = support_vectors.shape[1]
+
+    def predict(self, X: Any) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        predictions = np.empty(len(X))
+        for start in range(0, len(X), PREDICT_BLOCK_ROWS):
+            block = X[start:start + PREDICT_BLOCK_ROWS]
+            # ||x - sv||² = ||x||² + ||sv||² - 2·x·sv (un producto matricial por bloque)
+            distances = block @ self.support_vectors_.T
+            distances *= -2.0
+            distances += np.einsum("ij,ij->i", block, block)[:, None]
+            distances += self.support_norms_
+            np.maximum(distances, 0.0, out=distances)
+            distances *= -self.gamma
+            np.exp(distances, out=distances)
+            predictions[start:start + len(block)] = distances @ self.dual_coef_ + self.intercept_
+        return predictions
+
+def file_fingerprint(path: Path) -> str:
+    """sha256 de un archivo (para detectar arreglos desactualizados frente a sus pickles)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _arrays_from(model: Any, scaler: Any) -> Tuple[Dict[str, np.ndarray], Dict[str, float]]:
+    """Extrae los arreglos de un SVR RBF y su StandardScaler ajustados."""
+    if getattr(model, "kernel", None) != "rbf" or not hasattr(model, "dual_coef_"):
+        raise ValueError(f"Solo se exportan SVR con kernel RBF (recibido: {type(model).__name__})")
+    # Solo al exportar: servir desde los arreglos no importa scikit-learn
+    from sklearn.preprocessing import StandardScaler
+    if not isinstance(scaler, StandardScaler) or not hasattr(scaler, "n_samples_seen_"):
+        raise ValueError(f"Solo se exporta un StandardScaler ajustado (recibido: {type(scaler).__name__})")
+
+    support_vectors = np.ascontiguousarray(model.support_vectors_, dtype=np.float64)
+    n_features = support_vectors.shape[1]
+    if scaler.n_features_in_ != n_features:
+        raise ValueError(f"El scaler tiene {scaler.n_features_in_} features y el modelo {n_features}")
+    mean = getattr(scaler, "mean_", None)
+    scale = getattr(scaler, "scale_", None)
+    arrays = {
+        "support_vectors": support_vectors,
+        "support_norms": np.einsum("ij,ij->i", support_vectors, support_vectors),
+        "dual_coef": np.ascontiguousarray(model.dual_coef_.ravel(), dtype=np.float64),
+        # with_mean / with_std = False dejan mean_ / scale_ en None
+        "scaler_mean": np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64),
+        "scaler_scale": np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+    }
+    scalars = {"intercept": float(model.intercept_[0]), "gamma": float(model._gamma)}
+    return arrays, scalars
+
+def export_arrays(
+    model: Any,
+    scaler: Any,
+    directory: Path,
+    sources: Optional[Dict[str, Path]] = None
+) -> Dict[str, Any]:
+    """
+    Exporta modelo y scaler a `directory` (reemplazándolo por completo).
+
+    Antes de escribir se verifica, sobre los vectores de soporte llevados
+    a la escala original, que `ArrayScaler.transform` reproduce
+    `scaler.transform` y `ArraySVR.predict` reproduce `model.predict`.
+
+    Args:
+        sources: Pickles de origen ({"model": ruta, "scaler": ruta}) cuya
+            huella se guarda para detectar arreglos desactualizados
+
+    Returns:
+        Dict[str, Any]: Manifiesto escrito
+    """
+    arrays, scalars = _arrays_from(model, scaler)
+
+    exported_model = ArraySVR(arrays["support_vectors"], arrays["support_norms"], arrays["dual_coef"],
+                              scalars["intercept"], scalars["gamma"])
+    exported_scaler = ArrayScaler(arrays["scaler_mean"], arrays["scaler_scale"])
+
+    scaler_difference = difference = 0.0
+    support_probe = arrays["support_vectors"][:256]
+    if len(support_probe):
+        with warnings.catch_warnings():
+            # Modelo o scaler ajustados con nombres de columna: el sondeo es un arreglo sin nombres
+            warnings.simplefilter("ignore", UserWarning)
+            probe = scaler.inverse_transform(support_probe)
+            scaled = scaler.transform(probe)
+            expected = model.predict(scaled)
+        scaler_difference = float(np.max(np.abs(exported_scaler.transform(probe) - scaled)))
+        if scaler_difference > EXPORT_TOLERANCE:
+            raise ValueError(f"Los arreglos no reproducen el scaler (diferencia máxima {scaler_difference:.2e})")
+        difference = float(np.max(np.abs(exported_model.predict(scaled) - expected)))
+        if difference > EXPORT_TOLERANCE:
+            raise ValueError(f"Los arreglos no reproducen el modelo (diferencia máxima {difference:.2e})")
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "n_support": int(len(arrays["dual_coef"])),
+        "n_features": int(arrays["support_vectors"].shape[1]),
+        **scalars,
+        "arrays": {name: list(array.shape) for name, array in arrays.items()},
+        "sources": {name: file_fingerprint(path) for name, path in (sources or {}).items()},
+        "max_abs_difference": difference,
+        "scaler_max_abs_difference": scaler_difference
+    }
+
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{directory.name}.", dir=directory.parent))
+    try:
+        for name, array in arrays.items():
+            np.save(staging / f"{name}.npy", array)
+        with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        _replace_directory(staging, directory)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return manifest
+
+def _replace_directory(staging: Path, directory: Path) -> None:
+    """
+    Reemplaza un directorio por otro ya escrito.
+
+    Los procesos que tengan mapeados los archivos anteriores los conservan
+    (el sistema operativo mantiene el contenido hasta que se desmapean).
+    """
+    if not directory.exists():
+        os.replace(staging, directory)
+        return
+    retired = Path(tempfile.mkdtemp(prefix=f".{directory.name}.old.", dir=directory.parent))
+    os.replace(directory, retired / directory.name)
+    os.replace(staging, directory)
+    shutil.rmtree(retired, ignore_errors=True)
+
+def read_manifest(directory: Path) -> Optional[Dict[str, Any]]:
+    """Manifiesto de un directorio de arreglos (None si no existe o es de otro formato)."""
+    path = Path(directory) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest if manifest.get("format_version") == FORMAT_VERSION else None
+
+def load_arrays(directory: Path, mmap: bool = True) -> Tuple[ArraySVR, ArrayScaler, Dict[str, Any]]:
+    """
+    Abre modelo y scaler exportados.
+
+    Con `mmap=True` los arreglos quedan mapeados de solo lectura (compartidos
+    entre procesos); con False se leen a memoria privada.
+    """
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"Arreglos del modelo no encontrados en: {directory}")
+
+    mode = "r" if mmap else None
+    arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mode) for name in manifest["arrays"]}
+    model = ArraySVR(arrays["support_vectors"], arrays["support_norms"], arrays["dual_coef"],
+                     manifest["intercept"], manifest["gamma"])
+    scaler = ArrayScaler(arrays["scaler_mean"], arrays["scaler_scale"])
+    return model, scaler, manifest
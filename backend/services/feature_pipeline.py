@@ -0,0 +1,291 @@
+"""
+Pipeline de Features Compilado
+=============================
+
+Única fuente de verdad para convertir datos de estudiantes en la matriz
+de entrada del modelo SVR. Se construye una sola vez a partir de la
+sección `feature_pipeline` de `ml/models/metadata.json` y se compila en
+mapas de índices de columna, vocabularios y valores por defecto, de modo
+que `transform` solo ejecuta operaciones vectorizadas.
+
+Lo comparten la API (`main.py`), `MLService`, `SVRPredictor`,
+`routes/predict.py` y el re-entrenamiento, para que el servicio use
+exactamente la codificación con la que se entrenó el modelo.
+
+Acepta indistintamente:
+- Campos de la API (`study_hours`, `'High'`, `'Bachelor'`)
+- Columnas del CSV procesado (`Hours_Studied`, códigos numéricos)
+
+Las etiquetas categóricas se decodifican con tablas precalculadas: cada
+columna se convierte una vez con `pd.Categorical(...).codes` y se indexa
+en un arreglo `int8` de códigos. Las etiquetas desconocidas se cuentan
+(por feature y etiqueta) en lugar de mapearse en silencio.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+UnknownLabels = Dict[str, Dict[str, int]]
+
+import numpy as np
+import pandas as pd
+
+from core.config import settings
+from core.hot_logging import HotPathLogger
+
+logger = logging.getLogger(__name__)
+hot_log = HotPathLogger(logger)
+
+METADATA_FILE = "metadata.json"
+
+_COMPARATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+class FeaturePipeline:
+    """
+    Transformación compilada de datos de estudiantes a features del modelo.
+
+    Características:
+    - Orden de features fijo (el del entrenamiento)
+    - Vocabularios categóricos con sinónimos resueltos al compilar
+    - Tablas etiqueta -> código `int8` aplicadas a columnas completas
+    - Features derivadas calculadas sobre la matriz ya codificada
+    - Salida preasignada `float64` de forma (filas, features)
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.version = spec.get("version", 1)
+        self.feature_names: Tuple[str, ...] = tuple(spec["features"])
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.feature_names)}
+
+        numeric = spec.get("numeric", {})
+        categorical = spec.get("categorical", {})
+        derived = spec.get("derived", {})
+
+        for name in self.feature_names:
+            if sum(name in section for section in (numeric, categorical, derived)) != 1:
+                raise ValueError(f"Feature sin definición única en el pipeline: {name}")
+
+        # Columnas candidatas por feature (nombre canónico primero, luego alias)
+        self._sources: Dict[str, Tuple[str, ...]] = {}
+        for section in (numeric, categorical, derived):
+            for name, definition in section.items():
+                self._sources[name] = (name, *definition.get("aliases", ()))
+
+        self._numeric: List[Tuple[int, str, float]] = [
+            (self.index[name], name, float(definition.get("default", 0)))
+            for name, definition in numeric.items()
+        ]
+
+        self._vocabularies: Dict[str, Dict[str, int]] = {}
+        self._categories: Dict[str, pd.Index] = {}
+        self._lookups: Dict[str, np.ndarray] = {}
+        self._categorical: List[Tuple[int, str, float]] = []
+        for name, definition in categorical.items():
+            vocabulary = {str(label): int(code) for label, code in definition["vocabulary"].items()}
+            default = definition.get("default")
+            default_code = vocabulary[default] if isinstance(default, str) else int(default or 0)
+            self._vocabularies[name] = vocabulary
+            # Posición en `categories` -> código del entrenamiento
+            self._categories[name] = pd.Index(list(vocabulary), dtype=object)
+            self._lookups[name] = np.fromiter(vocabulary.values(), dtype=np.int8, count=len(vocabulary))
+            self._categorical.append((self.index[name], name, float(default_code)))
+
+        self._derived: List[Tuple[int, str, Dict[str, Any]]] = [
+            (self.index[name], name, self._compile_derived(name, definition))
+            for name, definition in derived.items()
+        ]
+
+    # === API PÚBLICA ===
+
+    @property
+    def n_features(self) -> int:
+        """Cantidad de features de salida."""
+        return len(self.feature_names)
+
+    def transform(
+        self,
+        data: Union[pd.DataFrame, Sequence[Dict[str, Any]]],
+        unknown_labels: Optional[UnknownLabels] = None
+    ) -> np.ndarray:
+        """
+        Convierte un lote de estudiantes en la matriz de entrada del modelo.
+
+        Args:
+            data: DataFrame o lista de diccionarios (campos de la API o del CSV)
+            unknown_labels: Acumulador opcional {feature: {etiqueta: cantidad}} de
+                etiquetas fuera del vocabulario (reemplazadas por el valor por defecto)
+
+        Returns:
+            np.ndarray: Matriz float64 de forma (filas, features) en el orden del entrenamiento
+        """
+        frame = data if isinstance(data, pd.DataFrame) else pd.DataFrame.from_records(list(data))
+        n_rows = len(frame)
+        output = np.empty((n_rows, self.n_features), dtype=np.float64)
+
+        for column, name, default in self._numeric:
+            output[:, column] = self._numeric_values(frame, name, default)
+
+        for column, name, default in self._categorical:
+            output[:, column] = self._encode(frame, name, default, unknown_labels)
+
+        # Las derivadas se calculan al final: dependen de las columnas ya codificadas
+        for column, name, compiled in self._derived:
+            computed = self._compute_derived(output, compiled)
+            provided = self._provided_values(frame, name)
+            output[:, column] = computed if provided is None else np.where(np.isnan(provided), computed, provided)
+
+        return output
+
+    def to_frame(self, data: Union[pd.DataFrame, Sequence[Dict[str, Any]]]) -> pd.DataFrame:
+        """Igual que `transform` pero con nombres de columna (para scalers con feature_names_in_)."""
+        return pd.DataFrame(self.transform(data), columns=list(self.feature_names))
+
+    def code(self, feature: str, label: str) -> int:
+        """Código numérico de una etiqueta categórica."""
+        return self._vocabularies[feature][label]
+
+    def labels_for(self, feature: str, label: str) -> Tuple[str, ...]:
+        """Todas las etiquetas (incluidos sinónimos) que comparten el código de `label`."""
+        vocabulary = self._vocabularies[feature]
+        code = vocabulary[label]
+        return tuple(name for name, value in vocabulary.items() if value == code)
+
+    def source_names(self, feature: str) -> Tuple[str, ...]:
+        """Nombres de columna aceptados para una feature."""
+        return self._sources[feature]
+
+    # === COMPILACIÓN ===
+
+    def _compile_derived(self, name: str, definition: Dict[str, Any]) -> Dict[str, Any]:
+        """Resuelve índices de columna y umbrales categóricos de una feature derivada."""
+        op = definition.get("op")
+
+        if op == "ratio":
+            return {
+                "op": op,
+                "numerator": self.index[definition["numerator"]],
+                "denominator": self.index[definition["denominator"]],
+                "offset": float(definition.get("offset", 0))
+            }
+
+        if op == "all":
+            conditions = []
+            for feature, comparator, threshold in definition["conditions"]:
+                if comparator not in _COMPARATORS:
+                    raise ValueError(f"Operador desconocido en '{name}': {comparator}")
+                if isinstance(threshold, str):
+                    threshold = self._vocabularies[feature][threshold]
+                conditions.append((self.index[feature], _COMPARATORS[comparator], float(threshold)))
+            return {"op": op, "conditions": tuple(conditions)}
+
+        raise ValueError(f"Tipo de feature derivada desconocido en '{name}': {op}")
+
+    # === TRANSFORMACIÓN ===
+
+    def _source_column(self, frame: pd.DataFrame, feature: str) -> Optional[str]:
+        """Primera columna presente para una feature (canónica o alias)."""
+        for candidate in self._sources[feature]:
+            if candidate in frame:
+                return candidate
+        return None
+
+    def _numeric_values(self, frame: pd.DataFrame, feature: str, default: float) -> np.ndarray:
+        """Valores numéricos de una feature (por defecto si falta o no es numérico)."""
+        values = self._provided_values(frame, feature)
+        if values is None:
+            return np.full(len(frame), default)
+        return np.where(np.isnan(values), default, values)
+
+    def _provided_values(self, frame: pd.DataFrame, feature: str) -> Optional[np.ndarray]:
+        """Columna convertida a float (NaN donde no es numérica); None si no existe."""
+        column = self._source_column(frame, feature)
+        if column is None:
+            return None
+        return pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=np.float64)
+
+    def _encode(
+        self,
+        frame: pd.DataFrame,
+        feature: str,
+        default: float,
+        unknown_labels: Optional[UnknownLabels] = None
+    ) -> np.ndarray:
+        """Codifica una feature categórica (acepta etiquetas o códigos ya numéricos)."""
+        column = self._source_column(frame, feature)
+        if column is None:
+            return np.full(len(frame), default)
+
+        raw = frame[column]
+        if pd.api.types.is_numeric_dtype(raw):
+            values = raw.to_numpy(dtype=np.float64)
+            return np.where(np.isnan(values), default, values)
+
+        # Posición de cada valor en el vocabulario (-1 si no pertenece)
+        positions = pd.Categorical(raw, categories=self._categories[feature]).codes
+        known = positions >= 0
+        values = np.where(known, self._lookups[feature][positions], np.nan)
+
+        unmapped = ~known & raw.notna().to_numpy()
+        if unmapped.any():
+            # Códigos enviados como texto ("2") o mezclados con etiquetas
+            values[unmapped] = pd.to_numeric(raw[unmapped], errors="coerce").to_numpy(dtype=np.float64)
+
+            unknown = unmapped & np.isnan(values)
+            if unknown.any():
+                counts = raw[unknown].astype(str).value_counts()
+                hot_log.event(
+                    "unknown_label", logging.WARNING,
+                    "%d etiquetas desconocidas en %s: %s (se usa el valor por defecto)",
+                    int(unknown.sum()), feature, counts.head(5).to_dict()
+                )
+                if unknown_labels is not None:
+                    feature_counts = unknown_labels.setdefault(feature, {})
+                    for label, count in counts.items():
+                        feature_counts[label] = feature_counts.get(label, 0) + int(count)
+
+        return np.where(np.isnan(values), default, values)
+
+    @staticmethod
+    def _compute_derived(matrix: np.ndarray, compiled: Dict[str, Any]) -> np.ndarray:
+        """Calcula una feature derivada a partir de la matriz codificada."""
+        if compiled["op"] == "ratio":
+            return matrix[:, compiled["numerator"]] / (matrix[:, compiled["denominator"]] + compiled["offset"])
+
+        result = np.ones(len(matrix), dtype=bool)
+        for column, comparator, threshold in compiled["conditions"]:
+            result &= comparator(matrix[:, column], threshold)
+        return result.astype(np.float64)
+
+def load_feature_pipeline(models_path: Optional[Union[str, Path]] = None) -> FeaturePipeline:
+    """
+    Construye el pipeline desde la sección `feature_pipeline` de metadata.json.
+
+    Args:
+        models_path: Directorio de modelos (por defecto `settings.ML_MODELS_PATH`)
+
+    Returns:
+        FeaturePipeline: Pipeline compilado
+    """
+    metadata_path = Path(models_path or settings.ML_MODELS_PATH) / METADATA_FILE
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    pipeline = FeaturePipeline(metadata["feature_pipeline"])
+    logger.info(f"Pipeline de features v{pipeline.version} compilado ({pipeline.n_features} features)")
+    return pipeline
+
+# Instancia global del pipeline (Singleton pattern)
+feature_pipeline = load_feature_pipeline()
@@ -0,0 +1,187 @@
+"""
+Predictor Heurístico Vectorizado (Fallback)
+==========================================
+
+Versión en arrays de la predicción básica de respaldo que se usa cuando el
+modelo SVR no está cargado o falla un chunk. Aplica las reglas de la
+antigua `OptimizedSVRPredictor._predict_basic` (casos críticos,
+normalización ponderada y penalización por factores negativos) como
+operaciones NumPy con máscaras, y coincide fila a fila con esa versión
+escalar (tests/test_heuristic_predictor.py la conserva como referencia).
+
+Diferencia documentada: un valor faltante (NaN/None) se trata como campo
+ausente y usa el valor por defecto.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import logging
+from typing import Any, Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from core.hot_logging import HotPathLogger
+
+logger = logging.getLogger(__name__)
+hot_log = HotPathLogger(logger)
+
+# Valores por defecto de los factores críticos
+CRITICAL_DEFAULTS = {
+    'attendance': 85,
+    'previous_scores': 75,
+    'study_hours': 10
+}
+
+# Pesos realistas basados en investigación educativa (mismo orden que la versión escalar)
+WEIGHTS = {
+    'previous_scores': 0.35,
+    'attendance': 0.25,
+    'study_hours': 0.15,
+    'motivation_level': 0.10,
+    'parental_involvement': 0.08,
+    'access_to_resources': 0.07
+}
+
+# Conversión categórica realista a escala 0-100
+CATEGORICAL_SCORES = {
+    'Low': 20, 'Medium': 60, 'High': 90,
+    'Poor': 20, 'Average': 50, 'Good': 80, 'Excellent': 95,
+    'Negative': 15, 'Neutral': 50, 'Positive': 85,
+    'No': 30, 'Yes': 70
+}
+
+# Factores negativos: (campo, valor, peso)
+NEGATIVE_FACTORS = (
+    ('learning_disabilities', 'Yes', 1.0),
+    ('peer_influence', 'Negative', 1.0),
+    ('family_income', 'Low', 0.5),
+    ('distance_from_home', 'Far', 0.5)
+)
+
+NEUTRAL_SCORE = 50.0
+
+def predict_basic_batch(students: Union[pd.DataFrame, List[Dict[str, Any]]]) -> np.ndarray:
+    """
+    Predicción básica de fallback para todo un lote.
+
+    Args:
+        students: DataFrame o lista de diccionarios con los datos de los estudiantes
+
+    Returns:
+        np.ndarray: Predicciones en escala 0-100 (una por estudiante)
+    """
+    frame = students if isinstance(students, pd.DataFrame) else pd.DataFrame.from_records(students)
+    n_rows = len(frame)
+    if n_rows == 0:
+        return np.empty(0)
+
+    numeric: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+    strings: Dict[str, np.ndarray] = {}
+    for feature in ('attendance', 'previous_scores', 'study_hours'):
+        values, present, strings[feature] = _column(frame, feature, n_rows)
+        numeric[feature] = (np.where(present, values, CRITICAL_DEFAULTS[feature]), present)
+
+    attendance = numeric['attendance'][0]
+    previous_scores = numeric['previous_scores'][0]
+    study_hours = numeric['study_hours'][0]
+
+    # Factores ponderados, acumulados en el mismo orden que la versión escalar
+    score = np.zeros(n_rows)
+    total_weight = np.zeros(n_rows)
+
+    for feature, weight in WEIGHTS.items():
+        if feature in numeric:
+            values, present = numeric[feature]
+            if feature == 'study_hours':
+                # Hasta 10 horas = 100, más de 10 = saturación
+                normalized = np.minimum(values * 10, 100)
+            else:
+                normalized = np.minimum(values, 100)
+        else:
+            values, present, is_string = _column(frame, feature, n_rows)
+            mapped = _categorical_scores(frame, feature, n_rows)
+            normalized = np.where(is_string, mapped, np.minimum(values * 20, 100))
+
+        score += np.where(present, normalized * weight, 0.0)
+        total_weight += np.where(present, weight, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        final_score = np.where(total_weight > 0, score / total_weight, NEUTRAL_SCORE)
+
+    # Penalización por factores negativos (máximo 30%)
+    negative_factors = np.zeros(n_rows)
+    for feature, value, weight in NEGATIVE_FACTORS:
+        if feature in frame:
+            negative_factors += np.where(frame[feature].to_numpy() == value, weight, 0.0)
+
+    penalty = np.minimum(negative_factors * 0.1, 0.3)
+    final_score = np.where(negative_factors > 0, final_score * (1 - penalty), final_score)
+    final_score = np.maximum(10, np.minimum(95, final_score))
+
+    # Reglas de casos extremos (en orden de prioridad)
+    critical_attendance = attendance < 20
+    critical_history = ~critical_attendance & (previous_scores < 30)
+    insufficient_hours = ~critical_attendance & ~critical_history & (study_hours < 2)
+
+    result = np.select(
+        [critical_attendance, critical_history, insufficient_hours],
+        [
+            np.maximum(10, np.minimum(30, previous_scores * 0.4)),  # Máximo 30/100
+            np.maximum(15, np.minimum(40, previous_scores * 0.6)),  # Máximo 40/100
+            np.maximum(20, np.minimum((attendance + previous_scores) / 2 * 0.7, 45))
+        ],
+        default=final_score
+    )
+
+    # Datos no numéricos en campos numéricos: valor neutro, salvo que una regla
+    # crítica haya respondido antes de usar el campo (como la versión escalar)
+    invalid = (
+        strings['attendance'] | strings['previous_scores']
+        | (strings['study_hours'] & ~critical_attendance & ~critical_history)
+    )
+    result[invalid] = NEUTRAL_SCORE
+
+    # Un solo resumen por lote en lugar de un log por estudiante
+    if critical_attendance.any() or critical_history.any() or insufficient_hours.any():
+        hot_log.event(
+            "basic_critical_cases", logging.WARNING,
+            "Casos críticos en predicción básica: asistencia=%d, historial=%d, horas=%d (de %d)",
+            int(critical_attendance.sum()), int(critical_history.sum()),
+            int(insufficient_hours.sum()), n_rows
+        )
+    if invalid.any():
+        hot_log.event("basic_invalid_rows", logging.ERROR,
+                      "Predicción básica: %d filas con datos inválidos, usando valor neutro", int(invalid.sum()))
+
+    return result
+
+def _column(frame: pd.DataFrame, feature: str, n_rows: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extrae una columna como floats.
+
+    Returns:
+        Tuple: (valores numéricos, máscara de presencia, máscara de valores string)
+    """
+    if feature not in frame:
+        empty = np.zeros(n_rows, dtype=bool)
+        return np.zeros(n_rows), empty, empty
+
+    raw = frame[feature]
+    present = raw.notna().to_numpy()
+
+    if pd.api.types.is_numeric_dtype(raw):
+        is_string = np.zeros(n_rows, dtype=bool)
+        values = raw.to_numpy(dtype=float)
+    else:
+        is_string = raw.astype(object).str.len().notna().to_numpy()
+        values = pd.to_numeric(raw.where(~is_string), errors='coerce').to_numpy(dtype=float)
+
+    return values, present, is_string
+
+def _categorical_scores(frame: pd.DataFrame, feature: str, n_rows: int) -> np.ndarray:
+    """Convierte etiquetas categóricas a su puntuación (desconocidas = 50)."""
+    if feature not in frame or pd.api.types.is_numeric_dtype(frame[feature]):
+        return np.full(n_rows, NEUTRAL_SCORE)
+    return frame[feature].map(CATEGORICAL_SCORES).fillna(NEUTRAL_SCORE).to_numpy(dtype=float)
@@ -19,7 +19,10 @@ import joblib
 import numpy as np
 import pandas as pd
 
+from core import metrics
 from core.config import Settings
+from services.feature_pipeline import feature_pipeline
+from services.model_registry import model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -52,25 +55,29 @@ class MLService:
         self.ridge_scaler = None
         self.current_model_type = "svr"
         self.cache = {}
-        self.stats = {
-            "predictions_count": 0,
-            "batch_predictions_count": 0,
-            "cache_hits": 0,
-            "errors_count": 0,
-            "model_switches": 0
-        }
+    
+    # Contadores expuestos en `statistics` (respaldados por core.metrics, thread-safe)
+    STAT_EVENTS = (
+        "predictions_count", "batch_predictions_count",
+        "cache_hits", "errors_count", "model_switches"
+    )
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Instantánea de los contadores del servicio."""
+        return {name: int(metrics.service_events.value(event=name)) for name in self.STAT_EVENTS}
         
     async def initialize(self):
         """Inicializa el servicio ML."""
         logger.info("🔄 Inicializando ML Service...")
         
         try:
-            # Cargar modelo SVR
+            # Cargar modelo SVR (arreglos mapeados en memoria si están exportados)
             if self.settings.SVR_MODEL_PATH.exists():
-                self.svr_model = joblib.load(self.settings.SVR_MODEL_PATH)
-                if self.settings.SVR_SCALER_PATH.exists():
-                    self.svr_scaler = joblib.load(self.settings.SVR_SCALER_PATH)
-                logger.info("✅ Modelo SVR cargado")
+                self.svr_model, self.svr_scaler, artifact_format = model_registry.load_serving(
+                    prefer_arrays=self.settings.MODEL_ARRAYS_ENABLED
+                )
+                logger.info(f"✅ Modelo SVR cargado ({artifact_format})")
             
             # Cargar modelo Ridge como fallback
             if self.settings.RIDGE_MODEL_PATH.exists():
@@ -104,8 +111,10 @@ class MLService:
             # Verificar cache
             cache_key = self._generate_cache_key(student_data)
             if cache_key in self.cache:
-                self.stats["cache_hits"] += 1
+                metrics.service_events.inc(event="cache_hits")
+                metrics.cache_requests.inc(cache="ml_service", result="hit")
                 return self.cache[cache_key]
+            metrics.cache_requests.inc(cache="ml_service", result="miss")
             
             # Realizar predicción
             prediction = await self._predict_with_fallback(student_data)
@@ -121,12 +130,12 @@ class MLService:
             
             # Guardar en cache
             self.cache[cache_key] = result
-            self.stats["predictions_count"] += 1
+            metrics.service_events.inc(event="predictions_count")
             
             return result
             
         except Exception as e:
-            self.stats["errors_count"] += 1
+            metrics.service_events.inc(event="errors_count")
             logger.error(f"Error en predicción: {e}")
             raise MLModelError(f"Prediction failed: {str(e)}")
     
@@ -153,11 +162,11 @@ class MLService:
                 "timestamp": time.time()
             }
             
-            self.stats["batch_predictions_count"] += 1
+            metrics.service_events.inc(event="batch_predictions_count")
             return result
             
         except Exception as e:
-            self.stats["errors_count"] += 1
+            metrics.service_events.inc(event="errors_count")
             logger.error(f"Error en predicción en lote: {e}")
             raise MLModelError(f"Batch prediction failed: {str(e)}")
     
@@ -171,8 +180,12 @@ class MLService:
     
     def _preprocess_features(self, student_data: Dict[str, Any], model_type: str) -> np.ndarray:
         """Preprocesa las features para el modelo."""
-        feature_order = self.settings.REQUIRED_FEATURES
-        feature_array = np.array([student_data.get(f, 0) for f in feature_order])
+        if model_type == "svr":
+            # Mismo pipeline compilado que la API y el entrenamiento
+            feature_array = feature_pipeline.transform([student_data])[0]
+        else:
+            feature_order = self.settings.REQUIRED_FEATURES
+            feature_array = np.array([student_data.get(f, 0) for f in feature_order])
         
         # Aplicar scaler según el modelo
         if model_type == "svr" and self.svr_scaler:
@@ -203,7 +216,8 @@ class MLService:
             
             # Fallback a Ridge si estaba usando SVR
             if self.current_model_type == "svr" and self.ridge_model:
-                self.stats["model_switches"] += 1
+                metrics.service_events.inc(event="model_switches")
+                metrics.fallback_activations.inc(component="ml_service", reason="ridge_fallback")
                 features = self._preprocess_features(student_data, "ridge")
                 prediction = self.ridge_model.predict([features])[0]
                 return max(0, min(100, prediction))
@@ -0,0 +1,324 @@
+"""
+Registro de Versiones del Modelo SVR
+===================================
+
+Cada entrenamiento o refresco publica un artefacto inmutable en
+`ml/models/versions/<versión>/`:
+
+- model.pkl / scaler.pkl: modelo y scaler
+- seed_set.npz: filas (sin escalar) y objetivo de los vectores de soporte,
+  semilla del siguiente refresco incremental
+- manifest.json: métricas, hiperparámetros, versión padre y origen
+- arrays/: el mismo modelo en arreglos `.npy` mapeables en memoria
+  (services/array_model.py), el formato que usa el servicio
+
+La publicación es atómica: el directorio se escribe con otro nombre y se
+renombra al final; luego `metadata.json` (el puntero a la versión
+vigente) se reemplaza con `os.replace`. Los pickles canónicos
+(`mejor_modelo_avanzado_svr.pkl`, `scaler_avanzado.pkl`) también se
+reemplazan atómicamente para los cargadores existentes, junto con sus
+arreglos en `svr_arrays/`.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from core.config import settings
+from services.array_model import export_arrays, file_fingerprint, load_arrays, read_manifest
+
+# joblib / sklearn se importan solo al leer o escribir pickles: el servicio
+# que carga los arreglos no los necesita
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILE = "metadata.json"
+MODEL_FILE = "model.pkl"
+SCALER_FILE = "scaler.pkl"
+SEED_SET_FILE = "seed_set.npz"
+MANIFEST_FILE = "manifest.json"
+CANONICAL_MODEL_FILE = "mejor_modelo_avanzado_svr.pkl"
+CANONICAL_SCALER_FILE = "scaler_avanzado.pkl"
+ARRAYS_DIR = "arrays"
+CANONICAL_ARRAYS_DIR = "svr_arrays"
+VERSION_PREFIX = "svr-"
+HISTORY_SIZE = 20
+
+class ModelRegistry:
+    """Artefactos versionados del SVR bajo `ml/models`."""
+
+    def __init__(self, models_path: Optional[Union[str, Path]] = None):
+        self.models_path = Path(models_path or settings.ML_MODELS_PATH)
+        self.versions_path = self.models_path / "versions"
+        self.metadata_path = self.models_path / METADATA_FILE
+
+    # === LECTURA ===
+
+    def read_metadata(self) -> Dict[str, Any]:
+        """Contenido actual de metadata.json ({} si no existe)."""
+        if not self.metadata_path.exists():
+            return {}
+        with open(self.metadata_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def current_version(self) -> Optional[str]:
+        """Versión vigente según metadata.json (None si nunca se publicó una)."""
+        return self.read_metadata().get("models", {}).get("svr", {}).get("version")
+
+    def version_dir(self, version: str) -> Path:
+        return self.versions_path / version
+
+    def has_version(self, version: str) -> bool:
+        """Si la versión está publicada en disco."""
+        return (self.version_dir(version) / MODEL_FILE).exists()
+
+    def artifact_paths(self, version: Optional[str] = None) -> Tuple[Path, Path]:
+        """
+        Rutas de modelo y scaler de una versión (por defecto la vigente).
+
+        Si la versión no existe en disco se usan los pickles canónicos.
+        """
+        version = version or self.current_version()
+        if version and self.has_version(version):
+            directory = self.version_dir(version)
+            return directory / MODEL_FILE, directory / SCALER_FILE
+        return self.models_path / CANONICAL_MODEL_FILE, self.models_path / CANONICAL_SCALER_FILE
+
+    def load(self, version: Optional[str] = None) -> Tuple[Any, Any]:
+        """Carga modelo y scaler de una versión (por defecto la vigente)."""
+        import joblib
+
+        model_path, scaler_path = self.artifact_paths(version)
+        return joblib.load(model_path), joblib.load(scaler_path)
+
+    def arrays_dir(self, version: Optional[str] = None) -> Path:
+        """Directorio de arreglos de una versión (o el canónico si no está publicada)."""
+        version = version or self.current_version()
+        if version and self.has_version(version):
+            return self.version_dir(version) / ARRAYS_DIR
+        return self.models_path / CANONICAL_ARRAYS_DIR
+
+    def fresh_arrays_dir(self, version: Optional[str] = None) -> Optional[Path]:
+        """
+        Directorio de arreglos si existe y corresponde a los pickles.
+
+        Los de una versión son inmutables; los canónicos se comparan por
+        sha256 con los pickles canónicos (pueden haberse reemplazado después).
+        """
+        directory = self.arrays_dir(version)
+        manifest = read_manifest(directory)
+        if manifest is None:
+            return None
+        if directory.parent != self.models_path:
+            return directory
+        model_path, scaler_path = self.artifact_paths(version)
+        sources = manifest.get("sources", {})
+        if not model_path.exists() or not scaler_path.exists():
+            return None
+        if sources.get("model") != file_fingerprint(model_path) or sources.get("scaler") != file_fingerprint(scaler_path):
+            logger.warning(f"⚠️ Arreglos desactualizados en {directory}: se usan los pickles")
+            return None
+        return directory
+
+    def load_serving(self, version: Optional[str] = None, prefer_arrays: bool = True) -> Tuple[Any, Any, str]:
+        """
+        Modelo y scaler para servir predicciones.
+
+        Usa los arreglos mapeados en memoria si están disponibles y al día;
+        si no, los pickles.
+
+        Returns:
+            Tuple[Any, Any, str]: Modelo, scaler y formato ("arrays" o "pickle")
+        """
+        directory = self.fresh_arrays_dir(version) if prefer_arrays else None
+        if directory is not None:
+            model, scaler, _ = load_arrays(directory)
+            return model, scaler, "arrays"
+
+        model_path, scaler_path = self.artifact_paths(version)
+        if not model_path.exists():
+            raise FileNotFoundError(f"Modelo no encontrado en: {model_path}")
+        if not scaler_path.exists():
+            raise FileNotFoundError(f"Scaler no encontrado en: {scaler_path}")
+        model, scaler = self.load(version)
+        return model, scaler, "pickle"
+
+    def export_arrays(self, version: Optional[str] = None) -> Path:
+        """Exporta a arreglos los pickles de una versión (por defecto la vigente)."""
+        model, scaler = self.load(version)
+        model_path, scaler_path = self.artifact_paths(version)
+        directory = self.arrays_dir(version)
+        export_arrays(model, scaler, directory, sources={"model": model_path, "scaler": scaler_path})
+        return directory
+
+    def load_seed_set(self, version: Optional[str] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Vectores de soporte sin escalar (X, y) de una versión, si se guardaron."""
+        version = version or self.current_version()
+        if not version:
+            return None
+        path = self.version_dir(version) / SEED_SET_FILE
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return data["X"], data["y"]
+
+    # === PUBLICACIÓN ===
+
+    def next_version(self) -> str:
+        """Siguiente número de versión (svr-0001, svr-0002, ...)."""
+        numbers = [0]
+        if self.versions_path.exists():
+            for path in self.versions_path.iterdir():
+                if path.name.startswith(VERSION_PREFIX) and path.name[len(VERSION_PREFIX):].isdigit():
+                    numbers.append(int(path.name[len(VERSION_PREFIX):]))
+        current = self.current_version() or ""
+        if current[len(VERSION_PREFIX):].isdigit():
+            numbers.append(int(current[len(VERSION_PREFIX):]))
+        return f"{VERSION_PREFIX}{max(numbers) + 1:04d}"
+
+    def publish(
+        self,
+        model: Any,
+        scaler: Any,
+        seed_X: np.ndarray,
+        seed_y: np.ndarray,
+        entry: Dict[str, Any],
+        source: str,
+        replace_entry: bool = False
+    ) -> str:
+        """
+        Publica una nueva versión y la marca como vigente.
+
+        Args:
+            model, scaler: Artefactos entrenados
+            seed_X, seed_y: Filas sin escalar y objetivo de los vectores de soporte
+            entry: Campos de `models.svr` en metadata.json (métricas, hiperparámetros...)
+            source: Origen ("retrain", "refresh", ...)
+            replace_entry: Reemplazar `models.svr` en lugar de combinarlo
+
+        Returns:
+            str: Versión publicada
+        """
+        import joblib
+        import sklearn
+
+        metadata = self.read_metadata()
+        parent = metadata.get("models", {}).get("svr", {}).get("version")
+        version = self.next_version()
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        manifest = {
+            "version": version,
+            "parent_version": parent,
+            "source": source,
+            "created_at": created_at,
+            "sklearn_version": sklearn.__version__,
+            "seed_rows": int(len(seed_y)),
+            **entry
+        }
+
+        # 1. Directorio inmutable de la versión (escrito aparte y renombrado)
+        self.versions_path.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=self.versions_path))
+        try:
+            joblib.dump(model, staging / MODEL_FILE)
+            joblib.dump(scaler, staging / SCALER_FILE)
+            np.savez_compressed(staging / SEED_SET_FILE, X=np.asarray(seed_X, dtype=np.float64),
+                                y=np.asarray(seed_y, dtype=np.float64))
+            with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            arrays = self._export_version_arrays(model, scaler, staging, staging / ARRAYS_DIR)
+            os.replace(staging, self.version_dir(version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        # 2. Pickles canónicos para los cargadores existentes (y sus arreglos)
+        for source_file, canonical in ((MODEL_FILE, CANONICAL_MODEL_FILE), (SCALER_FILE, CANONICAL_SCALER_FILE)):
+            self._atomic_copy(self.version_dir(version) / source_file, self.models_path / canonical)
+        if arrays:
+            self._export_version_arrays(model, scaler, self.models_path, self.models_path / CANONICAL_ARRAYS_DIR,
+                                        CANONICAL_MODEL_FILE, CANONICAL_SCALER_FILE)
+
+        # 3. Puntero a la versión vigente
+        models = metadata.setdefault("models", {})
+        svr_entry = {} if replace_entry else dict(models.get("svr", {}))
+        svr_entry.update(entry)
+        history = [item for item in models.get("svr", {}).get("versions", [])][-(HISTORY_SIZE - 1):]
+        history.append({
+            "version": version,
+            "source": source,
+            "created_at": created_at,
+            "mae": entry.get("performance", {}).get("mae"),
+            "r2_score": entry.get("performance", {}).get("r2_score")
+        })
+        svr_entry.update({
+            "file": CANONICAL_MODEL_FILE,
+            "scaler": CANONICAL_SCALER_FILE,
+            "version": version,
+            "artifact": f"versions/{version}",
+            "versions": history
+        })
+        models["svr"] = svr_entry
+        metadata["last_updated"] = created_at
+        self.write_metadata(metadata)
+
+        logger.info(f"📦 Modelo publicado: {version} ({source}, padre: {parent})")
+        return version
+
+    @staticmethod
+    def _export_version_arrays(
+        model: Any,
+        scaler: Any,
+        pickles_dir: Path,
+        directory: Path,
+        model_file: str = MODEL_FILE,
+        scaler_file: str = SCALER_FILE
+    ) -> bool:
+        """Exporta los arreglos junto a sus pickles; los modelos no RBF se sirven solo desde pickle."""
+        try:
+            export_arrays(model, scaler, directory,
+                          sources={"model": pickles_dir / model_file, "scaler": pickles_dir / scaler_file})
+            return True
+        except ValueError as e:
+            logger.warning(f"⚠️ Sin exportación a arreglos: {e}")
+            return False
+
+    def write_metadata(self, metadata: Dict[str, Any]) -> None:
+        """Reemplaza metadata.json atómicamente."""
+        self._atomic_write_text(self.metadata_path, json.dumps(metadata, indent=2, ensure_ascii=False))
+
+    @staticmethod
+    def _atomic_copy(source: Path, destination: Path) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=f".{destination.name}.", dir=destination.parent)
+        os.close(fd)
+        try:
+            shutil.copyfile(source, tmp)
+            os.replace(tmp, destination)
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def _atomic_write_text(destination: Path, text: str) -> None:
+        fd, tmp = tempfile.mkstemp(prefix=f".{destination.name}.", dir=destination.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, destination)
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+# Instancia global del registro (Singleton pattern)
+model_registry = ModelRegistry()
@@ -18,9 +18,14 @@ Fecha: 2025
 
 import os
 import logging
-from typing import Dict, Optional, List
-from openai import OpenAI
-from ..core.config import settings
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterator, Optional, List, Tuple
+from core.config import settings
+from core import metrics
+from core.circuit_breaker import CircuitBreaker
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -34,9 +39,32 @@ class OpenAIService:
     """
     
     def __init__(self):
-        """Inicializa el cliente de OpenAI."""
-        self.client = None
-        self._initialize_client()
+        """Inicializa el servicio; el cliente de OpenAI se crea en el primer uso."""
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._enabled = self._api_key_configured()
+        
+        # Protección de latencia: breaker + presupuesto por petición
+        self.breaker = CircuitBreaker(
+            name="openai",
+            failure_rate_threshold=settings.BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.BREAKER_SLOW_CALL_SECONDS,
+            window_size=settings.BREAKER_WINDOW_SIZE,
+            min_calls=settings.BREAKER_MIN_CALLS,
+            open_seconds=settings.BREAKER_OPEN_SECONDS,
+            half_open_probes=settings.BREAKER_HALF_OPEN_PROBES,
+            half_open_seconds=settings.BREAKER_HALF_OPEN_SECONDS
+        )
+        self.latency_budget = settings.OPENAI_LATENCY_BUDGET_SECONDS
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.OPENAI_MAX_CONCURRENCY,
+            thread_name_prefix="openai"
+        )
+        metrics.track_executor("openai", self._executor)
+        
+        # Cache de respuestas (LRU con TTL) para reutilizar respuestas tardías
+        self._cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         # Configuración de prompts (aplicando DRY)
         self.base_prompt = """
@@ -52,25 +80,44 @@ class OpenAIService:
         - Máximo 150 palabras
         """
     
-    def _initialize_client(self) -> None:
+    @staticmethod
+    def _api_key_configured() -> bool:
+        api_key = settings.OPENAI_API_KEY
+        if not api_key or api_key == "your-openai-api-key-here":
+            logger.warning("OpenAI API key no configurada. Servicio de IA deshabilitado.")
+            return False
+        return True
+    
+    @property
+    def client(self) -> Any:
         """
-        Inicializa el cliente de OpenAI de manera segura.
+        Cliente de OpenAI, creado en el primer uso.
         
-        Raises:
-            ValueError: Si la API key no está configurada
+        El SDK (~0.3 s de importación) se importa recién aquí y solo si hay
+        API key: sin clave, el arranque del API no lo paga.
         """
+        if self._client is None and self._enabled:
+            with self._client_lock:
+                if self._client is None and self._enabled:
+                    self._initialize_client()
+        return self._client
+    
+    def _initialize_client(self) -> None:
+        """Inicializa el cliente de OpenAI de manera segura (si falla, el servicio queda deshabilitado)."""
         try:
-            api_key = settings.OPENAI_API_KEY
-            if not api_key or api_key == "your-openai-api-key-here":
-                logger.warning("OpenAI API key no configurada. Servicio de IA deshabilitado.")
-                return
-                
-            self.client = OpenAI(api_key=api_key)
+            from openai import OpenAI
+            
+            self._client = OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                max_retries=0  # Los reintentos los gobierna el circuit breaker
+            )
             logger.info("Cliente OpenAI inicializado correctamente")
             
         except Exception as e:
             logger.error(f"Error inicializando cliente OpenAI: {e}")
-            self.client = None
+            self._client = None
+            self._enabled = False
     
     def is_available(self) -> bool:
         """
@@ -90,6 +137,9 @@ class OpenAIService:
         """
         Genera recomendaciones académicas personalizadas.
         
+        Si el circuit breaker está abierto o la llamada excede el presupuesto
+        de latencia, devuelve el fallback de inmediato.
+        
         Args:
             prediction_score: Puntuación predicha (0-20)
             student_data: Datos del estudiante
@@ -108,44 +158,274 @@ class OpenAIService:
                 "source": "fallback"
             }
         
+        # Construir contexto del estudiante (aplicando KISS)
+        context = self._build_student_context(prediction_score, student_data)
+        
+        # Generar prompt específico
+        prompt = self._build_prompt(context, prediction_score)
+        
+        # Reutilizar respuesta previa (incluye respuestas que llegaron tarde)
+        cached = self._cache_get(prompt)
+        if cached is not None:
+            logger.info(f"Recomendaciones servidas desde cache para score: {prediction_score}")
+            return {**cached, "confidence": prediction_confidence, "cached": True}
+        
+        # Circuito abierto: fallback inmediato sin contactar al proveedor
+        if not self.breaker.allow_request():
+            logger.info("Circuit breaker abierto, usando recomendaciones de respaldo")
+            metrics.fallback_activations.inc(component="openai", reason="breaker_open")
+            return self._get_fallback_recommendations(prediction_score)
+        
+        started = time.monotonic()
+        future = self._executor.submit(self._request_completion, prompt)
+        
         try:
-            # Construir contexto del estudiante (aplicando KISS)
-            context = self._build_student_context(prediction_score, student_data)
-            
-            # Generar prompt específico
-            prompt = self._build_prompt(context, prediction_score)
+            recommendations_text, tokens_used = future.result(timeout=self.latency_budget)
+        except FutureTimeoutError:
+            # Presupuesto agotado: responder con fallback y cachear la respuesta cuando llegue
+            logger.warning(f"OpenAI excedió el presupuesto de {self.latency_budget}s, usando fallback")
+            self.breaker.record_failure(time.monotonic() - started)
+            metrics.llm_request_duration.observe(time.monotonic() - started, mode="blocking", outcome="timeout")
+            metrics.fallback_activations.inc(component="openai", reason="latency_budget")
+            future.add_done_callback(
+                lambda done: self._store_late_response(done, prompt, prediction_score)
+            )
+            return self._get_fallback_recommendations(prediction_score)
+        except Exception as e:
+            self.breaker.record_failure(time.monotonic() - started)
+            metrics.llm_request_duration.observe(time.monotonic() - started, mode="blocking", outcome="error")
+            metrics.fallback_activations.inc(component="openai", reason="error")
+            logger.error(f"Error generando recomendaciones: {e}")
+            return self._get_fallback_recommendations(prediction_score)
+        
+        self.breaker.record_success(time.monotonic() - started)
+        metrics.llm_request_duration.observe(time.monotonic() - started, mode="blocking", outcome="success")
+        result = self._build_ai_result(recommendations_text, prediction_score, tokens_used)
+        self._cache_put(prompt, result)
+        
+        logger.info(f"Recomendaciones generadas para score: {prediction_score}")
+        
+        return {**result, "confidence": prediction_confidence}
+    
+    def stream_recommendations(
+        self,
+        prediction_score: float,
+        student_data: Dict
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Genera recomendaciones en streaming, token a token.
+        
+        Emite eventos `(tipo, datos)`:
+        - ("token", {"text"}): fragmento recibido de OpenAI
+        - ("recommendation", {"index", "text"}): recomendación con su línea completa
+        - ("done", {"source", "level", "tokens_used"}): fin del stream
+        
+        Respeta el circuit breaker y el cache; ante cualquier fallo emite
+        las recomendaciones de respaldo que aún no se hayan enviado.
+        
+        Args:
+            prediction_score: Puntuación predicha (0-20)
+            student_data: Datos del estudiante
             
-            # Llamada a OpenAI
-            response = self.client.chat.completions.create(
+        Yields:
+            Tuple[str, Dict]: Evento y datos asociados
+        """
+        level = self._determine_urgency_level(prediction_score)
+        
+        if not self.is_available():
+            yield from self._stream_result(self._get_fallback_recommendations(prediction_score))
+            return
+        
+        context = self._build_student_context(prediction_score, student_data)
+        prompt = self._build_prompt(context, prediction_score)
+        
+        cached = self._cache_get(prompt)
+        if cached is not None:
+            yield from self._stream_result({**cached, "cached": True})
+            return
+        
+        if not self.breaker.allow_request():
+            metrics.fallback_activations.inc(component="openai", reason="breaker_open")
+            yield from self._stream_result(self._get_fallback_recommendations(prediction_score))
+            return
+        
+        started = time.monotonic()
+        first_token = False
+        settled = False  # El breaker ya recibió el veredicto de esta llamada
+        recommendations: List[str] = []
+        chunks: List[str] = []
+        pending_line = ""
+        
+        try:
+            stream = self.client.chat.completions.create(
                 model=settings.OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": self.base_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=settings.OPENAI_MAX_TOKENS,
-                temperature=settings.OPENAI_TEMPERATURE
+                temperature=settings.OPENAI_TEMPERATURE,
+                stream=True
             )
             
-            # Procesar respuesta
-            recommendations_text = response.choices[0].message.content.strip()
-            recommendations = self._parse_recommendations(recommendations_text)
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content or ""
+                if not text:
+                    continue
+                
+                if not first_token:
+                    # Para el breaker, la latencia de un stream es el tiempo al primer token
+                    first_token = True
+                    settled = True
+                    self.breaker.record_success(time.monotonic() - started)
+                    metrics.llm_request_duration.observe(time.monotonic() - started, mode="stream", outcome="first_token")
+                
+                chunks.append(text)
+                yield "token", {"text": text}
+                
+                # Emitir cada recomendación en cuanto su línea esté completa
+                pending_line += text
+                *complete_lines, pending_line = pending_line.split('\n')
+                for line in complete_lines:
+                    yield from self._emit_line(line, recommendations)
             
-            # Determinar nivel de urgencia
-            level = self._determine_urgency_level(prediction_score)
+            if not first_token:
+                # Respuesta vacía (p. ej. filtrada por contenido): cuenta como fallo
+                raise ValueError("El stream terminó sin contenido")
+            yield from self._emit_line(pending_line, recommendations)
             
-            logger.info(f"Recomendaciones generadas para score: {prediction_score}")
+        except Exception as e:
+            logger.error(f"Error en streaming de recomendaciones: {e}")
+            metrics.llm_request_duration.observe(time.monotonic() - started, mode="stream", outcome="error")
+            metrics.fallback_activations.inc(component="openai", reason="stream_error")
+            if not settled:
+                settled = True
+                self.breaker.record_failure(time.monotonic() - started)
             
-            return {
+            # Completar con recomendaciones de respaldo no enviadas
+            fallback = self._get_fallback_recommendations(prediction_score)
+            for text in fallback["recommendations"][:5 - len(recommendations)]:
+                recommendations.append(text)
+                yield "recommendation", {"index": len(recommendations) - 1, "text": text}
+            yield "done", {"source": "fallback", "level": level, "tokens_used": None}
+            return
+        finally:
+            # Salida sin veredicto (BaseException, generador cerrado): se libera el cupo
+            if not settled:
+                self.breaker.release_probe()
+        
+        metrics.llm_request_duration.observe(time.monotonic() - started, mode="stream", outcome="success")
+        if recommendations:
+            self._cache_put(prompt, {
                 "recommendations": recommendations,
                 "level": level,
                 "source": "openai",
-                "confidence": prediction_confidence,
-                "tokens_used": response.usage.total_tokens if response.usage else None
-            }
+                "tokens_used": None
+            })
+        else:
+            yield from self._emit_line("Continúa con tu plan de estudios actual.", recommendations)
+        
+        yield "done", {"source": "openai", "level": level, "tokens_used": None}
+    
+    def _emit_line(self, line: str, recommendations: List[str]) -> Iterator[Tuple[str, Dict]]:
+        """Emite la línea como recomendación si es válida (máximo 5)."""
+        clean_line = self._parse_recommendation_line(line)
+        if clean_line and len(recommendations) < 5:
+            recommendations.append(clean_line)
+            yield "recommendation", {"index": len(recommendations) - 1, "text": clean_line}
+    
+    def _stream_result(self, result: Dict) -> Iterator[Tuple[str, Dict]]:
+        """Emite un resultado ya completo (cache o fallback) como eventos."""
+        for index, text in enumerate(result["recommendations"]):
+            yield "recommendation", {"index": index, "text": text}
+        yield "done", {
+            "source": result["source"],
+            "level": result["level"],
+            "tokens_used": result.get("tokens_used")
+        }
+    
+    def get_breaker_status(self) -> Dict:
+        """
+        Estado del circuit breaker y del cache de respuestas.
+        
+        Returns:
+            Dict: Estado para el endpoint de salud
+        """
+        with self._cache_lock:
+            cache_entries = len(self._cache)
+        
+        return {
+            **self.breaker.snapshot(),
+            "latency_budget_seconds": self.latency_budget,
+            "cache_entries": cache_entries
+        }
+    
+    def _request_completion(self, prompt: str) -> Tuple[str, Optional[int]]:
+        """
+        Realiza la llamada a OpenAI (se ejecuta en el pool del servicio).
+        
+        Args:
+            prompt: Prompt del usuario
             
-        except Exception as e:
-            logger.error(f"Error generando recomendaciones: {e}")
-            return self._get_fallback_recommendations(prediction_score)
+        Returns:
+            Tuple[str, Optional[int]]: Texto generado y tokens consumidos
+        """
+        response = self.client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": self.base_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=settings.OPENAI_MAX_TOKENS,
+            temperature=settings.OPENAI_TEMPERATURE
+        )
+        
+        tokens_used = response.usage.total_tokens if response.usage else None
+        return response.choices[0].message.content.strip(), tokens_used
+    
+    def _build_ai_result(self, text: str, score: float, tokens_used: Optional[int]) -> Dict:
+        """Construye el resultado a partir del texto generado por OpenAI."""
+        return {
+            "recommendations": self._parse_recommendations(text),
+            "level": self._determine_urgency_level(score),
+            "source": "openai",
+            "tokens_used": tokens_used
+        }
+    
+    def _store_late_response(self, future, prompt: str, score: float) -> None:
+        """Cachea una respuesta que llegó después del presupuesto de latencia."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        
+        text, tokens_used = future.result()
+        self._cache_put(prompt, self._build_ai_result(text, score, tokens_used))
+        logger.info("Respuesta tardía de OpenAI cacheada para próximas peticiones")
+    
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Obtiene una entrada vigente del cache LRU."""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] > settings.OPENAI_CACHE_TTL_SECONDS:
+                del self._cache[key]
+                entry = None
+            
+            if entry is None:
+                metrics.cache_requests.inc(cache="openai", result="miss")
+                return None
+            
+            self._cache.move_to_end(key)
+            metrics.cache_requests.inc(cache="openai", result="hit")
+            return entry[1]
+    
+    def _cache_put(self, key: str, value: Dict) -> None:
+        """Guarda una entrada en el cache LRU respetando su tamaño máximo."""
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > settings.OPENAI_CACHE_SIZE:
+                self._cache.popitem(last=False)
     
     def _build_student_context(self, score: float, data: Dict) -> str:
         """
@@ -222,24 +502,36 @@ class OpenAIService:
             List[str]: Lista de recomendaciones
         """
         # Dividir por líneas y limpiar
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
-        # Filtrar líneas que parecen recomendaciones
         recommendations = []
-        for line in lines:
-            # Remover numeración y bullets
-            clean_line = line
-            for prefix in ['1.', '2.', '3.', '4.', '5.', '-', '•', '*']:
-                if clean_line.startswith(prefix):
-                    clean_line = clean_line[len(prefix):].strip()
-                    break
-            
-            if len(clean_line) > 10:  # Filtrar líneas muy cortas
+        for line in text.split('\n'):
+            clean_line = self._parse_recommendation_line(line)
+            if clean_line:
                 recommendations.append(clean_line)
         
         # Asegurar máximo 5 recomendaciones
         return recommendations[:5] if recommendations else ["Continúa con tu plan de estudios actual."]
     
+    def _parse_recommendation_line(self, line: str) -> Optional[str]:
+        """
+        Limpia una línea de respuesta y determina si es una recomendación.
+        
+        Args:
+            line: Línea de texto de OpenAI
+            
+        Returns:
+            Optional[str]: Recomendación limpia o None si no aplica
+        """
+        clean_line = line.strip()
+        
+        # Remover numeración y bullets
+        for prefix in ['1.', '2.', '3.', '4.', '5.', '-', '•', '*']:
+            if clean_line.startswith(prefix):
+                clean_line = clean_line[len(prefix):].strip()
+                break
+        
+        # Filtrar líneas muy cortas
+        return clean_line if len(clean_line) > 10 else None
+    
     def _determine_urgency_level(self, score: float) -> str:
         """
         Determina el nivel de urgencia basado en la puntuación.
@@ -0,0 +1,203 @@
+"""
+Post-procesamiento Vectorizado de Predicciones
+=============================================
+
+Reglas de negocio que corrigen predicciones irreales, expresadas como
+operaciones NumPy sobre lotes completos. Las usan tanto la predicción
+individual como la de datasets CSV:
+
+1. Sanitización: asistencia crítica (< 10%) limita el historial previo y
+   fuerza motivación baja; 6+ factores negativos marcan ajuste de riesgo.
+2. Ajuste de riesgo: penalización del 30% para perfiles de riesgo.
+3. Bonus de excelencia: +15% para perfiles excepcionales (hasta 100).
+4. Tope de casos extremos: máximo 35/100 con asistencia < 10% o
+   historial < 20.
+
+Acepta tanto los campos de la API (`attendance`, `'Low'`) como las columnas
+del CSV procesado (`Attendance`, códigos numéricos). Las etiquetas y sus
+códigos salen del vocabulario del pipeline de features, el mismo que usó
+el entrenamiento.
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.hot_logging import HotPathLogger
+from services.feature_pipeline import feature_pipeline
+
+logger = logging.getLogger(__name__)
+hot_log = HotPathLogger(logger)
+
+# Campo lógico -> (nombre en la API, nombre en el CSV)
+FIELD_NAMES = {
+    'attendance': ('attendance', 'Attendance'),
+    'previous_scores': ('previous_scores', 'Previous_Scores'),
+    'study_hours': ('study_hours', 'Hours_Studied'),
+    'tutoring_sessions': ('tutoring_sessions', 'Tutoring_Sessions'),
+    'parental_involvement': ('parental_involvement', 'Parental_Involvement'),
+    'access_to_resources': ('access_to_resources', 'Access_to_Resources'),
+    'motivation_level': ('motivation_level', 'Motivation_Level'),
+    'learning_disabilities': ('learning_disabilities', 'Learning_Disabilities'),
+    'peer_influence': ('peer_influence', 'Peer_Influence'),
+    'parental_education_level': ('parental_education_level', 'Parental_Education_Level'),
+}
+
+NUMERIC_DEFAULTS = {
+    'attendance': 85.0,
+    'previous_scores': 75.0,
+    'study_hours': 10.0,
+    'tutoring_sessions': 1.0,
+}
+
+# Parámetros de negocio
+CRITICAL_ATTENDANCE = 10
+CRITICAL_PREVIOUS_SCORES_CAP = 30
+RISK_FACTORS_THRESHOLD = 6
+RISK_PENALTY = 0.3           # 30% de penalización
+EXCELLENCE_BONUS = 15        # Bonus del 15% para casos excepcionales
+EXTREME_CASE_CAP = 35        # Máximo 35/100 para casos críticos
+
+def sanitize_students(frame: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    Valida y sanitiza los datos de un lote de estudiantes.
+
+    Args:
+        frame: Datos de los estudiantes (una fila por estudiante)
+
+    Returns:
+        Tuple: DataFrame sanitizado (el mismo objeto si no hubo cambios) y
+        máscara de estudiantes que requieren ajuste de riesgo
+    """
+    attendance = _numeric(frame, 'attendance')
+
+    # REGLA: Asistencia muy baja = rendimiento muy bajo
+    critical = attendance < CRITICAL_ATTENDANCE
+    if critical.any():
+        frame = frame.copy()
+        previous_col = _column_name(frame, 'previous_scores', create=True)
+        motivation_col = _column_name(frame, 'motivation_level', create=True)
+
+        previous = _numeric(frame, 'previous_scores')
+        frame[previous_col] = np.where(critical, np.minimum(previous, CRITICAL_PREVIOUS_SCORES_CAP), previous)
+
+        low_value = (
+            _label_codes('motivation_level', 'Low')[1][0]
+            if pd.api.types.is_numeric_dtype(frame[motivation_col]) else 'Low'
+        )
+        frame[motivation_col] = frame[motivation_col].where(~critical, low_value)
+
+        hot_log.event("critical_attendance", logging.WARNING,
+                      "Asistencia crítica detectada en %d estudiantes", int(critical.sum()))
+
+    # REGLA: Múltiples factores negativos = resultado realista
+    previous = _numeric(frame, 'previous_scores')
+    negative_factors = (
+        np.where(attendance < 50, 2, 0)
+        + np.where(previous < 50, 2, 0)
+        + np.where(_numeric(frame, 'study_hours') < 3, 1, 0)
+        + _matches(frame, 'parental_involvement', 'Low')
+        + _matches(frame, 'access_to_resources', 'Low')
+        + _matches(frame, 'motivation_level', 'Low')
+        + _matches(frame, 'learning_disabilities', 'Yes')
+        + _matches(frame, 'peer_influence', 'Negative')
+    )
+    risk_adjustment = negative_factors >= RISK_FACTORS_THRESHOLD
+
+    if risk_adjustment.any():
+        hot_log.event("risk_adjustment", logging.WARNING,
+                      "Múltiples factores negativos detectados en %d estudiantes", int(risk_adjustment.sum()))
+
+    return frame, risk_adjustment
+
+def adjust_predictions(
+    predictions: np.ndarray,
+    frame: pd.DataFrame,
+    risk_adjustment: np.ndarray
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Aplica ajuste de riesgo, bonus de excelencia y tope de casos extremos.
+
+    Args:
+        predictions: Predicciones en escala 0-100
+        frame: Datos sanitizados (salida de `sanitize_students`)
+        risk_adjustment: Máscara de ajuste de riesgo (salida de `sanitize_students`)
+
+    Returns:
+        Tuple: Predicciones corregidas y cantidad de estudiantes por corrección
+    """
+    predictions = np.asarray(predictions, dtype=float)
+    attendance = _numeric(frame, 'attendance')
+    previous = _numeric(frame, 'previous_scores')
+
+    # POTENCIADOR PARA CASOS EXCEPCIONALES (para alcanzar AD)
+    excellence = (
+        (attendance >= 98)
+        & (previous >= 95)
+        & (_numeric(frame, 'study_hours') >= 12)
+        & (_numeric(frame, 'tutoring_sessions') >= 4)
+        & _matches(frame, 'parental_education_level', 'Postgraduate')
+    )
+
+    # CORRECCIÓN REALISTA para factores de riesgo extremos
+    adjusted = np.where(risk_adjustment, predictions * (1 - RISK_PENALTY), predictions)
+    adjusted = np.where(excellence, np.minimum(adjusted * (1 + EXCELLENCE_BONUS / 100), 100), adjusted)
+
+    # Validación final: casos extremos
+    extreme = (attendance < CRITICAL_ATTENDANCE) | (previous < 20)
+    adjusted = np.where(extreme, np.minimum(adjusted, EXTREME_CASE_CAP), adjusted)
+
+    counts = {
+        "risk_adjusted": int(risk_adjustment.sum()),
+        "excellence_bonus": int(excellence.sum()),
+        "extreme_capped": int(extreme.sum())
+    }
+    if any(counts.values()):
+        hot_log.event("predictions_adjusted", logging.INFO, "Correcciones aplicadas: %s", counts)
+
+    return adjusted, counts
+
+def _column_name(frame: pd.DataFrame, field: str, create: bool = False) -> Optional[str]:
+    """Nombre de la columna presente para un campo lógico (API o CSV)."""
+    api_name, csv_name = FIELD_NAMES[field]
+    if api_name in frame:
+        return api_name
+    if csv_name in frame:
+        return csv_name
+    if create:
+        frame[api_name] = NUMERIC_DEFAULTS.get(field, np.nan)
+        return api_name
+    return None
+
+def _numeric(frame: pd.DataFrame, field: str) -> np.ndarray:
+    """Valores numéricos de un campo (valor por defecto si falta)."""
+    column = _column_name(frame, field)
+    default = NUMERIC_DEFAULTS[field]
+    if column is None:
+        return np.full(len(frame), default)
+    values = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=float)
+    return np.where(np.isnan(values), default, values)
+
+@lru_cache(maxsize=None)
+def _label_codes(field: str, label: str) -> Tuple[Tuple[str, ...], Tuple[int, ...]]:
+    """Etiquetas sinónimas y código numérico de una etiqueta según el pipeline."""
+    feature = FIELD_NAMES[field][1]
+    return feature_pipeline.labels_for(feature, label), (feature_pipeline.code(feature, label),)
+
+def _matches(frame: pd.DataFrame, field: str, label: str) -> np.ndarray:
+    """Máscara de filas cuyo valor coincide con la etiqueta, un sinónimo o su código numérico."""
+    column = _column_name(frame, field)
+    if column is None:
+        return np.zeros(len(frame), dtype=bool)
+
+    labels, codes = _label_codes(field, label)
+    values = frame[column]
+    if pd.api.types.is_numeric_dtype(values):
+        return np.isin(values.to_numpy(), codes)
+    return values.isin(labels).to_numpy()
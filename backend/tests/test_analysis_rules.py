@@ -0,0 +1,171 @@
+"""
+Paridad del motor de reglas vectorizado con los análisis por estudiante
+originales (cadenas de `if` de routes/recommendations.py y del endpoint
+de respaldo de main.py), conservados aquí como referencia.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.analysis_rules import dataset_rule_engine, student_rule_engine
+
+def scalar_student_analysis(student_data, prediction_score):
+    """`_analyze_risk_factors` / `_analyze_strengths` / `_identify_improvement_areas` originales."""
+    risk_factors = []
+    if student_data.get('hours_studied', 0) < 10:
+        risk_factors.append("Horas de estudio insuficientes (menos de 10 por semana)")
+    if student_data.get('sleep_hours', 8) < 6:
+        risk_factors.append("Horas de sueño insuficientes (menos de 6 horas)")
+    if student_data.get('previous_scores', 15) < 11:
+        risk_factors.append("Historial académico previo bajo")
+    if student_data.get('tutoring_sessions', 0) == 0 and prediction_score < 14:
+        risk_factors.append("Falta de apoyo académico adicional")
+    if student_data.get('extracurricular_activities', 0) > 3:
+        risk_factors.append("Posible sobrecarga de actividades extracurriculares")
+
+    strengths = []
+    if student_data.get('hours_studied', 0) >= 15:
+        strengths.append("Excelente dedicación al estudio")
+    if student_data.get('previous_scores', 0) >= 16:
+        strengths.append("Historial académico destacado")
+    if student_data.get('tutoring_sessions', 0) > 2:
+        strengths.append("Búsqueda proactiva de apoyo académico")
+    if student_data.get('sleep_hours', 8) >= 7:
+        strengths.append("Buenos hábitos de descanso")
+    if prediction_score >= 14:
+        strengths.append("Predicción favorable de rendimiento")
+
+    improvement_areas = []
+    if student_data.get('hours_studied', 0) < 15:
+        improvement_areas.append("Incrementar tiempo dedicado al estudio")
+    if student_data.get('tutoring_sessions', 0) < 2 and prediction_score < 16:
+        improvement_areas.append("Considerar sesiones de tutoría adicionales")
+    if student_data.get('sleep_hours', 8) < 7:
+        improvement_areas.append("Mejorar hábitos de sueño y descanso")
+    if student_data.get('extracurricular_activities', 0) == 0:
+        improvement_areas.append("Incorporar actividades extracurriculares balanceadas")
+    if prediction_score < 14:
+        improvement_areas.append("Reforzar estrategias de estudio y preparación")
+
+    return {
+        "risk_factors": risk_factors[:5],
+        "strengths": strengths[:5],
+        "improvement_areas": improvement_areas[:5]
+    }
+
+def scalar_dataset_analysis(data, score):
+    """Análisis básico original del endpoint de respaldo de main.py (columnas del CSV)."""
+    hours_studied = data.get('Hours_Studied', 0)
+    previous_scores = data.get('Previous_Scores', 0)
+    tutoring = data.get('Tutoring_Sessions', 0)
+
+    risk_factors = []
+    strengths = []
+    improvement_areas = []
+
+    if hours_studied < 10:
+        risk_factors.append("Horas de estudio insuficientes")
+        improvement_areas.append("Incrementar tiempo de estudio")
+    else:
+        strengths.append("Dedicación adecuada al estudio")
+
+    if previous_scores < 60:
+        risk_factors.append("Historial académico bajo")
+    elif previous_scores >= 80:
+        strengths.append("Excelente historial académico")
+
+    if tutoring == 0 and score < 14:
+        improvement_areas.append("Considerar apoyo académico")
+    elif tutoring > 0:
+        strengths.append("Búsqueda de apoyo académico")
+
+    return {
+        "risk_factors": risk_factors if risk_factors else ["Ningún factor de riesgo identificado"],
+        "strengths": strengths if strengths else ["Análisis en progreso"],
+        "improvement_areas": improvement_areas if improvement_areas else ["Mantener el rendimiento actual"]
+    }
+
+def random_form_rows(rng, n_rows):
+    """Datos del formulario con valores enteros alrededor de cada umbral y campos ausentes."""
+    rows = []
+    for _ in range(n_rows):
+        row = {
+            'hours_studied': int(rng.integers(0, 25)),
+            'sleep_hours': int(rng.integers(3, 11)),
+            'previous_scores': int(rng.integers(0, 21)),
+            'tutoring_sessions': int(rng.integers(0, 5)),
+            'extracurricular_activities': int(rng.integers(0, 6))
+        }
+        for field in list(row):
+            if rng.random() < 0.1:
+                del row[field]
+        rows.append(row)
+    return rows
+
+def random_dataset_rows(rng, n_rows):
+    return [
+        {
+            'Hours_Studied': int(rng.integers(0, 30)),
+            'Previous_Scores': int(rng.integers(40, 101)),
+            'Tutoring_Sessions': int(rng.integers(0, 4)),
+            'Attendance': int(rng.integers(60, 101))
+        }
+        for _ in range(n_rows)
+    ]
+
+def test_student_rules_match_if_chains():
+    rng = np.random.default_rng(28)
+    rows = random_form_rows(rng, 3_000)
+    scores = rng.choice([13.99, 14.0, 15.99, 16.0, 10.0, 18.5], size=len(rows))
+    for row, score in zip(rows, scores):
+        assert student_rule_engine.analyze_one(row, score) == scalar_student_analysis(row, score)
+
+def test_dataset_rules_match_if_chains():
+    rng = np.random.default_rng(128)
+    rows = random_dataset_rows(rng, 5_000)
+    scores = rng.uniform(8, 20, size=len(rows))
+    scores[::7] = 14.0
+
+    analyses, counts = dataset_rule_engine.analyze(pd.DataFrame(rows), scores)
+    expected = [scalar_dataset_analysis(row, score) for row, score in zip(rows, scores)]
+    assert analyses == expected
+
+    # Un estudiante a la vez (endpoint de respaldo) da lo mismo que el lote
+    for row, score, analysis in zip(rows[:300], scores[:300], expected[:300]):
+        assert dataset_rule_engine.analyze_one(row, score) == analysis
+
+    assert counts["insufficient_study_hours"] == sum(row['Hours_Studied'] < 10 for row in rows)
+    assert counts["seeks_support"] == sum(row['Tutoring_Sessions'] > 0 for row in rows)
+
+@pytest.mark.parametrize("row, score", [
+    ({'hours_studied': 10, 'sleep_hours': 6, 'previous_scores': 11, 'tutoring_sessions': 0,
+      'extracurricular_activities': 3}, 14.0),
+    ({'hours_studied': 9, 'sleep_hours': 5, 'previous_scores': 10, 'tutoring_sessions': 0,
+      'extracurricular_activities': 4}, 13.9),
+    ({'hours_studied': 15, 'sleep_hours': 7, 'previous_scores': 16, 'tutoring_sessions': 3,
+      'extracurricular_activities': 0}, 16.0),
+    ({}, 12.0),  # Todo por defecto
+])
+def test_student_boundary_rows(row, score):
+    assert student_rule_engine.analyze_one(row, score) == scalar_student_analysis(row, score)
+
+def test_non_numeric_value_fires_no_rule():
+    # La versión escalar fallaba al comparar un string; el motor solo ignora el campo
+    analysis = student_rule_engine.analyze_one({'hours_studied': 'muchas'}, 15.0)
+    assert not any("estudio" in message for messages in analysis.values() for message in messages)
+
+@pytest.mark.parametrize("row, score", [
+    ({'Hours_Studied': 10, 'Previous_Scores': 60, 'Tutoring_Sessions': 0}, 14.0),
+    ({'Hours_Studied': 9, 'Previous_Scores': 59, 'Tutoring_Sessions': 0}, 13.9),
+    ({'Hours_Studied': 10, 'Previous_Scores': 80, 'Tutoring_Sessions': 1}, 10.0),
+    ({'Hours_Studied': 10, 'Previous_Scores': 79, 'Tutoring_Sessions': 0}, 15.0),  # Sin riesgo ni mejora
+    ({}, 12.0),
+])
+def test_dataset_boundary_rows(row, score):
+    assert dataset_rule_engine.analyze_one(row, score) == scalar_dataset_analysis(row, score)
+
+def test_empty_dataset():
+    analyses, counts = dataset_rule_engine.analyze(pd.DataFrame(columns=['Hours_Studied']), [])
+    assert analyses == []
+    assert set(counts.values()) == {0}
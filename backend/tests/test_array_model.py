@@ -0,0 +1,46 @@
+"""
+Exportación del modelo a arreglos NumPy: reproduce scaler + SVR en la
+escala original y rechaza scalers que no sean un StandardScaler ajustado.
+"""
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.svm import SVR
+
+from services.array_model import export_arrays, load_arrays
+
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(44)
+    X = rng.normal(loc=50, scale=15, size=(300, 5))
+    y = X @ rng.uniform(0, 0.3, size=5) + rng.normal(size=300)
+    return X, y
+
+def fit(scaler, X, y):
+    model = SVR(kernel="rbf", C=10, gamma="scale").fit(scaler.fit_transform(X), y)
+    return model, scaler
+
+def test_exported_arrays_reproduce_scaler_and_model(training_data, tmp_path):
+    X, y = training_data
+    model, scaler = fit(StandardScaler(), X, y)
+    manifest = export_arrays(model, scaler, tmp_path / "arrays")
+
+    array_model, array_scaler, loaded = load_arrays(tmp_path / "arrays")
+    assert loaded == manifest
+    np.testing.assert_allclose(array_scaler.transform(X), scaler.transform(X), atol=1e-9)
+    np.testing.assert_allclose(array_model.predict(array_scaler.transform(X)),
+                               model.predict(scaler.transform(X)), atol=1e-6)
+
+def test_min_max_scaler_is_rejected(training_data, tmp_path):
+    X, y = training_data
+    model, scaler = fit(MinMaxScaler(), X, y)
+    with pytest.raises(ValueError, match="StandardScaler"):
+        export_arrays(model, scaler, tmp_path / "arrays")
+    assert not (tmp_path / "arrays").exists()
+
+def test_unfitted_scaler_is_rejected(training_data, tmp_path):
+    X, y = training_data
+    model, _ = fit(StandardScaler(), X, y)
+    with pytest.raises(ValueError, match="StandardScaler"):
+        export_arrays(model, StandardScaler(), tmp_path / "arrays")
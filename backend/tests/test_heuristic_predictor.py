@@ -0,0 +1,136 @@
+"""
+Paridad del predictor heurístico vectorizado con la versión escalar
+original (`OptimizedSVRPredictor._predict_basic`), conservada aquí como
+referencia: `predict_basic_batch` debe coincidir fila a fila.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.heuristic_predictor import predict_basic_batch
+
+LABELS = ['Low', 'Medium', 'High', 'Poor', 'Average', 'Good', 'Excellent',
+          'Negative', 'Neutral', 'Positive', 'No', 'Yes', 'Unknown']
+
+def scalar_predict_basic(student_data):
+    """Versión escalar original (sin logging)."""
+    try:
+        attendance = student_data.get('attendance', 85)
+        previous_scores = student_data.get('previous_scores', 75)
+        study_hours = student_data.get('study_hours', 10)
+
+        if attendance < 20:
+            return max(10, min(30, previous_scores * 0.4))
+        if previous_scores < 30:
+            return max(15, min(40, previous_scores * 0.6))
+        if study_hours < 2:
+            base_score = (attendance + previous_scores) / 2
+            return max(20, min(base_score * 0.7, 45))
+
+        weights = {
+            'previous_scores': 0.35,
+            'attendance': 0.25,
+            'study_hours': 0.15,
+            'motivation_level': 0.10,
+            'parental_involvement': 0.08,
+            'access_to_resources': 0.07
+        }
+        mapping = {
+            'Low': 20, 'Medium': 60, 'High': 90,
+            'Poor': 20, 'Average': 50, 'Good': 80, 'Excellent': 95,
+            'Negative': 15, 'Neutral': 50, 'Positive': 85,
+            'No': 30, 'Yes': 70
+        }
+
+        score = 0
+        total_weight = 0
+        for feature, weight in weights.items():
+            if feature in student_data:
+                value = student_data[feature]
+                if feature in ('previous_scores', 'attendance'):
+                    normalized = min(float(value), 100)
+                elif feature == 'study_hours':
+                    normalized = min(float(value) * 10, 100)
+                elif isinstance(value, str):
+                    normalized = mapping.get(value, 50)
+                else:
+                    normalized = min(float(value) * 20, 100)
+                score += normalized * weight
+                total_weight += weight
+
+        final_score = score / total_weight if total_weight > 0 else 50
+
+        negative_factors = 0
+        if student_data.get('learning_disabilities') == 'Yes': negative_factors += 1
+        if student_data.get('peer_influence') == 'Negative': negative_factors += 1
+        if student_data.get('family_income') == 'Low': negative_factors += 0.5
+        if student_data.get('distance_from_home') == 'Far': negative_factors += 0.5
+
+        if negative_factors > 0:
+            penalty = min(negative_factors * 0.1, 0.3)
+            final_score *= (1 - penalty)
+
+        return max(10, min(95, final_score))
+    except Exception:
+        return 50.0
+
+def random_students(rng, n_rows):
+    """Filas al azar que cubren las reglas críticas, etiquetas desconocidas y campos ausentes."""
+    students = []
+    for _ in range(n_rows):
+        student = {
+            'attendance': float(rng.choice([rng.uniform(0, 25), rng.uniform(20, 100)])),
+            'previous_scores': float(rng.choice([rng.uniform(0, 35), rng.uniform(30, 100)])),
+            'study_hours': float(rng.choice([rng.uniform(0, 3), rng.uniform(0, 44)])),
+            'motivation_level': str(rng.choice(LABELS)),
+            'parental_involvement': str(rng.choice(LABELS)),
+            'access_to_resources': str(rng.choice(LABELS)),
+            'learning_disabilities': str(rng.choice(['Yes', 'No'])),
+            'peer_influence': str(rng.choice(['Negative', 'Neutral', 'Positive'])),
+            'family_income': str(rng.choice(['Low', 'Medium', 'High'])),
+            'distance_from_home': str(rng.choice(['Near', 'Moderate', 'Far']))
+        }
+        # Campos ausentes: usan el valor por defecto o no suman peso
+        for feature in ('attendance', 'study_hours', 'motivation_level', 'access_to_resources', 'family_income'):
+            if rng.random() < 0.1:
+                del student[feature]
+        students.append(student)
+    return students
+
+def assert_parity(students):
+    expected = np.array([scalar_predict_basic(student) for student in students])
+    np.testing.assert_allclose(predict_basic_batch(students), expected, rtol=1e-12, atol=1e-9)
+
+def test_random_rows_match_scalar():
+    assert_parity(random_students(np.random.default_rng(42), 20_000))
+
+def test_dataframe_input_matches_records():
+    students = random_students(np.random.default_rng(7), 500)
+    np.testing.assert_array_equal(predict_basic_batch(pd.DataFrame(students)), predict_basic_batch(students))
+
+@pytest.mark.parametrize("student", [
+    {'attendance': 19.9, 'previous_scores': 90, 'study_hours': 20},   # Asistencia crítica
+    {'attendance': 20, 'previous_scores': 29.9, 'study_hours': 20},   # Historial crítico (límite de asistencia)
+    {'attendance': 90, 'previous_scores': 30, 'study_hours': 1.9},    # Horas insuficientes
+    {'attendance': 90, 'previous_scores': 30, 'study_hours': 2},      # Justo fuera de las reglas críticas
+    {'attendance': 100, 'previous_scores': 100, 'study_hours': 40},   # Tope de 95
+    {'motivation_level': 'High'},                                     # Factores críticos por defecto
+    {'previous_scores': 80, 'motivation_level': 3},                   # Categórico numérico
+    {'attendance': 90, 'previous_scores': 80, 'learning_disabilities': 'Yes', 'peer_influence': 'Negative',
+     'family_income': 'Low', 'distance_from_home': 'Far'},            # Penalización máxima (30%)
+])
+def test_boundary_rows_match_scalar(student):
+    assert_parity([student])
+
+def test_invalid_numeric_fields_use_neutral_score():
+    students = [
+        {'attendance': 90, 'previous_scores': 80, 'study_hours': 'muchas'},
+        {'attendance': 10, 'previous_scores': 80, 'study_hours': 'muchas'},  # La regla crítica responde antes
+        {'attendance': 90, 'previous_scores': 80, 'study_hours': 12}
+    ]
+    assert_parity(students)
+    assert predict_basic_batch(students)[0] == 50.0
+
+def test_empty_batch():
+    assert predict_basic_batch([]).shape == (0,)
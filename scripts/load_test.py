@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Generador de Carga HTTP para PredictScore-ML
+===========================================
+
+Lleva la API a saturación con una mezcla configurable de llamadas
+(predicción individual, dataset y recomendaciones) y reporta latencia
+p50/p95/p99/p999, throughput, tasa de error y el punto de quiebre (knee).
+
+Modos:
+- Lazo cerrado (`--concurrency`): N clientes, cada uno envía la siguiente
+  petición al recibir la respuesta anterior
+- Lazo abierto (`--rate`): llegadas Poisson a R peticiones/s; la latencia
+  se mide desde la llegada programada (evita la omisión coordinada)
+
+Con una lista de niveles (`--concurrency 1,2,4,8,16`) se recorre cada uno
+durante `--duration` segundos. El knee es el nivel que maximiza la
+"potencia" de Kleinrock (throughput / latencia media): a partir de ahí
+más carga solo agrega cola.
+
+Uso:
+    python scripts/load_test.py --concurrency 1,2,4,8,16 --duration 20 \\
+        --label "1 worker" --output carga_1w.json
+    python scripts/load_test.py --rate 5,10,20 --mix single=1
+    python scripts/load_test.py --compare carga_1w.json carga_4w.json
+
+Autor: Equipo Grupo 4
+Fecha: 2025
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SOURCE = ROOT_DIR / "backend" / "ml" / "data" / "processed" / "student_performance_transformado_numerico.csv"
+
+PERCENTILES = (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("p999", 0.999))
+
+STUDENT = {
+    "study_hours": 20, "attendance": 85, "parental_involvement": "Medium",
+    "access_to_resources": "Medium", "extracurricular_activities": "Yes",
+    "sleep_hours": 7, "previous_scores": 75, "motivation_level": "Medium",
+    "internet_access": "Yes", "tutoring_sessions": 1, "family_income": "Medium",
+    "teacher_quality": "Medium", "school_type": "Public", "peer_influence": "Neutral",
+    "physical_activity": 3, "learning_disabilities": "No",
+    "parental_education_level": "Bachelor", "distance_from_home": "Near", "gender": "Male"
+}
+
+class Workload:
+    """Mezcla de operaciones y sus payloads (generados una sola vez)."""
+
+    def __init__(self, mix: Dict[str, float], dataset_rows: int, source: Path, seed: int):
+        unknown = set(mix) - {"single", "dataset", "recommendation"}
+        if unknown:
+            raise ValueError(f"Operaciones desconocidas en --mix: {sorted(unknown)}")
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.random = random.Random(seed)
+        self.dataset_csv = self._dataset_csv(source, dataset_rows, seed) if "dataset" in self.operations else b""
+
+    def choose(self) -> str:
+        """Siguiente operación según los pesos de la mezcla."""
+        return self.random.choices(self.operations, self.weights)[0]
+
+    async def send(self, client: httpx.AsyncClient, operation: str) -> int:
+        """Envía una operación y devuelve el código HTTP."""
+        if operation == "single":
+            response = await client.post("/api/v1/predictions/predict", json=STUDENT)
+        elif operation == "dataset":
+            response = await client.post(
+                "/api/v1/predictions/predict-dataset",
+                files={"file": ("carga.csv", self.dataset_csv, "text/csv")}
+            )
+        else:
+            response = await client.post("/api/v1/recommendations/generate", json={
+                "prediction": 14.2,
+                "student_data": STUDENT,
+                "analysis": {"letter_grade": "A", "confidence": 0.85}
+            })
+        await response.aread()
+        return response.status_code
+
+    @staticmethod
+    def _dataset_csv(source: Path, rows: int, seed: int) -> bytes:
+        """CSV de `rows` filas re-muestreadas del CSV procesado (sin Exam_Score)."""
+        with open(source, "r", encoding="utf-8") as f:
+            header, *lines = [line.rstrip("\n") for line in f if line.strip()]
+
+        columns = header.split(",")
+        keep = [i for i, name in enumerate(columns) if name != "Exam_Score"]
+        rng = random.Random(seed)
+        body = []
+        for _ in range(rows):
+            values = rng.choice(lines).split(",")
+            body.append(",".join(values[i] for i in keep))
+        return ("\n".join([",".join(columns[i] for i in keep), *body]) + "\n").encode("utf-8")
+
+class LevelStats:
+    """Mediciones de un nivel de carga."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.saturated: Counter = Counter()  # Llegadas descartadas por el cliente (sin latencia)
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    def record(self, operation: str, latency: float, status: Optional[int], error: Optional[str] = None) -> None:
+        self.latencies[operation].append(latency)
+        if status is not None:
+            self.statuses[status] += 1
+        if error is not None or status is None or status >= 400:
+            self.errors[error or str(status)] += 1
+
+    def record_saturated(self, operation: str) -> None:
+        """Llegada que el cliente no pudo enviar: error sin muestra de latencia."""
+        self.saturated[operation] += 1
+        self.errors["client_saturated"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Percentiles, throughput y errores (global y por operación)."""
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        completed = len(all_latencies)
+        total = completed + sum(self.saturated.values())
+        errors = sum(self.errors.values())
+        return {
+            "requests": total,
+            "client_saturated": sum(self.saturated.values()),
+            "duration_seconds": round(self.elapsed, 3),
+            "throughput_rps": round(completed / self.elapsed, 3) if self.elapsed else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "errors": dict(self.errors),
+            "status_codes": {str(code): count for code, count in sorted(self.statuses.items())},
+            **latency_summary(all_latencies),
+            "by_operation": {
+                operation: {
+                    "requests": len(self.latencies.get(operation, [])) + self.saturated[operation],
+                    "client_saturated": self.saturated[operation],
+                    **latency_summary(self.latencies.get(operation, []))
+                }
+                for operation in sorted(set(self.latencies) | set(self.saturated))
+            }
+        }
+
+def latency_summary(latencies: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Latencias en ms: media y percentiles (rango más cercano)."""
+    if not latencies:
+        return {"mean_ms": None, **{f"{name}_ms": None for name, _ in PERCENTILES}}
+    ordered = sorted(latencies)
+    result = {"mean_ms": round(sum(ordered) / len(ordered) * 1000, 2)}
+    for name, q in PERCENTILES:
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        result[f"{name}_ms"] = round(ordered[index] * 1000, 2)
+    return result
+
+async def _timed_send(client: httpx.AsyncClient, workload: Workload, stats: LevelStats, operation: str, origin: float) -> None:
+    """Envía y registra una operación; la latencia se cuenta desde `origin`."""
+    try:
+        status = await workload.send(client, operation)
+        stats.record(operation, time.perf_counter() - origin, status)
+    except httpx.HTTPError as e:
+        stats.record(operation, time.perf_counter() - origin, None, type(e).__name__)
+
+async def run_closed_loop(client: httpx.AsyncClient, workload: Workload, concurrency: int, duration: float) -> LevelStats:
+    """`concurrency` clientes enviando en bucle durante `duration` segundos."""
+    stats = LevelStats()
+    deadline = stats.started_at + duration
+
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            await _timed_send(client, workload, stats, workload.choose(), time.perf_counter())
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    stats.elapsed = time.perf_counter() - stats.started_at
+    return stats
+
+async def run_open_loop(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    rate: float,
+    duration: float,
+    max_in_flight: int
+) -> LevelStats:
+    """Llegadas Poisson a `rate` peticiones/s durante `duration` segundos."""
+    stats = LevelStats()
+    arrivals = random.Random(workload.random.random())
+    in_flight: set = set()
+    scheduled = stats.started_at
+    deadline = stats.started_at + duration
+
+    while True:
+        scheduled += arrivals.expovariate(rate)
+        if scheduled >= deadline:
+            break
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        operation = workload.choose()
+        if len(in_flight) >= max_in_flight:
+            # El cliente no puede sostener la tasa: se cuenta como error, no se retrasa
+            stats.record_saturated(operation)
+            continue
+        task = asyncio.ensure_future(_timed_send(client, workload, stats, operation, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    stats.elapsed = time.perf_counter() - stats.started_at
+    return stats
+
+def find_knee(levels: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Nivel con mayor potencia de Kleinrock (throughput / latencia media)."""
+    best = None
+    for level in levels:
+        if not level["mean_ms"] or level["error_rate"] > 0.01:
+            continue
+        power = level["throughput_rps"] / level["mean_ms"]
+        if best is None or power > best["power"]:
+            best = {"level": level["level"], "power": round(power, 5),
+                    "throughput_rps": level["throughput_rps"], "p99_ms": level["p99_ms"]}
+    return best
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    """Recorre los niveles de carga y arma el reporte."""
+    mix = parse_mix(args.mix)
+    workload = Workload(mix, args.dataset_rows, args.source, args.seed)
+    mode, values = ("rate", args.rate) if args.rate else ("concurrency", args.concurrency)
+    levels = parse_levels(values)
+
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        # Esperar el fin del warm-up del servidor (503 mientras tanto)
+        deadline = time.perf_counter() + args.timeout
+        while (await client.get("/health/ready")).status_code == 503 and time.perf_counter() < deadline:
+            await asyncio.sleep(0.5)
+        health = await client.get("/health")
+        health.raise_for_status()
+
+        results = []
+        for level in levels:
+            if args.warmup > 0:
+                await run_closed_loop(client, workload, 1, args.warmup)
+            if mode == "rate":
+                stats = await run_open_loop(client, workload, level, args.duration, args.max_in_flight)
+            else:
+                stats = await run_closed_loop(client, workload, int(level), args.duration)
+
+            summary = {"level": level, **stats.summary()}
+            results.append(summary)
+            print(
+                f"  {mode}={level:<6} {summary['throughput_rps']:>8.2f} req/s  "
+                f"p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms "
+                f"p999={summary['p999_ms']}ms  errores={summary['error_rate']:.2%}"
+            )
+
+    return {
+        "label": args.label or args.url,
+        "url": args.url,
+        "mode": mode,
+        "mix": mix,
+        "dataset_rows": args.dataset_rows,
+        "duration_seconds": args.duration,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "server_health": health.json(),
+        "levels": results,
+        "knee": find_knee(results)
+    }
+
+def compare_reports(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """Compara dos reportes nivel a nivel (throughput y latencias)."""
+    by_level = {level["level"]: level for level in baseline["levels"]}
+    rows = []
+    for level in candidate["levels"]:
+        reference = by_level.get(level["level"])
+        if reference is None:
+            continue
+        row = {"level": level["level"]}
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "p999_ms", "error_rate"):
+            before, after = reference[key], level[key]
+            row[key] = {"a": before, "b": after,
+                        "change": round(after / before - 1, 4) if before and after is not None else None}
+        rows.append(row)
+    return {
+        "a": baseline["label"],
+        "b": candidate["label"],
+        "knee": {"a": baseline.get("knee"), "b": candidate.get("knee")},
+        "levels": rows
+    }
+
+def print_comparison(comparison: Dict[str, Any]) -> None:
+    print(f"📊 A = {comparison['a']}  |  B = {comparison['b']}")
+    print(f"{'nivel':>8} {'req/s A':>10} {'req/s B':>10} {'Δ':>8} {'p99 A':>10} {'p99 B':>10} {'Δ':>8} {'err A':>7} {'err B':>7}")
+    for row in comparison["levels"]:
+        throughput, p99, errors = row["throughput_rps"], row["p99_ms"], row["error_rate"]
+        print(
+            f"{row['level']:>8} {throughput['a']:>10} {throughput['b']:>10} {_pct(throughput['change']):>8} "
+            f"{p99['a']:>10} {p99['b']:>10} {_pct(p99['change']):>8} {errors['a']:>7.2%} {errors['b']:>7.2%}"
+        )
+    for side in ("a", "b"):
+        knee = comparison["knee"][side]
+        description = f"nivel {knee['level']} ({knee['throughput_rps']} req/s, p99 {knee['p99_ms']} ms)" if knee else "sin datos"
+        print(f"🦵 Knee {side.upper()}: {description}")
+
+def _pct(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:+.1%}"
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """`single=0.8,dataset=0.2` -> {'single': 0.8, 'dataset': 0.2}"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def parse_levels(value: str) -> List[float]:
+    levels = [float(item) for item in value.split(",") if item.strip()]
+    return [int(level) if level.is_integer() else level for level in levels]
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generador de carga HTTP para PredictScore-ML")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--label", default="", help="Descripción de la configuración del servidor")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", default="1,2,4,8,16", help="Niveles de concurrencia (lazo cerrado)")
+    load.add_argument("--rate", default="", help="Niveles de tasa en req/s (lazo abierto)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos por nivel")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Segundos de calentamiento antes de cada nivel")
+    parser.add_argument("--mix", default="single=0.8,dataset=0.15,recommendation=0.05",
+                        help="Pesos de la mezcla de operaciones")
+    parser.add_argument("--dataset-rows", type=int, default=1000, help="Filas del CSV de cada llamada de dataset")
+    parser.add_argument("--source", type=Path, default=DEFAULT_SOURCE, help="CSV procesado a re-muestrear")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Límite de peticiones abiertas del cliente")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Archivo JSON del reporte")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("A.json", "B.json"),
+                        help="Comparar dos reportes en lugar de generar carga")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, "r", encoding="utf-8") as f:
+                reports.append(json.load(f))
+        comparison = compare_reports(*reports)
+        print_comparison(comparison)
+        report = comparison
+    else:
+        print(f"🚀 Carga contra {args.url} ({args.mix})")
+        report = asyncio.run(run_load(args))
+        knee = report["knee"]
+        if knee:
+            print(f"🦵 Knee: nivel {knee['level']} ({knee['throughput_rps']} req/s, p99 {knee['p99_ms']} ms)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Reporte guardado en {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())